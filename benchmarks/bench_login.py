@@ -0,0 +1,51 @@
+"""
+Vazão de verificações argon2 (o custo de um login) por tamanho do pool de senhas.
+
+Uso: python -m benchmarks.bench_login [logins_simultaneos] [tamanhos...]
+
+Os parâmetros do argon2 vêm de ARGON2_TIME_COST, ARGON2_MEMORY_COST e
+ARGON2_PARALLELISM, como na API.
+"""
+import asyncio
+import os
+import sys
+import time
+
+from src import security
+from src.services.senhas import PoolSenhas
+
+
+async def rodada(pool: PoolSenhas, senha: str, hash_senha: str, quantidade: int) -> float:
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(pool.verificar(senha, hash_senha) for _ in range(quantidade)))
+    assert all(resultados)
+    return time.perf_counter() - inicio
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cpus = os.cpu_count() or 1
+    tamanhos = [int(valor) for valor in sys.argv[2:]] or sorted({1, 2, 4, cpus, cpus * 2})
+
+    senha = "senha-de-benchmark"
+    hash_senha = security.get_password_hash(senha)
+
+    inicio = time.perf_counter()
+    for _ in range(min(quantidade, 20)):
+        security.verify_password(senha, hash_senha)
+    sequencial = min(quantidade, 20) / (time.perf_counter() - inicio)
+
+    print(f"logins simultâneos: {quantidade} (cpus: {cpus})")
+    print(f"sequencial (inline): {sequencial:8.1f} logins/s")
+    for tamanho in tamanhos:
+        pool = PoolSenhas(tamanho=tamanho, limite_fila=quantidade, timeout=600)
+        try:
+            asyncio.run(rodada(pool, senha, hash_senha, tamanho))
+            tempo = asyncio.run(rodada(pool, senha, hash_senha, quantidade))
+        finally:
+            pool.encerrar()
+        print(f"pool {tamanho:3d} processos: {quantidade / tempo:8.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
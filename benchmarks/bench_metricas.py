@@ -0,0 +1,56 @@
+"""
+Custo do registro de métricas no caminho de uma requisição.
+
+Uso: python -m benchmarks.bench_metricas [requisicoes] [threads]
+
+Mede quantas requisições por segundo o registro consegue anotar (as seis
+gravações que o middleware faz ao fim de cada requisição), com uma e com
+várias threads, e o tempo de uma exportação com as séries resultantes.
+"""
+import sys
+import threading
+import time
+
+from src.services.metricas import metricas
+
+ROTAS = [f"/api/recurso{indice}/{{id}}" for indice in range(30)]
+
+
+def registrar(quantidade: int) -> None:
+    for indice in range(quantidade):
+        rotulos = ("GET", ROTAS[indice % len(ROTAS)])
+        metricas.incrementar("http_requisicoes_em_andamento", ("GET",))
+        metricas.incrementar("http_requisicoes_em_andamento", ("GET",), -1)
+        metricas.incrementar("http_requisicoes_total", (*rotulos, "200"))
+        metricas.observar("http_requisicao_duracao_segundos", (indice % 100) / 1000, rotulos)
+        metricas.observar("http_resposta_tamanho_bytes", 512, rotulos)
+        metricas.observar("db_consultas_por_requisicao", indice % 5, rotulos)
+        metricas.observar("db_tempo_por_requisicao_segundos", (indice % 10) / 1000, rotulos)
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    quantidade_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    inicio = time.perf_counter()
+    registrar(quantidade)
+    tempo = time.perf_counter() - inicio
+    print(f"1 thread:   {quantidade / tempo:12.0f} requisições/s ({tempo / quantidade * 1e6:.2f} µs cada)")
+
+    threads = [threading.Thread(target=registrar, args=(quantidade,)) for _ in range(quantidade_threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tempo = time.perf_counter() - inicio
+    total = quantidade * quantidade_threads
+    print(f"{quantidade_threads} threads:  {total / tempo:12.0f} requisições/s ({tempo / total * 1e6:.2f} µs cada)")
+
+    inicio = time.perf_counter()
+    texto = metricas.exportar()
+    print(f"exportação: {(time.perf_counter() - inicio) * 1000:.2f} ms, {len(texto.splitlines())} linhas")
+
+
+if __name__ == "__main__":
+    main()
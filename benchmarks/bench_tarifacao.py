@@ -0,0 +1,63 @@
+"""
+Micro-benchmark do motor de tarifação.
+
+Uso: python -m benchmarks.bench_tarifacao [quantidade]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.models.estacionamento import EstacionamentoDB
+from src.models.evento import EventoDB
+from src.services import tarifacao
+
+
+def gerar_permanencias(quantidade: int, seed: int = 42):
+    rng = random.Random(seed)
+    estacionamento = EstacionamentoDB(valor_primeira_hora=10.0, valor_demais_horas=5.0, valor_diaria=50.0)
+    planos = [
+        tarifacao.compilar_plano(estacionamento, 'hora'),
+        tarifacao.compilar_plano(estacionamento, 'evento', 1, EventoDB(valor_acesso_unico=30.0)),
+        tarifacao.compilar_plano(estacionamento, 'evento', 1, None),
+    ]
+    base = datetime(2025, 1, 1)
+    entradas, saidas, planos_escolhidos = [], [], []
+    for _ in range(quantidade):
+        entrada = base + timedelta(seconds=rng.randint(0, 86400 * 365))
+        entradas.append(entrada)
+        saidas.append(entrada + timedelta(seconds=rng.randint(0, 86400 * 3)))
+        planos_escolhidos.append(rng.choices(planos, weights=[8, 1, 1])[0])
+    return entradas, saidas, planos_escolhidos
+
+
+def medir(funcao, repeticoes: int = 5) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    entradas, saidas, planos = gerar_permanencias(quantidade)
+
+    tempo_escalar = medir(lambda: [tarifacao.price(e, s, p) for e, s, p in zip(entradas, saidas, planos)])
+    tempo_vetorizado = medir(lambda: tarifacao.price_many(entradas, saidas, planos))
+    entradas_np = np.array(entradas, dtype='datetime64[us]')
+    saidas_np = np.array(saidas, dtype='datetime64[us]')
+    tempo_arrays = medir(lambda: tarifacao.price_many(entradas_np, saidas_np, planos))
+
+    print(f"permanências:   {quantidade}")
+    print(f"price (loop):   {tempo_escalar * 1000:.1f} ms ({quantidade / tempo_escalar:,.0f}/s)")
+    print(f"price_many:     {tempo_vetorizado * 1000:.1f} ms ({quantidade / tempo_vetorizado:,.0f}/s)")
+    print(f"price_many/np:  {tempo_arrays * 1000:.1f} ms ({quantidade / tempo_arrays:,.0f}/s)")
+    print(f"ganho:          {tempo_escalar / tempo_vetorizado:.1f}x (listas), {tempo_escalar / tempo_arrays:.1f}x (datetime64)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Benchmark HTTP dos endpoints mais usados: login, entrada, saída, listagem de
+acessos e dashboard.
+
+    python -m benchmarks.http executar [--database-url URL] [--saida resultado.json] ...
+    python -m benchmarks.http comparar base.json atual.json [--limite-latencia 0.15] [--limite-vazao 0.15]
+
+`executar` recria e popula o banco de DATABASE_URL (SQLite por padrão, ou um
+PostgreSQL local), sobe a API com uvicorn e mede vazão e latências p50/p95/p99
+de cada cenário; `comparar` aponta regressões entre dois resultados.
+"""
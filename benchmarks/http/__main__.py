@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+URL_PADRAO = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'estacionamento_bench.db')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.http", description="Benchmark HTTP dos endpoints mais usados.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    executar_parser = subparsers.add_parser("executar", help="Popula o banco, sobe a API e mede os cenários.")
+    executar_parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", URL_PADRAO),
+                                 help="Banco do benchmark; é apagado e recriado. Padrão: SQLite em um arquivo temporário.")
+    executar_parser.add_argument("--url", default=None, help="Mede uma API já em execução sobre --database-url, em vez de subir uma.")
+    executar_parser.add_argument("--sem-semear", action="store_true", help="Reaproveita o banco já populado.")
+    executar_parser.add_argument("--estacionamentos", type=int, default=5)
+    executar_parser.add_argument("--eventos", type=int, default=20, help="Eventos por estacionamento.")
+    executar_parser.add_argument("--acessos", type=int, default=20000, help="Acessos encerrados por estacionamento.")
+    executar_parser.add_argument("--abertos", type=int, default=200, help="Acessos em aberto por estacionamento.")
+    executar_parser.add_argument("--dias", type=int, default=90, help="Período coberto pelos acessos gerados.")
+    executar_parser.add_argument("--seed", type=int, default=42)
+    executar_parser.add_argument("--concorrencia", type=int, default=10)
+    executar_parser.add_argument("--requisicoes", type=int, default=2000, help="Requisições medidas por cenário.")
+    executar_parser.add_argument("--requisicoes-token", type=int, default=200, help="Requisições medidas em /api/token (argon2).")
+    executar_parser.add_argument("--aquecimento", type=int, default=50, help="Requisições descartadas antes de cada cenário.")
+    executar_parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn.")
+    executar_parser.add_argument("--cenarios", nargs="+", default=None,
+                                 choices=["token", "entrada", "saida", "listar_acessos", "dashboard"])
+    executar_parser.add_argument("--saida", default=None, help="Arquivo JSON do resultado (padrão: stdout).")
+
+    comparar_parser = subparsers.add_parser("comparar", help="Compara dois resultados e falha se houver regressão.")
+    comparar_parser.add_argument("base")
+    comparar_parser.add_argument("atual")
+    comparar_parser.add_argument("--limite-latencia", type=float, default=0.15, help="Aumento tolerado do p95 (fração).")
+    comparar_parser.add_argument("--limite-vazao", type=float, default=0.15, help="Queda tolerada da vazão (fração).")
+
+    args = parser.parse_args()
+    if args.comando == "comparar":
+        sys.exit(_comparar(args))
+    _executar(args)
+
+
+def _executar(args) -> None:
+    # src.database lê DATABASE_URL na importação: os módulos que dependem dele
+    # só podem ser importados depois disto.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.pop("TESTING", None)
+    from benchmarks.http.executar import Configuracao, executar, metadados  # pylint: disable=import-outside-toplevel
+    from benchmarks.http.semear import Volumes, semear  # pylint: disable=import-outside-toplevel
+
+    volumes = Volumes(
+        estacionamentos=args.estacionamentos, eventos_por_estacionamento=args.eventos,
+        acessos_por_estacionamento=args.acessos, abertos_por_estacionamento=args.abertos, dias=args.dias
+    )
+    if args.sem_semear:
+        dados = {"ids_estacionamento": list(range(1, volumes.estacionamentos + 1)), "volumes": None, "seed": None}
+    else:
+        print("Populando o banco...", file=sys.stderr)
+        dados = semear(volumes, args.seed)
+
+    config = Configuracao(
+        concorrencia=args.concorrencia, requisicoes=args.requisicoes, requisicoes_token=args.requisicoes_token,
+        aquecimento=args.aquecimento
+    )
+    if args.cenarios:
+        config.cenarios = tuple(args.cenarios)
+    cenarios = executar(args.database_url, dados["ids_estacionamento"], config, args.url, args.workers)
+
+    resultado = json.dumps({
+        "meta": {**metadados(args.database_url, config, args.workers), "volumes": dados["volumes"], "seed": dados["seed"]},
+        "cenarios": cenarios,
+    }, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(resultado + "\n")
+    else:
+        print(resultado)
+
+
+def _comparar(args) -> int:
+    from benchmarks.http.comparar import comparar  # pylint: disable=import-outside-toplevel
+
+    with open(args.base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(args.atual, encoding="utf-8") as arquivo:
+        atual = json.load(arquivo)
+    linhas, regressoes = comparar(base, atual, args.limite_latencia, args.limite_vazao)
+    print(f"base: {base['meta'].get('commit')}  atual: {atual['meta'].get('commit')}")
+    print("\n".join(linhas))
+    if regressoes:
+        print("\nRegressões:")
+        print("\n".join(f"  {regressao}" for regressao in regressoes))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    main()
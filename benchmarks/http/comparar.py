@@ -0,0 +1,37 @@
+"""
+Compara dois resultados de `executar` e aponta regressões por cenário.
+"""
+from typing import Dict, List, Tuple
+
+
+def comparar(base: Dict, atual: Dict, limite_latencia: float, limite_vazao: float) -> Tuple[List[str], List[str]]:
+    """
+    Retorna (linhas do relatório, regressões). Um cenário regride quando o p95
+    sobe mais que `limite_latencia`, a vazão cai mais que `limite_vazao` (frações,
+    0.15 = 15%) ou passa a ter erros que a base não tinha.
+    """
+    linhas = [f"{'cenário':15s} {'vazão base':>11s} {'vazão atual':>11s} {'Δ':>7s}   {'p95 base':>9s} {'p95 atual':>9s} {'Δ':>7s}"]
+    regressoes = []
+    for nome, resultado_base in base["cenarios"].items():
+        resultado = atual["cenarios"].get(nome)
+        if resultado is None:
+            continue
+        delta_vazao = _variacao(resultado_base["vazao_rps"], resultado["vazao_rps"])
+        delta_p95 = _variacao(resultado_base["p95_ms"], resultado["p95_ms"])
+        linhas.append(
+            f"{nome:15s} {resultado_base['vazao_rps']:11.1f} {resultado['vazao_rps']:11.1f} {delta_vazao:+7.1%}   "
+            f"{resultado_base['p95_ms']:9.2f} {resultado['p95_ms']:9.2f} {delta_p95:+7.1%}"
+        )
+        if delta_p95 > limite_latencia:
+            regressoes.append(f"{nome}: p95 subiu {delta_p95:.1%} (limite {limite_latencia:.0%})")
+        if -delta_vazao > limite_vazao:
+            regressoes.append(f"{nome}: vazão caiu {-delta_vazao:.1%} (limite {limite_vazao:.0%})")
+        if resultado["erros"] and not resultado_base["erros"]:
+            regressoes.append(f"{nome}: {resultado['erros']} erros (a base não tinha nenhum)")
+    return linhas, regressoes
+
+
+def _variacao(anterior: float, atual: float) -> float:
+    if not anterior:
+        return 0.0
+    return (atual - anterior) / anterior
@@ -0,0 +1,196 @@
+"""
+Sobe a API com uvicorn e mede cada cenário com um cliente httpx assíncrono.
+"""
+import asyncio
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.http.semear import LOGIN_ADMIN, SENHA
+
+Requisicao = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Configuracao:
+    concorrencia: int = 10
+    requisicoes: int = 2000
+    requisicoes_token: int = 200
+    aquecimento: int = 50
+    cenarios: tuple = ("token", "entrada", "saida", "listar_acessos", "dashboard")
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil por posição mais próxima sobre uma lista já ordenada."""
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, max(0, -(-len(ordenados) * p // 100) - 1))]
+
+
+async def medir(cliente: httpx.AsyncClient, requisicao: Requisicao, quantidade: int, concorrencia: int, deslocamento: int = 0) -> Dict[str, float]:
+    """Executa `quantidade` requisições com `concorrencia` trabalhadores e resume as latências das bem-sucedidas."""
+    indices = iter(range(deslocamento, deslocamento + quantidade))
+    latencias: List[float] = []
+    erros = 0
+
+    async def trabalhador():
+        nonlocal erros
+        for indice in indices:
+            inicio = time.perf_counter()
+            try:
+                response = await requisicao(cliente, indice)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencias.append(time.perf_counter() - inicio)
+            else:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "requisicoes": quantidade,
+        "erros": erros,
+        "duracao_s": round(duracao, 3),
+        "vazao_rps": round(len(latencias) / duracao, 1) if duracao else 0.0,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        "max_ms": round(latencias[-1] * 1000, 2) if latencias else 0.0,
+    }
+
+
+async def executar_cenarios(url: str, ids_estacionamento: List[int], config: Configuracao) -> Dict[str, Dict[str, float]]:
+    limites = httpx.Limits(max_connections=config.concorrencia, max_keepalive_connections=config.concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        response = await cliente.post("/api/token", data={"username": LOGIN_ADMIN, "password": SENHA})
+        response.raise_for_status()
+        cabecalhos = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        abertos: List[int] = []
+
+        def estacionamento(indice: int) -> int:
+            return ids_estacionamento[indice % len(ids_estacionamento)]
+
+        async def token(c, _indice):
+            return await c.post("/api/token", data={"username": LOGIN_ADMIN, "password": SENHA})
+
+        async def entrada(c, indice):
+            response = await c.post(
+                "/api/acessos/", json={"placa": f"H{indice:08d}", "id_estacionamento": estacionamento(indice)}, headers=cabecalhos
+            )
+            if response.status_code == 201:
+                abertos.append(response.json()["id"])
+            return response
+
+        async def saida(c, indice):
+            return await c.put(f"/api/acessos/{abertos[indice]}/saida", headers=cabecalhos)
+
+        async def listar_acessos(c, indice):
+            return await c.get(
+                "/api/acessos/", params={"limit": 100, "id_estacionamento": estacionamento(indice)}, headers=cabecalhos
+            )
+
+        async def dashboard(c, indice):
+            return await c.get(f"/api/dashboard/{estacionamento(indice)}", headers=cabecalhos)
+
+        requisicoes = {
+            "token": token, "entrada": entrada, "saida": saida, "listar_acessos": listar_acessos, "dashboard": dashboard,
+        }
+        resultados = {}
+        for nome in config.cenarios:
+            quantidade = config.requisicoes_token if nome == "token" else config.requisicoes
+            aquecimento = config.aquecimento
+            if nome == "saida":
+                # Cada saída fecha um acesso aberto pelo cenário de entrada.
+                quantidade = min(quantidade, max(len(abertos) - aquecimento, 0))
+                aquecimento = min(aquecimento, len(abertos))
+            if aquecimento:
+                await medir(cliente, requisicoes[nome], aquecimento, config.concorrencia)
+            resultados[nome] = await medir(cliente, requisicoes[nome], quantidade, config.concorrencia, aquecimento)
+            print(f"{nome:15s} {_linha(resultados[nome])}", file=sys.stderr)
+        return resultados
+
+
+def executar(database_url: str, ids_estacionamento: List[int], config: Configuracao, url: Optional[str] = None, workers: int = 1) -> Dict[str, Dict[str, float]]:
+    """Mede contra `url`, ou contra uma API iniciada aqui sobre `database_url` quando `url` não é informada."""
+    if url is not None:
+        return asyncio.run(executar_cenarios(url, ids_estacionamento, config))
+
+    porta = _porta_livre()
+    ambiente = {**os.environ, "DATABASE_URL": database_url}
+    ambiente.pop("TESTING", None)
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(porta),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=ambiente
+    )
+    try:
+        url = f"http://127.0.0.1:{porta}"
+        _aguardar_pronto(url, servidor)
+        return asyncio.run(executar_cenarios(url, ids_estacionamento, config))
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+
+
+def metadados(database_url: str, config: Configuracao, workers: int) -> Dict[str, object]:
+    return {
+        "commit": _commit(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "banco": database_url.split(":", 1)[0],
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "workers": workers,
+        "concorrencia": config.concorrencia,
+        "requisicoes": config.requisicoes,
+        "requisicoes_token": config.requisicoes_token,
+        "aquecimento": config.aquecimento,
+    }
+
+
+def _linha(resultado: Dict[str, float]) -> str:
+    return (
+        f"{resultado['vazao_rps']:9.1f} req/s  p50 {resultado['p50_ms']:8.2f} ms  p95 {resultado['p95_ms']:8.2f} ms  "
+        f"p99 {resultado['p99_ms']:8.2f} ms  erros {resultado['erros']}"
+    )
+
+
+def _aguardar_pronto(url: str, servidor: subprocess.Popen, timeout: float = 60) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if servidor.poll() is not None:
+            raise RuntimeError("A API terminou antes de ficar pronta.")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"A API não ficou pronta em {timeout:.0f}s.")
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
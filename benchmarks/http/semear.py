@@ -0,0 +1,133 @@
+"""
+Popula um banco descartável com volumes configuráveis. Usa src.database, então
+DATABASE_URL precisa estar definida antes deste módulo ser importado.
+"""
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, text
+
+import src.database
+from src import cli, security
+from src.models.acesso import AcessoDB
+from src.models.base import Base
+from src.models.estacionamento import EstacionamentoDB
+from src.models.evento import EventoDB
+from src.models.faturamento import FaturamentoDB
+from src.models.usuario import PessoaDB, UsuarioDB
+from src.services import estatisticas, faturamento_diario, ocupacao
+
+LOGIN_ADMIN = "bench_admin"
+LOGIN_FUNCIONARIO = "bench_funcionario"
+SENHA = "bench-senha"
+TAMANHO_LOTE = 5000
+
+
+@dataclass(frozen=True)
+class Volumes:
+    estacionamentos: int = 5
+    eventos_por_estacionamento: int = 20
+    acessos_por_estacionamento: int = 20000
+    abertos_por_estacionamento: int = 200
+    dias: int = 90
+
+
+def semear(volumes: Volumes, seed: int = 42) -> Dict[str, object]:
+    """
+    Apaga o banco, aplica as migrações e insere usuários, estacionamentos,
+    eventos (todos no passado), acessos encerrados com faturamento e acessos
+    em aberto. Os agregados são reconstruídos no fim, como faria a CLI.
+    Retorna os ids criados e os volumes usados.
+    """
+    rng = random.Random(seed)
+    _recriar_esquema()
+
+    agora = datetime.now().replace(microsecond=0)
+    inicio_periodo = agora - timedelta(days=volumes.dias)
+    senha_hash = security.get_password_hash(SENHA)
+
+    with src.database.SessionLocal() as db:
+        db.execute(insert(PessoaDB), [
+            {"id": 1, "nome": "Admin Benchmark", "cpf": "000.000.000-01", "email": "admin@bench.local"},
+            {"id": 2, "nome": "Funcionário Benchmark", "cpf": "000.000.000-02", "email": "funcionario@bench.local"},
+        ])
+        db.execute(insert(UsuarioDB), [
+            {"id": 1, "id_pessoa": 1, "login": LOGIN_ADMIN, "senha": senha_hash, "role": "admin", "admin_id": None},
+            {"id": 2, "id_pessoa": 2, "login": LOGIN_FUNCIONARIO, "senha": senha_hash, "role": "funcionario", "admin_id": 1},
+        ])
+
+        ids_estacionamento = list(range(1, volumes.estacionamentos + 1))
+        db.execute(insert(EstacionamentoDB), [
+            {
+                "id": id_estacionamento, "nome": f"Estacionamento {id_estacionamento}", "endereco": "Benchmark",
+                # Sem limite prático, para que as entradas do benchmark nunca encontrem o estacionamento lotado.
+                "total_vagas": 10_000_000, "valor_primeira_hora": 10, "valor_demais_horas": 5, "valor_diaria": 50,
+                "admin_id": 1,
+            }
+            for id_estacionamento in ids_estacionamento
+        ])
+
+        eventos = []
+        for id_estacionamento in ids_estacionamento:
+            for _ in range(volumes.eventos_por_estacionamento):
+                inicio = inicio_periodo + timedelta(minutes=rng.randrange(volumes.dias * 24 * 60 - 6 * 60))
+                eventos.append({
+                    "id": len(eventos) + 1, "nome": f"Evento {len(eventos) + 1}", "data_hora_inicio": inicio,
+                    "data_hora_fim": inicio + timedelta(hours=rng.randint(2, 6)), "valor_acesso_unico": 30,
+                    "id_estacionamento": id_estacionamento, "admin_id": 1,
+                })
+        if eventos:
+            db.execute(insert(EventoDB), eventos)
+
+        acessos: List[dict] = []
+        faturamentos: List[dict] = []
+        id_acesso = 0
+        for id_estacionamento in ids_estacionamento:
+            for indice in range(volumes.acessos_por_estacionamento + volumes.abertos_por_estacionamento):
+                id_acesso += 1
+                aberto = indice >= volumes.acessos_por_estacionamento
+                if aberto:
+                    entrada = agora - timedelta(minutes=rng.randint(1, 12 * 60))
+                    saida = None
+                    valor = None
+                else:
+                    entrada = inicio_periodo + timedelta(minutes=rng.randrange(volumes.dias * 24 * 60 - 24 * 60))
+                    saida = entrada + timedelta(minutes=rng.randint(10, 10 * 60))
+                    valor = round(10 + 5 * max((saida - entrada).total_seconds() // 3600, 0), 2)
+                    faturamentos.append({"id": len(faturamentos) + 1, "valor": valor, "data_faturamento": saida, "id_acesso": id_acesso})
+                acessos.append({
+                    "id": id_acesso, "placa": f"B{id_acesso:08d}", "hora_entrada": entrada, "hora_saida": saida,
+                    "valor_total": valor, "tipo_acesso": "hora", "id_estacionamento": id_estacionamento,
+                    "id_evento": None, "admin_id": 1 if indice % 2 else 2,
+                })
+                if len(acessos) >= TAMANHO_LOTE:
+                    db.execute(insert(AcessoDB), acessos)
+                    acessos.clear()
+                if len(faturamentos) >= TAMANHO_LOTE:
+                    db.execute(insert(FaturamentoDB), faturamentos)
+                    faturamentos.clear()
+        if acessos:
+            db.execute(insert(AcessoDB), acessos)
+        if faturamentos:
+            db.execute(insert(FaturamentoDB), faturamentos)
+
+        if db.get_bind().dialect.name == "postgresql":
+            # Os ids foram gravados explicitamente; as sequências precisam continuar depois deles.
+            for tabela in ("pessoa", "usuarios", "estacionamento", "evento", "acesso", "faturamento"):
+                db.execute(text(f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), COALESCE(MAX(id), 1)) FROM {tabela}"))
+
+        estatisticas.reconstruir_estatisticas(db)
+        faturamento_diario.reconstruir_faturamento_diario(db)
+        ocupacao.reconciliar_ocupacao(db)
+        db.commit()
+
+    return {"ids_estacionamento": ids_estacionamento, "volumes": asdict(volumes), "seed": seed}
+
+
+def _recriar_esquema() -> None:
+    with src.database.engine.begin() as conexao:
+        Base.metadata.drop_all(bind=conexao)
+        conexao.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    cli.migrar()
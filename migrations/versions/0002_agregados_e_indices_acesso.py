@@ -0,0 +1,86 @@
+"""agregados e índices de acesso
+
+Cria as tabelas de ocupação, estatística por hora e faturamento diário e os
+índices de acesso usados pelas consultas de entrada, saída e dashboard. Os
+agregados são preenchidos a partir dos acessos e faturamentos já gravados,
+para que um banco existente não passe a mostrar zeros no histórico.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('acesso_hourly_stats',
+    sa.Column('id_estacionamento', sa.Integer(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Integer(), nullable=False),
+    sa.Column('entradas', sa.Integer(), nullable=False),
+    sa.Column('saidas', sa.Integer(), nullable=False),
+    sa.Column('faturamento', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['id_estacionamento'], ['estacionamento.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_estacionamento', 'dia', 'hora')
+    )
+    op.create_table('faturamento_diario',
+    sa.Column('id_estacionamento', sa.Integer(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('tipo_acesso', sa.String(length=10), nullable=False),
+    sa.Column('id_evento', sa.Integer(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('valor', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['id_estacionamento'], ['estacionamento.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_estacionamento', 'dia', 'tipo_acesso', 'id_evento')
+    )
+    op.create_table('ocupacao_estacionamento',
+    sa.Column('id_estacionamento', sa.Integer(), nullable=False),
+    sa.Column('vagas_ocupadas', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_estacionamento'], ['estacionamento.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_estacionamento')
+    )
+    with op.batch_alter_table('acesso', schema=None) as batch_op:
+        batch_op.create_index('ix_acesso_ativo_estacionamento_placa', ['id_estacionamento', 'placa'], unique=False, postgresql_where=sa.text('hora_saida IS NULL'), sqlite_where=sa.text('hora_saida IS NULL'))
+        batch_op.create_index('ix_acesso_estacionamento_hora_entrada', ['id_estacionamento', 'hora_entrada'], unique=False)
+        batch_op.create_index('ix_acesso_estacionamento_hora_saida', ['id_estacionamento', 'hora_saida'], unique=False)
+
+    _preencher_agregados()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('acesso', schema=None) as batch_op:
+        batch_op.drop_index('ix_acesso_estacionamento_hora_saida')
+        batch_op.drop_index('ix_acesso_estacionamento_hora_entrada')
+        batch_op.drop_index('ix_acesso_ativo_estacionamento_placa', postgresql_where=sa.text('hora_saida IS NULL'), sqlite_where=sa.text('hora_saida IS NULL'))
+
+    op.drop_table('ocupacao_estacionamento')
+    op.drop_table('faturamento_diario')
+    op.drop_table('acesso_hourly_stats')
+
+
+def _preencher_agregados() -> None:
+    # Os mesmos serviços dos comandos reconstruir-* da CLI, dentro da transação da migração.
+    from src.services import estatisticas, faturamento_diario, ocupacao  # pylint: disable=import-outside-toplevel
+
+    db = Session(bind=op.get_bind())
+    try:
+        estatisticas.reconstruir_estatisticas(db)
+        faturamento_diario.reconstruir_faturamento_diario(db)
+        ocupacao.reconciliar_ocupacao(db)
+        db.flush()
+    finally:
+        db.close()
@@ -1,16 +1,63 @@
 # pylint: disable=too-many-arguments,line-too-long
 
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 from src import security
-from src.database import get_db
-from src.models.usuario import UsuarioDB
+from src.services.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# login -> instante da revogação. Só alterações e remoções de usuários criam
+# entradas, então não há limite de tamanho: uma revogação nunca é descartada
+# antes de o último refresh token afetado expirar.
+logins_revogados = TTLCache("logins_revogados", maxsize=None, ttl=security.REFRESH_TOKEN_EXPIRE_MINUTES * 60)
+
+# jti -> instante da revogação de um refresh token já usado. Cada refresh cria
+# uma entrada, por isso o cache é limitado e separado das revogações por login.
+refresh_tokens_revogados = TTLCache(
+    "refresh_tokens_revogados",
+    maxsize=int(os.getenv("AUTH_REVOGACAO_MAXSIZE", "100000")),
+    ttl=security.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuário autenticado, com apenas os dados usados na autorização."""
+    id: int
+    login: str
+    role: str
+    admin_id: Optional[int]
+
+
+def revogar_tokens(login: str) -> None:
+    """
+    Invalida os tokens de `login` emitidos até agora, após alterações ou remoção
+    do usuário. A revogação vale para este processo; nos demais, o token de
+    acesso expira em ACCESS_TOKEN_EXPIRE_MINUTES.
+    """
+    logins_revogados.set(login, time.time())
+
+
+def revogar_refresh_token(jti: str) -> None:
+    refresh_tokens_revogados.set(jti, time.time())
+
+
+def token_revogado(payload: dict) -> bool:
+    revogado_em = logins_revogados.get(payload.get("sub"))
+    if revogado_em is not None and payload.get("iat", 0) < revogado_em:
+        return True
+    jti = payload.get("jti")
+    return jti is not None and refresh_tokens_revogados.get(jti) is not None
+
+
+def decodificar_token(token: str, tipo: str) -> dict:
+    """Decodifica e valida um token do `tipo` pedido ('access' ou 'refresh'), incluindo a revogação."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -18,18 +65,25 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     try:
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError as exc:
         raise credentials_exception from exc
-
-    user = db.query(UsuarioDB).filter(UsuarioDB.login == username).first()
-    if user is None:
+    if payload.get("sub") is None or payload.get("typ") != tipo or token_revogado(payload):
         raise credentials_exception
-    return user
+    return payload
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Resolve o usuário só a partir dos claims do token, sem consultar o banco."""
+    payload = decodificar_token(token, "access")
+    if "uid" not in payload or "role" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Principal(id=payload["uid"], login=payload["sub"], role=payload["role"], admin_id=payload.get("admin_id"))
 
-def get_current_admin_user(current_user: UsuarioDB = Depends(get_current_user)):
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,86 @@
+"""
+Comandos de manutenção do banco.
+
+    python -m src.cli migrar
+    python -m src.cli reconstruir-estatisticas [--estacionamento ID]
+    python -m src.cli reconstruir-faturamento [--estacionamento ID]
+    python -m src.cli reconciliar-ocupacao [--estacionamento ID]
+"""
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+import src.database
+from src.services import estatisticas, faturamento_diario, ocupacao
+from src.services.prontidao import esperar_banco_sync, prontidao
+
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Revisão que reproduz o esquema criado pelo create_all antes das migrações.
+REVISAO_INICIAL = "0001"
+
+
+def migrar(_id_estacionamento: Optional[int] = None) -> None:
+    """
+    Espera o banco aceitar conexões, com o mesmo backoff da inicialização da
+    API, e aplica as migrações pendentes (alembic upgrade head). Um banco criado
+    antes das migrações, pelo antigo create_all da inicialização, é marcado com
+    a revisão inicial, que reproduz aquele esquema, e recebe as seguintes.
+    """
+    esperar_banco_sync(src.database.engine, prontidao.atraso_inicial, prontidao.atraso_maximo)
+    config = Config(str(ALEMBIC_INI))
+    with src.database.engine.begin() as conexao:
+        config.attributes["connection"] = conexao
+        tabelas = inspect(conexao).get_table_names()
+        if tabelas and "alembic_version" not in tabelas:
+            command.stamp(config, REVISAO_INICIAL)
+            print("Banco existente marcado com a revisão inicial das migrações.")
+        command.upgrade(config, "head")
+        print("Migrações aplicadas.")
+
+
+def reconstruir_estatisticas(id_estacionamento: Optional[int] = None) -> None:
+    with src.database.SessionLocal() as db:
+        linhas = estatisticas.reconstruir_estatisticas(db, id_estacionamento)
+        db.commit()
+    print(f"Estatísticas por hora reconstruídas: {linhas} linhas.")
+
+
+def reconstruir_faturamento(id_estacionamento: Optional[int] = None) -> None:
+    with src.database.SessionLocal() as db:
+        linhas = faturamento_diario.reconstruir_faturamento_diario(db, id_estacionamento)
+        db.commit()
+    print(f"Faturamento diário reconstruído: {linhas} linhas.")
+
+
+def reconciliar_ocupacao(id_estacionamento: Optional[int] = None) -> None:
+    with src.database.SessionLocal() as db:
+        resultado = ocupacao.reconciliar_ocupacao(db, id_estacionamento)
+        db.commit()
+    for id_atual, vagas_ocupadas in sorted(resultado.items()):
+        print(f"Estacionamento {id_atual}: {vagas_ocupadas} vagas ocupadas.")
+
+
+COMANDOS = {
+    "migrar": migrar,
+    "reconstruir-estatisticas": reconstruir_estatisticas,
+    "reconstruir-faturamento": reconstruir_faturamento,
+    "reconciliar-ocupacao": reconciliar_ocupacao,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Comandos de manutenção do banco.")
+    parser.add_argument("comando", choices=sorted(COMANDOS))
+    parser.add_argument("--estacionamento", type=int, default=None, help="Limita o comando a um estacionamento.")
+    args = parser.parse_args(argv)
+
+    COMANDOS[args.comando](args.estacionamento)
+
+
+if __name__ == "__main__":
+    main()
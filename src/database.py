@@ -1,15 +1,108 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict, Union
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 if os.environ.get("TESTING") == "True":
     SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+    SQLALCHEMY_READ_DATABASE_URL = None
 else:
     SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://admin:admin123@db:5432/estacionamento")
+    SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL") or None
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def async_database_url(url: str) -> str:
+    """Troca o driver síncrono da URL pelo equivalente assíncrono (asyncpg ou aiosqlite)."""
+    url_obj = make_url(url)
+    if url_obj.get_backend_name() == "postgresql":
+        url_obj = url_obj.set(drivername="postgresql+asyncpg")
+    elif url_obj.get_backend_name() == "sqlite":
+        url_obj = url_obj.set(drivername="sqlite+aiosqlite")
+    return url_obj.render_as_string(hide_password=False)
+
+
+class _EsperaPoolMixin:
+    """Mede o tempo gasto para obter uma conexão do pool, incluindo a espera por uma livre."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._espera_lock = threading.Lock()
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.timeouts = 0
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._espera_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._espera_lock:
+                self.esperas += 1
+                self.espera_total += espera
+                self.espera_maxima = max(self.espera_maxima, espera)
+
+
+class MonitoredQueuePool(_EsperaPoolMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_EsperaPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _env_bool(nome: str, padrao: bool) -> bool:
+    return os.getenv(nome, str(padrao)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_kwargs(url: str, assincrono: bool = False) -> Dict[str, Any]:
+    """
+    Parâmetros do pool lidos do ambiente: DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT, DB_POOL_RECYCLE e DB_POOL_PRE_PING. SQLite usa o pool padrão.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": MonitoredAsyncQueuePool if assincrono else MonitoredQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_kwargs(SQLALCHEMY_DATABASE_URL))
+read_engine = engine
+if SQLALCHEMY_READ_DATABASE_URL:
+    read_engine = create_engine(SQLALCHEMY_READ_DATABASE_URL, **pool_kwargs(SQLALCHEMY_READ_DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine = create_async_engine(
+    async_database_url(SQLALCHEMY_DATABASE_URL), **pool_kwargs(SQLALCHEMY_DATABASE_URL, assincrono=True)
+)
+async_read_engine = async_engine
+if SQLALCHEMY_READ_DATABASE_URL:
+    async_read_engine = create_async_engine(
+        async_database_url(SQLALCHEMY_READ_DATABASE_URL), **pool_kwargs(SQLALCHEMY_READ_DATABASE_URL, assincrono=True)
+    )
+
+# expire_on_commit=False: atributos expirados exigiriam I/O implícito, que não
+# é permitido fora de um await.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 def get_db():
     db = SessionLocal()
@@ -17,3 +110,52 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Sessão para rotas somente leitura; usa a réplica de DATABASE_READ_URL quando configurada."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def _estatisticas_pool(engine_atual: Union[Engine, AsyncEngine]) -> Dict[str, Any]:
+    if isinstance(engine_atual, AsyncEngine):
+        engine_atual = engine_atual.sync_engine
+    pool = engine_atual.pool
+    estatisticas: Dict[str, Any] = {"tipo": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        estatisticas.update({
+            "tamanho": pool.size(),
+            "em_uso": pool.checkedout(),
+            "livres": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, _EsperaPoolMixin):
+        with pool._espera_lock:  # pylint: disable=protected-access
+            estatisticas.update({
+                "esperas": pool.esperas,
+                "espera_media_ms": round(pool.espera_total / pool.esperas * 1000, 3) if pool.esperas else 0.0,
+                "espera_maxima_ms": round(pool.espera_maxima * 1000, 3),
+                "timeouts": pool.timeouts,
+            })
+    return estatisticas
+
+
+def estatisticas_pools() -> Dict[str, Dict[str, Any]]:
+    """Estado de cada pool de conexões: conexões em uso, overflow e tempo de espera."""
+    pools = {"primario": engine, "primario_async": async_engine}
+    if read_engine is not engine:
+        pools["leitura"] = read_engine
+    if async_read_engine is not async_engine:
+        pools["leitura_async"] = async_read_engine
+    return {nome: _estatisticas_pool(engine_atual) for nome, engine_atual in pools.items()}
@@ -1,40 +1,33 @@
-import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.exc import OperationalError
 import src.database
-from src.models.base import Base
 from src.routes import estacionamento as estacionamento_routes
 from src.routes import auth as auth_routes
 from src.routes import evento as evento_routes
 from src.routes import usuario as usuario_routes
 from src.routes import acesso as acesso_routes
 from src.routes import dashboard as dashboard_routes
-
-MAX_RETRIES = 5
-RETRY_DELAY = 5
+from src.routes import faturamento as faturamento_routes
+from src.routes import exportacao as exportacao_routes
+from src.services.cache import estatisticas_caches
+from src.services.feed_ocupacao import feed_ocupacao
+from src.services.metricas import MiddlewareMetricas, metricas
+from src.services.prontidao import prontidao
+from src.services.senhas import pool_senhas
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     print("Iniciando a aplicação...")
-
-    for attempt in range(MAX_RETRIES):
-        try:
-            with src.database.engine.connect():
-                print("Conexão com o banco de dados estabelecida com sucesso!")
-                Base.metadata.create_all(bind=src.database.engine)
-                break
-        except OperationalError as e:
-            print(f"Erro ao conectar ao banco de dados: {e}")
-            if attempt < MAX_RETRIES - 1:
-                print(f"Tentando novamente em {RETRY_DELAY} segundos...")
-                time.sleep(RETRY_DELAY)
-            else:
-                print("Não foi possível conectar ao banco de dados após várias tentativas.")
-                raise
+    # O esquema é criado pelas migrações (alembic upgrade head), não aqui. A
+    # espera pelo banco roda em segundo plano: a porta abre na hora e /ready
+    # indica quando a aplicação pode receber tráfego.
+    prontidao.iniciar()
 
     yield
+    await prontidao.encerrar()
+    pool_senhas.encerrar()
     print("Aplicação finalizada.")
 
 app = FastAPI(
@@ -55,7 +48,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Sem isso o navegador esconde do front-end o cursor da paginação e o
+    # ETag do dashboard (necessário para enviar If-None-Match).
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(MiddlewareMetricas)
 
 app.include_router(auth_routes.router, prefix="/api")
 app.include_router(estacionamento_routes.router, prefix="/api")
@@ -63,7 +60,36 @@ app.include_router(evento_routes.router, prefix="/api")
 app.include_router(usuario_routes.router, prefix="/api")
 app.include_router(acesso_routes.router, prefix="/api")
 app.include_router(dashboard_routes.router, prefix="/api")
+app.include_router(faturamento_routes.router, prefix="/api")
+app.include_router(exportacao_routes.router, prefix="/api")
 
 @app.get("/health", tags=["Health Check"])
 def health_check():
     return {"status": "ok"}
+
+@app.get("/ready", tags=["Health Check"])
+def ready():
+    """Pronto para tráfego: banco acessível e caches aquecidos. Responde 503 até lá."""
+    estado = prontidao.stats()
+    return JSONResponse(status_code=200 if estado["pronto"] else 503, content=estado)
+
+@app.get("/metrics", tags=["Health Check"], response_class=PlainTextResponse)
+def metrics():
+    """Latência, status e tamanho das respostas por rota e consultas SQL por requisição, no formato do Prometheus."""
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health/caches", tags=["Health Check"])
+def cache_stats():
+    return estatisticas_caches()
+
+@app.get("/health/pool", tags=["Health Check"])
+def pool_stats():
+    return src.database.estatisticas_pools()
+
+@app.get("/health/feed", tags=["Health Check"])
+def feed_stats():
+    return feed_ocupacao.stats()
+
+@app.get("/health/senhas", tags=["Health Check"])
+def senhas_stats():
+    return pool_senhas.stats()
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -19,6 +19,18 @@ class AcessoDB(Base):
     admin_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
     faturamento = relationship("FaturamentoDB", back_populates="acesso")
 
+    __table_args__ = (
+        Index(
+            "ix_acesso_ativo_estacionamento_placa",
+            id_estacionamento,
+            placa,
+            postgresql_where=hora_saida.is_(None),
+            sqlite_where=hora_saida.is_(None)
+        ),
+        Index("ix_acesso_estacionamento_hora_entrada", id_estacionamento, hora_entrada),
+        Index("ix_acesso_estacionamento_hora_saida", id_estacionamento, hora_saida),
+    )
+
 
 class AcessoCreate(BaseModel):
     placa: str
@@ -30,6 +42,9 @@ class AcessoUpdate(BaseModel):
     tipo_acesso: Optional[str] = None
     id_evento: Optional[int] = None
 
+class AcessoBatchItem(AcessoCreate):
+    hora_entrada: Optional[datetime] = None
+
 class Acesso(AcessoCreate):
     id: int
     hora_entrada: datetime
@@ -40,3 +55,10 @@ class Acesso(AcessoCreate):
     admin_id: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AcessoBatchResultado(BaseModel):
+    indice: int
+    status_code: int
+    acesso: Optional[Acesso] = None
+    detail: Optional[str] = None
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List
 from pydantic import BaseModel, ConfigDict
 
@@ -18,3 +19,18 @@ class VisaoGeralResponse(BaseModel):
     grafico_ocupacao_hora: List[OcupacaoHoraData]
 
     model_config = ConfigDict(from_attributes=True)
+
+class OcupacaoAoVivo(BaseModel):
+    id_estacionamento: int
+    vagas_ocupadas: int
+    total_vagas: int
+    entradas: int
+    saidas: int
+    faturamento: float
+    momento: datetime
+
+class PontoOcupacao(BaseModel):
+    inicio: datetime
+    fim: datetime
+    pico: int
+    media: float
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer
+from .base import Base
+
+class EstatisticaHoraDB(Base):
+    __tablename__ = "acesso_hourly_stats"
+
+    id_estacionamento = Column(Integer, ForeignKey("estacionamento.id", ondelete="CASCADE"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    hora = Column(Integer, primary_key=True)
+    entradas = Column(Integer, nullable=False, default=0)
+    saidas = Column(Integer, nullable=False, default=0)
+    faturamento = Column(Float, nullable=False, default=0.0)
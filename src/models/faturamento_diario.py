@@ -0,0 +1,35 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+from .base import Base
+
+SEM_EVENTO = 0
+
+class FaturamentoDiarioDB(Base):
+    __tablename__ = "faturamento_diario"
+
+    id_estacionamento = Column(Integer, ForeignKey("estacionamento.id", ondelete="CASCADE"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    tipo_acesso = Column(String(10), primary_key=True)
+    # SEM_EVENTO (0) para acessos sem evento: NULL não pode fazer parte da chave primária.
+    id_evento = Column(Integer, primary_key=True, default=SEM_EVENTO)
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor = Column(Float, nullable=False, default=0.0)
+
+
+class FaturamentoPeriodo(BaseModel):
+    periodo: date
+    id_estacionamento: Optional[int] = None
+    tipo_acesso: Optional[str] = None
+    id_evento: Optional[int] = None
+    quantidade: int
+    valor: float
+
+class RelatorioFaturamento(BaseModel):
+    inicio: date
+    fim: date
+    agrupamento: str
+    quantidade: int
+    total: float
+    itens: List[FaturamentoPeriodo]
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from .base import Base
+
+class OcupacaoDB(Base):
+    __tablename__ = "ocupacao_estacionamento"
+
+    id_estacionamento = Column(Integer, ForeignKey("estacionamento.id", ondelete="CASCADE"), primary_key=True)
+    vagas_ocupadas = Column(Integer, nullable=False, default=0)
@@ -79,4 +79,18 @@ class PessoaCreate(BaseModel):
 
 class TokenData(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class UsuarioImportItem(BaseModel):
+    pessoa: PessoaCreate
+    usuario: UsuarioCreate
+
+class UsuarioImportResultado(BaseModel):
+    indice: int
+    status_code: int
+    usuario: Optional[Usuario] = None
+    detail: Optional[str] = None
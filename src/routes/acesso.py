@@ -1,33 +1,51 @@
 # pylint: disable=too-many-arguments,line-too-long,too-many-locals, duplicate-code
 
-from datetime import datetime
-from zoneinfo import ZoneInfo
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import insert, select
 
-from src.database import get_db
+from src.database import get_async_db, get_async_read_db
 import src.models.acesso
-from src.models import estacionamento as models_estacionamento
 from src.models import evento as models_evento
 from src.models import faturamento as models_faturamento
-from src.models.usuario import UsuarioDB, Usuario
-from src.auth.dependencies import get_current_user
+from src.auth.dependencies import get_current_user, Principal
+from src.services import estatisticas, faturamento_diario, ocupacao, tarifacao
+from src.services.config_estacionamento import obter_config, obter_configs
+from src.services.dashboard import invalidar_dashboard, mensagem_ocupacao
+from src.services.escopo import brazil_timezone, filtro_acessos_visiveis, hora_local_naive
+from src.services.eventos_ativos import indice_eventos
+from src.services.feed_ocupacao import Movimentacao, feed_ocupacao
 
 router = APIRouter(
     prefix="/acessos",
     tags=["Acessos"],
 )
 
-brazil_timezone = ZoneInfo('America/Sao_Paulo')
+MAX_ITENS_LOTE = 1000
+MAX_ITENS_PAGINA = 1000
+TAMANHO_LOTE_STREAM = 500
+# hora_entrada informada em lote: tolerância para relógios de cancela
+# adiantados e quanto tempo de atraso (entradas acumuladas offline) é aceito.
+TOLERANCIA_RELOGIO = timedelta(seconds=float(os.getenv("ACESSO_TOLERANCIA_RELOGIO_SEGUNDOS", "120")))
+JANELA_ENTRADAS_ATRASADAS = timedelta(hours=float(os.getenv("ACESSO_JANELA_ATRASO_HORAS", "48")))
 
-def check_acesso_access(
+
+async def check_acesso_access(
     acesso_id: int,
-    db: Session,
-    current_user: Usuario
+    db: AsyncSession,
+    current_user: Principal,
+    for_update: bool = False
 ) -> src.models.acesso.AcessoDB:
-    db_acesso = db.query(src.models.acesso.AcessoDB).filter(src.models.acesso.AcessoDB.id == acesso_id).first()
+    query = select(src.models.acesso.AcessoDB).where(src.models.acesso.AcessoDB.id == acesso_id)
+    if for_update:
+        query = query.with_for_update()
+    db_acesso = (await db.execute(query)).scalar_one_or_none()
     if not db_acesso:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Acesso não encontrado")
 
@@ -43,18 +61,78 @@ def check_acesso_access(
     return db_acesso
 
 
+async def _fechar_acesso(db: AsyncSession, db_acesso: src.models.acesso.AcessoDB) -> None:
+    if db_acesso.hora_entrada.tzinfo is not None:
+        db_acesso.hora_entrada = db_acesso.hora_entrada.replace(tzinfo=None)
+
+    db_acesso.hora_saida = datetime.now(brazil_timezone).replace(tzinfo=None)
+
+    db_estacionamento = await db.run_sync(obter_config, db_acesso.id_estacionamento)
+    if not db_estacionamento:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Estacionamento associado não encontrado."
+        )
+
+    db_evento = None
+    if db_acesso.tipo_acesso == 'evento' and db_acesso.id_evento:
+        db_evento = await db.get(models_evento.EventoDB, db_acesso.id_evento)
+
+    plano = tarifacao.compilar_plano(db_estacionamento, db_acesso.tipo_acesso, db_acesso.id_evento, db_evento)
+    db_acesso.valor_total, db_acesso.tipo_acesso = tarifacao.price(db_acesso.hora_entrada, db_acesso.hora_saida, plano)
+
+    novo_faturamento = models_faturamento.FaturamentoDB(
+        id_acesso=db_acesso.id,
+        valor=db_acesso.valor_total,
+        data_faturamento=datetime.now(brazil_timezone).replace(tzinfo=None)
+    )
+    db.add(novo_faturamento)
+    await db.run_sync(ocupacao.liberar_vagas, db_acesso.id_estacionamento)
+    await db.run_sync(
+        estatisticas.registrar_saidas, [(db_acesso.id_estacionamento, db_acesso.hora_saida, db_acesso.valor_total)]
+    )
+    await db.run_sync(faturamento_diario.registrar_faturamentos, [(
+        db_acesso.id_estacionamento, novo_faturamento.data_faturamento,
+        db_acesso.tipo_acesso, db_acesso.id_evento, db_acesso.valor_total
+    )])
+
+
+async def _apos_movimentacao(db: AsyncSession, movimentacoes: Dict[int, Movimentacao]) -> None:
+    """
+    Chamado após o commit de entradas ou saídas. A mensagem do feed ao vivo só
+    é calculada se houver assinantes, e uma única vez para todos eles.
+    """
+    for id_estacionamento, movimentacao in movimentacoes.items():
+        invalidar_dashboard(id_estacionamento)
+        if feed_ocupacao.tem_assinantes(id_estacionamento):
+            mensagem = await db.run_sync(mensagem_ocupacao, id_estacionamento, movimentacao)
+            if mensagem is not None:
+                feed_ocupacao.publicar(id_estacionamento, mensagem)
+
+
+def _eventos_ativos(db: Session, id_estacionamento: int, admin_id: Optional[int], momentos: List[datetime]) -> List[Optional[int]]:
+    return [indice_eventos.evento_ativo(db, id_estacionamento, admin_id, momento) for momento in momentos]
+
+
+def _query_acessos_ativos(placa: str, id_estacionamento: int, admin_id: Optional[int]):
+    return select(src.models.acesso.AcessoDB).where(
+        src.models.acesso.AcessoDB.id_estacionamento == id_estacionamento,
+        src.models.acesso.AcessoDB.placa == placa,
+        src.models.acesso.AcessoDB.hora_saida.is_(None),
+        src.models.acesso.AcessoDB.admin_id == admin_id
+    ).order_by(src.models.acesso.AcessoDB.hora_entrada, src.models.acesso.AcessoDB.id)
+
+
 @router.post("/", response_model=src.models.acesso.Acesso, status_code=status.HTTP_201_CREATED)
-def registrar_entrada(
+async def registrar_entrada(
     acesso_data: src.models.acesso.AcessoCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role not in ['admin', 'funcionario']:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para registrar acessos.")
 
-    db_estacionamento = db.query(models_estacionamento.EstacionamentoDB).filter(
-        models_estacionamento.EstacionamentoDB.id == acesso_data.id_estacionamento
-    ).first()
+    db_estacionamento = await db.run_sync(obter_config, acesso_data.id_estacionamento)
     if not db_estacionamento:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estacionamento não encontrado.")
 
@@ -62,32 +140,15 @@ def registrar_entrada(
     if db_estacionamento.admin_id != authorized_admin_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para registrar acessos neste estacionamento.")
 
-    db.expire_all()
-
-    vagas_ocupadas = db.query(src.models.acesso.AcessoDB).filter(
-        src.models.acesso.AcessoDB.id_estacionamento == acesso_data.id_estacionamento,
-        src.models.acesso.AcessoDB.hora_saida.is_(None)
-    ).count()
-
-    if vagas_ocupadas >= db_estacionamento.total_vagas:
+    if not await db.run_sync(ocupacao.reservar_vagas, acesso_data.id_estacionamento, db_estacionamento.total_vagas):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Estacionamento lotado.")
 
     hora_entrada_local_naive = datetime.now(brazil_timezone).replace(tzinfo=None)
 
-    active_event = db.query(models_evento.EventoDB).filter(
-        and_(
-            models_evento.EventoDB.id_estacionamento == acesso_data.id_estacionamento,
-            models_evento.EventoDB.data_hora_inicio <= hora_entrada_local_naive,
-            models_evento.EventoDB.data_hora_fim >= hora_entrada_local_naive,
-            models_evento.EventoDB.admin_id == authorized_admin_id
-        )
-    ).first()
-
-    tipo_acesso = 'hora'
-    id_evento = None
-    if active_event:
-        tipo_acesso = 'evento'
-        id_evento = active_event.id
+    id_evento = await db.run_sync(
+        indice_eventos.evento_ativo, acesso_data.id_estacionamento, authorized_admin_id, hora_entrada_local_naive
+    )
+    tipo_acesso = 'evento' if id_evento else 'hora'
 
     db_acesso = src.models.acesso.AcessoDB(
         **acesso_data.model_dump(),
@@ -97,149 +158,396 @@ def registrar_entrada(
         admin_id=authorized_admin_id
     )
     db.add(db_acesso)
-    db.commit()
-    db.refresh(db_acesso)
+    await db.run_sync(estatisticas.registrar_entradas, [(acesso_data.id_estacionamento, hora_entrada_local_naive)])
+    await db.commit()
+    await _apos_movimentacao(db, {acesso_data.id_estacionamento: Movimentacao(entradas=1)})
+    await db.refresh(db_acesso)
     return db_acesso
 
 
-@router.api_route("/{acesso_id}/saida", methods=["PUT", "OPTIONS"], response_model=src.models.acesso.Acesso)
-def registrar_saida(
-    acesso_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+@router.post("/batch", response_model=List[src.models.acesso.AcessoBatchResultado])
+async def registrar_entradas_em_lote(
+    acessos_data: List[src.models.acesso.AcessoBatchItem],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
+    """
+    Registra várias entradas de uma vez, como as enviadas por cancelas que
+    acumularam placas durante uma queda de rede. Cada item recebe seu próprio
+    resultado; os aceitos são gravados com um único INSERT e um único commit.
+    """
+    if current_user.role not in ['admin', 'funcionario']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para registrar acessos.")
+
+    if len(acessos_data) > MAX_ITENS_LOTE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"O lote pode ter no máximo {MAX_ITENS_LOTE} itens.")
+
+    authorized_admin_id = current_user.id if current_user.role == 'admin' else current_user.admin_id
+    agora_local_naive = datetime.now(brazil_timezone).replace(tzinfo=None)
+
+    ids_estacionamento = {item.id_estacionamento for item in acessos_data}
+    estacionamentos = await db.run_sync(obter_configs, ids_estacionamento)
+
+    resultados = {}
+    horas_entrada = {}
+    pendentes_por_estacionamento = defaultdict(list)
+    for indice, item in enumerate(acessos_data):
+        db_estacionamento = estacionamentos.get(item.id_estacionamento)
+        hora_entrada = hora_local_naive(item.hora_entrada) or agora_local_naive
+        if hora_entrada > agora_local_naive + TOLERANCIA_RELOGIO:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="hora_entrada no futuro."
+            )
+        elif hora_entrada < agora_local_naive - JANELA_ENTRADAS_ATRASADAS:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"hora_entrada anterior à janela aceita de {JANELA_ENTRADAS_ATRASADAS.total_seconds() / 3600:g} horas."
+            )
+        elif not db_estacionamento:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_404_NOT_FOUND, detail="Estacionamento não encontrado."
+            )
+        elif db_estacionamento.admin_id != authorized_admin_id:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_403_FORBIDDEN,
+                detail="Você não tem permissão para registrar acessos neste estacionamento."
+            )
+        else:
+            horas_entrada[indice] = hora_entrada
+            pendentes_por_estacionamento[item.id_estacionamento].append(indice)
+
+    novos_acessos = []
+    movimentacoes = defaultdict(Movimentacao)
+    for id_estacionamento, indices in pendentes_por_estacionamento.items():
+        total_vagas = estacionamentos[id_estacionamento].total_vagas
+        reservadas = await db.run_sync(ocupacao.reservar_ate, id_estacionamento, total_vagas, len(indices))
+
+        for indice in indices[reservadas:]:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_400_BAD_REQUEST, detail="Estacionamento lotado."
+            )
+
+        aceitos = indices[:reservadas]
+        if aceitos:
+            movimentacoes[id_estacionamento].entradas += len(aceitos)
+        ids_evento = await db.run_sync(
+            _eventos_ativos, id_estacionamento, authorized_admin_id, [horas_entrada[indice] for indice in aceitos]
+        )
+        for indice, id_evento in zip(aceitos, ids_evento):
+            hora_entrada = horas_entrada[indice]
+            novos_acessos.append((indice, {
+                "placa": acessos_data[indice].placa,
+                "id_estacionamento": id_estacionamento,
+                "hora_entrada": hora_entrada,
+                "tipo_acesso": 'evento' if id_evento else 'hora',
+                "id_evento": id_evento,
+                "admin_id": authorized_admin_id
+            }))
+
+    if novos_acessos:
+        db_acessos = (await db.scalars(
+            insert(src.models.acesso.AcessoDB).returning(src.models.acesso.AcessoDB, sort_by_parameter_order=True),
+            [valores for _, valores in novos_acessos]
+        )).all()
+        await db.run_sync(estatisticas.registrar_entradas, [
+            (valores["id_estacionamento"], valores["hora_entrada"]) for _, valores in novos_acessos
+        ])
+        for (indice, _), db_acesso in zip(novos_acessos, db_acessos):
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice,
+                status_code=status.HTTP_201_CREATED,
+                acesso=src.models.acesso.Acesso.model_validate(db_acesso)
+            )
+
+    await db.commit()
+    await _apos_movimentacao(db, movimentacoes)
+    return [resultados[indice] for indice in range(len(acessos_data))]
+
+
+@router.put("/saida/batch", response_model=List[src.models.acesso.AcessoBatchResultado])
+async def registrar_saidas_em_lote(
+    acesso_ids: List[int],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Registra a saída de vários acessos de uma vez, como no fechamento de turno
+    ou de um evento. Acessos, estacionamentos e eventos são carregados com uma
+    consulta IN cada, os valores são calculados juntos e o faturamento é
+    gravado com um único INSERT e um único commit.
+    """
     if current_user.role not in ['admin', 'funcionario']:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem permissão para registrar saídas"
         )
 
-    db_acesso = check_acesso_access(acesso_id, db, current_user)
+    if len(acesso_ids) > MAX_ITENS_LOTE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"O lote pode ter no máximo {MAX_ITENS_LOTE} itens.")
 
-    if db_acesso.hora_saida:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Saída já registrada para este acesso."
+    authorized_admin_id = current_user.id if current_user.role == 'admin' else current_user.admin_id
+    hora_saida_local_naive = datetime.now(brazil_timezone).replace(tzinfo=None)
+
+    # Só os acessos do próprio tenant são travados: ids de outro tenant não
+    # podem segurar as saídas dele.
+    acessos = {
+        acesso.id: acesso for acesso in await db.scalars(
+            select(src.models.acesso.AcessoDB).where(
+                src.models.acesso.AcessoDB.id.in_(set(acesso_ids)),
+                src.models.acesso.AcessoDB.admin_id == authorized_admin_id
+            ).with_for_update()
+        )
+    }
+    ids_de_outros = set()
+    faltantes = set(acesso_ids) - acessos.keys()
+    if faltantes:
+        ids_de_outros = set((await db.scalars(
+            select(src.models.acesso.AcessoDB.id).where(src.models.acesso.AcessoDB.id.in_(faltantes))
+        )).all())
+
+    resultados = {}
+    pendentes = []
+    vistos = set()
+    for indice, acesso_id in enumerate(acesso_ids):
+        db_acesso = acessos.get(acesso_id)
+        if not db_acesso and acesso_id not in ids_de_outros:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_404_NOT_FOUND, detail="Acesso não encontrado"
+            )
+        elif not db_acesso:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_403_FORBIDDEN,
+                detail="Você não tem permissão para acessar este registro de acesso."
+            )
+        elif db_acesso.hora_saida or acesso_id in vistos:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_400_BAD_REQUEST, detail="Saída já registrada para este acesso."
+            )
+        else:
+            vistos.add(acesso_id)
+            pendentes.append((indice, db_acesso))
+
+    estacionamentos = {}
+    if pendentes:
+        estacionamentos = await db.run_sync(obter_configs, {a.id_estacionamento for _, a in pendentes})
+
+    ids_evento = {a.id_evento for _, a in pendentes if a.tipo_acesso == 'evento' and a.id_evento}
+    eventos = {}
+    if ids_evento:
+        eventos = {
+            evento.id: evento for evento in await db.scalars(
+                select(models_evento.EventoDB).where(models_evento.EventoDB.id.in_(ids_evento))
+            )
+        }
+
+    a_faturar = []
+    movimentacoes = defaultdict(Movimentacao)
+    for indice, db_acesso in pendentes:
+        db_estacionamento = estacionamentos.get(db_acesso.id_estacionamento)
+        if not db_estacionamento:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice, status_code=status.HTTP_404_NOT_FOUND, detail="Estacionamento associado não encontrado."
+            )
+            continue
+        if db_acesso.hora_entrada.tzinfo is not None:
+            db_acesso.hora_entrada = db_acesso.hora_entrada.replace(tzinfo=None)
+        plano = tarifacao.compilar_plano(
+            db_estacionamento, db_acesso.tipo_acesso, db_acesso.id_evento, eventos.get(db_acesso.id_evento)
         )
+        a_faturar.append((indice, db_acesso, plano))
 
-    if db_acesso.hora_entrada.tzinfo is not None:
-        db_acesso.hora_entrada = db_acesso.hora_entrada.replace(tzinfo=None)
+    if a_faturar:
+        valores, tipos = tarifacao.price_many(
+            [db_acesso.hora_entrada for _, db_acesso, _ in a_faturar],
+            [hora_saida_local_naive] * len(a_faturar),
+            [plano for _, _, plano in a_faturar]
+        )
 
-    db_acesso.hora_saida = datetime.now(brazil_timezone).replace(tzinfo=None)
+        for (indice, db_acesso, _), valor_total, tipo_acesso in zip(a_faturar, valores, tipos):
+            db_acesso.hora_saida = hora_saida_local_naive
+            db_acesso.valor_total = valor_total
+            db_acesso.tipo_acesso = tipo_acesso
+            movimentacoes[db_acesso.id_estacionamento].saidas += 1
+            movimentacoes[db_acesso.id_estacionamento].faturamento += valor_total
+
+        await db.execute(insert(models_faturamento.FaturamentoDB), [
+            {"id_acesso": db_acesso.id, "valor": valor_total, "data_faturamento": hora_saida_local_naive}
+            for (_, db_acesso, _), valor_total in zip(a_faturar, valores)
+        ])
+        for id_estacionamento, movimentacao in movimentacoes.items():
+            await db.run_sync(ocupacao.liberar_vagas, id_estacionamento, movimentacao.saidas)
+        await db.run_sync(estatisticas.registrar_saidas, [
+            (db_acesso.id_estacionamento, hora_saida_local_naive, valor_total)
+            for (_, db_acesso, _), valor_total in zip(a_faturar, valores)
+        ])
+        await db.run_sync(faturamento_diario.registrar_faturamentos, [
+            (db_acesso.id_estacionamento, hora_saida_local_naive, db_acesso.tipo_acesso, db_acesso.id_evento, valor_total)
+            for (_, db_acesso, _), valor_total in zip(a_faturar, valores)
+        ])
+
+        await db.flush()
+        for indice, db_acesso, _ in a_faturar:
+            resultados[indice] = src.models.acesso.AcessoBatchResultado(
+                indice=indice,
+                status_code=status.HTTP_200_OK,
+                acesso=src.models.acesso.Acesso.model_validate(db_acesso)
+            )
+
+    await db.commit()
+    await _apos_movimentacao(db, movimentacoes)
+    return [resultados[indice] for indice in range(len(acesso_ids))]
+
+
+@router.get("/ativos", response_model=List[src.models.acesso.Acesso])
+async def listar_acessos_ativos(
+    placa: str,
+    id_estacionamento: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Lista os acessos em aberto de uma placa em um estacionamento.
+    Usa o índice parcial ix_acesso_ativo_estacionamento_placa.
+    """
+    authorized_admin_id = current_user.id if current_user.role == 'admin' else current_user.admin_id
+    return (await db.scalars(_query_acessos_ativos(placa, id_estacionamento, authorized_admin_id))).all()
 
-    db_estacionamento = db.query(models_estacionamento.EstacionamentoDB).filter(
-        models_estacionamento.EstacionamentoDB.id == db_acesso.id_estacionamento
-    ).first()
-    if not db_estacionamento:
+
+@router.put("/ativos/saida", response_model=src.models.acesso.Acesso)
+async def registrar_saida_por_placa(
+    placa: str,
+    id_estacionamento: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Registra a saída do acesso em aberto mais antigo de uma placa, para operadores
+    que só conhecem a placa do veículo.
+    """
+    if current_user.role not in ['admin', 'funcionario']:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Estacionamento associado não encontrado."
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para registrar saídas"
         )
 
-    valor_total = 0.0
+    authorized_admin_id = current_user.id if current_user.role == 'admin' else current_user.admin_id
+    db_acesso = (await db.scalars(
+        _query_acessos_ativos(placa, id_estacionamento, authorized_admin_id).limit(1).with_for_update()
+    )).first()
+    if not db_acesso:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum acesso em aberto para esta placa.")
 
-    if db_acesso.tipo_acesso == 'evento' and db_acesso.id_evento:
-        db_evento = db.query(models_evento.EventoDB).filter(models_evento.EventoDB.id == db_acesso.id_evento).first()
-        if db_evento and db_evento.valor_acesso_unico is not None:
-            valor_total = float(db_evento.valor_acesso_unico)
-        else:
-            db_acesso.tipo_acesso = 'hora'
-            time_parked = db_acesso.hora_saida - db_acesso.hora_entrada
-            total_minutes = time_parked.total_seconds() / 60
-
-            if total_minutes <= 60:
-                valor_total = float(db_estacionamento.valor_primeira_hora)
-            else:
-                hours_to_charge = total_minutes / 60
-                if total_minutes % 60 > 0:
-                    hours_to_charge = int(hours_to_charge) + 1
-
-                valor_total = float(db_estacionamento.valor_primeira_hora)
-                if hours_to_charge > 1:
-                    valor_total += (hours_to_charge - 1) * float(db_estacionamento.valor_demais_horas)
-
-    elif db_acesso.tipo_acesso == 'hora':
-        time_parked = db_acesso.hora_saida - db_acesso.hora_entrada
-        total_hours = time_parked.total_seconds() / 3600
-
-        if total_hours <= 24:
-            if total_hours <= 1:
-                valor_total = float(db_estacionamento.valor_primeira_hora)
-            else:
-                hours_to_charge = total_hours
-                if total_hours % 1 > 0:
-                    hours_to_charge = int(total_hours) + 1
-
-                valor_total = float(db_estacionamento.valor_primeira_hora)
-                if hours_to_charge > 1:
-                    valor_total += (hours_to_charge - 1) * float(db_estacionamento.valor_demais_horas)
-        else:
-            db_acesso.tipo_acesso = 'diaria'
+    await _fechar_acesso(db, db_acesso)
 
-            total_seconds_parked = time_parked.total_seconds()
-            hours_rounded_up = int(total_seconds_parked / 3600)
-            if total_seconds_parked % 3600 > 0:
-                hours_rounded_up += 1
+    await db.commit()
+    await _apos_movimentacao(db, {
+        db_acesso.id_estacionamento: Movimentacao(saidas=1, faturamento=float(db_acesso.valor_total))
+    })
+    await db.refresh(db_acesso)
+    return db_acesso
 
-            full_days = hours_rounded_up // 24
-            remaining_hours_after_days = hours_rounded_up % 24
 
-            valor_total = full_days * float(db_estacionamento.valor_diaria)
+@router.api_route("/{acesso_id}/saida", methods=["PUT", "OPTIONS"], response_model=src.models.acesso.Acesso)
+async def registrar_saida(
+    acesso_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in ['admin', 'funcionario']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para registrar saídas"
+        )
 
-            if remaining_hours_after_days > 0:
-                if remaining_hours_after_days == 1:
-                    valor_total += float(db_estacionamento.valor_primeira_hora)
-                else:
-                    valor_total += float(db_estacionamento.valor_primeira_hora) + \
-                                   (remaining_hours_after_days - 1) * float(db_estacionamento.valor_demais_horas)
+    db_acesso = await check_acesso_access(acesso_id, db, current_user, for_update=True)
 
-    db_acesso.valor_total = round(valor_total, 2)
+    if db_acesso.hora_saida:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Saída já registrada para este acesso."
+        )
 
-    novo_faturamento = models_faturamento.FaturamentoDB(
-        id_acesso=db_acesso.id,
-        valor=db_acesso.valor_total,
-        data_faturamento=datetime.now(brazil_timezone).replace(tzinfo=None)
-    )
-    db.add(novo_faturamento)
+    await _fechar_acesso(db, db_acesso)
 
-    db.commit()
-    db.refresh(db_acesso)
+    await db.commit()
+    await _apos_movimentacao(db, {
+        db_acesso.id_estacionamento: Movimentacao(saidas=1, faturamento=float(db_acesso.valor_total))
+    })
+    await db.refresh(db_acesso)
     return db_acesso
 
 
 @router.get("/", response_model=List[src.models.acesso.Acesso])
-def listar_acessos(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+async def listar_acessos(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Retorna acessos com id maior que este valor (keyset)."),
+    limit: int = Query(100, ge=1, le=MAX_ITENS_PAGINA),
+    data_inicio: Optional[datetime] = Query(None, description="hora_entrada >= data_inicio"),
+    data_fim: Optional[datetime] = Query(None, description="hora_entrada < data_fim"),
+    id_estacionamento: Optional[int] = None,
+    placa: Optional[str] = None,
+    tipo_acesso: Optional[Literal['evento', 'hora', 'diaria']] = None,
+    em_aberto: Optional[bool] = None,
+    formato: Literal['json', 'ndjson'] = 'json',
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    query = db.query(src.models.acesso.AcessoDB)
+    """
+    Lista os acessos paginados por id (keyset). O cabeçalho X-Next-Cursor traz
+    o cursor da próxima página. Com formato=ndjson, todos os acessos após o
+    cursor são transmitidos linha a linha, sem limite e com memória constante.
+    """
+    query = select(src.models.acesso.AcessoDB)
 
-    if current_user.role == 'admin':
-        managed_employee_ids = [
-            emp.id for emp in db.query(UsuarioDB)
-            .filter(UsuarioDB.admin_id == current_user.id, UsuarioDB.role == 'funcionario')
-            .all()
-        ]
-        query = query.filter(
-            (src.models.acesso.AcessoDB.admin_id == current_user.id) |
-            (src.models.acesso.AcessoDB.admin_id.in_(managed_employee_ids))
-        )
-    elif current_user.role == 'funcionario':
-        if current_user.admin_id is None:
-            return []
-        query = query.filter(src.models.acesso.AcessoDB.admin_id == current_user.admin_id)
-    else:
+    if current_user.role not in ['admin', 'funcionario']:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado a listar acessos.")
-
-    acessos = query.order_by(src.models.acesso.AcessoDB.id).all()
+    filtro = filtro_acessos_visiveis(current_user)
+    if filtro is None:
+        return []
+    query = query.where(filtro)
+
+    if cursor is not None:
+        query = query.where(src.models.acesso.AcessoDB.id > cursor)
+    if data_inicio is not None:
+        query = query.where(src.models.acesso.AcessoDB.hora_entrada >= hora_local_naive(data_inicio))
+    if data_fim is not None:
+        query = query.where(src.models.acesso.AcessoDB.hora_entrada < hora_local_naive(data_fim))
+    if id_estacionamento is not None:
+        query = query.where(src.models.acesso.AcessoDB.id_estacionamento == id_estacionamento)
+    if placa is not None:
+        query = query.where(src.models.acesso.AcessoDB.placa == placa)
+    if tipo_acesso is not None:
+        query = query.where(src.models.acesso.AcessoDB.tipo_acesso == tipo_acesso)
+    if em_aberto is True:
+        query = query.where(src.models.acesso.AcessoDB.hora_saida.is_(None))
+    elif em_aberto is False:
+        query = query.where(src.models.acesso.AcessoDB.hora_saida.is_not(None))
+
+    query = query.order_by(src.models.acesso.AcessoDB.id)
+
+    if formato == 'ndjson':
+        return StreamingResponse(_stream_ndjson(db, query), media_type="application/x-ndjson")
+
+    acessos = (await db.scalars(query.limit(limit))).all()
+    if len(acessos) == limit:
+        response.headers["X-Next-Cursor"] = str(acessos[-1].id)
     return acessos
 
 
+async def _stream_ndjson(db: AsyncSession, query):
+    try:
+        result = await db.stream_scalars(query.execution_options(yield_per=TAMANHO_LOTE_STREAM))
+        async for partition in result.partitions():
+            yield "".join(src.models.acesso.Acesso.model_validate(db_acesso).model_dump_json() + "\n" for db_acesso in partition)
+    finally:
+        await db.close()
+
+
 @router.get("/{acesso_id}", response_model=src.models.acesso.Acesso)
-def obter_acesso(
+async def obter_acesso(
     acesso_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    db_acesso = check_acesso_access(acesso_id, db, current_user)
+    db_acesso = await check_acesso_access(acesso_id, db, current_user)
     return db_acesso
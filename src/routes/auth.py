@@ -1,10 +1,13 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from src.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_async_db
 from src.models import usuario as models
 from src import security
+from src.auth.dependencies import decodificar_token, revogar_refresh_token
+from src.services.senhas import PoolSenhasOcupado, pool_senhas
 
 router = APIRouter(tags=["Autenticação"])
 
@@ -12,8 +15,14 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/token", response_model=models.TokenData)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.UsuarioDB).filter(models.UsuarioDB.login == form_data.username).first()
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """
+    Emite o token de acesso. A verificação argon2 roda no pool de processos de
+    senhas; com o pool saturado a resposta é 503 com Retry-After.
+    """
+    user = (await db.scalars(
+        select(models.UsuarioDB).where(models.UsuarioDB.login == form_data.username)
+    )).first()
 
     if not user:
         logger.warning("Tentativa de login falha: usuário '%s' não encontrado.", form_data.username)
@@ -23,7 +32,17 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not security.verify_password(form_data.password, user.senha):
+    try:
+        senha_correta = await pool_senhas.verificar(form_data.password, user.senha)
+    except PoolSenhasOcupado as exc:
+        logger.warning("Login de '%s' recusado: %s", form_data.username, exc)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Muitos logins simultâneos, tente novamente.",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+    if not senha_correta:
         logger.warning("Tentativa de login falha: senha incorreta para usuário '%s'.", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,8 +50,34 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = security.create_access_token(
-        data={"sub": user.login, "role": user.role}
-    )
+    return _emitir_tokens(user)
+
+
+@router.post("/token/refresh", response_model=models.TokenData)
+async def refresh_access_token(body: models.RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Troca um refresh token válido por um novo par de tokens, relendo o usuário
+    do banco para que alterações de papel ou admin entrem nos claims. O refresh
+    token usado é revogado (rotação).
+    """
+    payload = decodificar_token(body.refresh_token, "refresh")
+    user = (await db.scalars(
+        select(models.UsuarioDB).where(models.UsuarioDB.login == payload["sub"])
+    )).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    revogar_refresh_token(payload["jti"])
+    return _emitir_tokens(user)
+
 
-    return {"access_token": access_token, "token_type": "bearer"}
+def _emitir_tokens(user: models.UsuarioDB) -> dict:
+    return {
+        "access_token": security.create_access_token(data=security.claims_usuario(user)),
+        "refresh_token": security.create_refresh_token(user.login),
+        "token_type": "bearer",
+    }
@@ -1,32 +1,30 @@
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, cast, Date
-from src.database import get_db
-from src.models import acesso as models_acesso
-from src.models import estacionamento as models_estacionamento
-from src.models import faturamento as models_faturamento
-from src.models.dashboard import OcupacaoHoraData, VisaoGeralMetrics, VisaoGeralResponse
-from src.models.usuario import Usuario
-from src.auth.dependencies import get_current_user
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, func, select
+from src.database import get_async_read_db
+from src.models.estatistica_hora import EstatisticaHoraDB
+from src.models.dashboard import OcupacaoHoraData, PontoOcupacao, VisaoGeralMetrics, VisaoGeralResponse
+from src.auth.dependencies import get_current_user, Principal
+from src.services import historico_ocupacao, ocupacao
+from src.services.config_estacionamento import EstacionamentoConfig, obter_config
+from src.services.escopo import brazil_timezone, hora_local_naive
+from src.services.dashboard import RespostaDashboard, dashboard_cache, etag_corresponde, mensagem_ocupacao
+from src.services.feed_ocupacao import FIM, Assinatura, Movimentacao, feed_ocupacao
 
 router = APIRouter(
     prefix="/dashboard",
     tags=["Dashboard"],
 )
 
-brazil_timezone = ZoneInfo('America/Sao_Paulo')
+INTERVALO_KEEPALIVE = 15.0
+MAX_PONTOS_SERIE = 50000
 
-@router.get("/{estacionamento_id}", response_model=VisaoGeralResponse)
-def get_visao_geral_data(
-    estacionamento_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
-):
-    db_estacionamento = db.query(models_estacionamento.EstacionamentoDB).filter(
-        models_estacionamento.EstacionamentoDB.id == estacionamento_id
-    ).first()
+
+async def _obter_estacionamento_autorizado(db: AsyncSession, estacionamento_id: int, current_user: Principal) -> EstacionamentoConfig:
+    db_estacionamento = await db.run_sync(obter_config, estacionamento_id)
 
     if not db_estacionamento:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estacionamento não encontrado.")
@@ -35,43 +33,148 @@ def get_visao_geral_data(
     if db_estacionamento.admin_id != authorized_admin_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para acessar os dados deste estacionamento.")
 
+    return db_estacionamento
+
+
+@router.get("/{estacionamento_id}", response_model=VisaoGeralResponse)
+async def get_visao_geral_data(
+    estacionamento_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Visão geral do estacionamento. A resposta fica em cache por DASHBOARD_CACHE_TTL
+    segundos (ou até a próxima entrada/saída) e traz um ETag; com If-None-Match
+    igual, responde 304 sem consultar o banco nem serializar.
+    """
+    db_estacionamento = await _obter_estacionamento_autorizado(db, estacionamento_id, current_user)
+
+    resposta = dashboard_cache.get(estacionamento_id)
+    if resposta is None:
+        visao_geral = await calcular_visao_geral(db, db_estacionamento)
+        resposta = RespostaDashboard.from_corpo(visao_geral.model_dump_json().encode())
+        dashboard_cache.set(estacionamento_id, resposta)
+
+    headers = {"ETag": resposta.etag, "Cache-Control": "no-cache"}
+    if etag_corresponde(if_none_match, resposta.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=resposta.corpo, media_type="application/json", headers=headers)
+
+
+@router.get("/{estacionamento_id}/ocupacao", response_model=List[PontoOcupacao])
+async def get_serie_ocupacao(
+    estacionamento_id: int,
+    inicio: datetime,
+    fim: datetime,
+    bucket: Literal['15m', '1h', '1d'] = '1h',
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Pico e média de veículos simultâneos por bucket em [inicio, fim), calculados
+    a partir dos intervalos hora_entrada/hora_saida. Os buckets são alinhados à
+    meia-noite; o primeiro e o último podem ser parciais.
+    """
+    await _obter_estacionamento_autorizado(db, estacionamento_id, current_user)
+
+    inicio = hora_local_naive(inicio)
+    fim = hora_local_naive(fim)
+    if fim <= inicio:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fim deve ser posterior a inicio.")
+
+    largura = historico_ocupacao.BUCKETS[bucket]
+    if historico_ocupacao.quantidade_buckets(inicio, fim, largura) > MAX_PONTOS_SERIE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O intervalo pode ter no máximo {MAX_PONTOS_SERIE} buckets; use um bucket maior."
+        )
+
+    return await db.run_sync(historico_ocupacao.serie_ocupacao, estacionamento_id, inicio, fim, largura)
+
+
+@router.get("/{estacionamento_id}/stream")
+async def stream_ocupacao(
+    estacionamento_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Feed server-sent events da ocupação. A primeira mensagem traz o estado
+    atual; depois, uma mensagem `ocupacao` por commit de entradas ou saídas,
+    com a ocupação e as entradas, saídas e faturamento daquela movimentação.
+    Clientes lentos demais são desconectados e devem reconectar.
+    """
+    await _obter_estacionamento_autorizado(db, estacionamento_id, current_user)
+
+    assinatura = feed_ocupacao.assinar(estacionamento_id)
+    try:
+        estado_atual = await db.run_sync(mensagem_ocupacao, estacionamento_id, Movimentacao())
+    except BaseException:
+        feed_ocupacao.cancelar(assinatura)
+        raise
+
+    return StreamingResponse(
+        _eventos_sse(request, assinatura, estado_atual),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _eventos_sse(request: Request, assinatura: Assinatura, estado_atual: bytes):
+    try:
+        yield estado_atual
+        while True:
+            mensagem = await assinatura.proxima(INTERVALO_KEEPALIVE)
+            if mensagem is FIM:
+                break
+            if mensagem is None:
+                if await request.is_disconnected():
+                    break
+                yield b": keepalive\n\n"
+                continue
+            yield mensagem
+    finally:
+        feed_ocupacao.cancelar(assinatura)
+
+
+async def calcular_visao_geral(db: AsyncSession, db_estacionamento: EstacionamentoConfig) -> VisaoGeralResponse:
+    estacionamento_id = db_estacionamento.id
     today_local_date = datetime.now(brazil_timezone).date()
     yesterday_local_date = today_local_date - timedelta(days=1)
 
-    vagas_ocupadas = db.query(models_acesso.AcessoDB).filter(
-        models_acesso.AcessoDB.id_estacionamento == estacionamento_id,
-        models_acesso.AcessoDB.hora_saida.is_(None)
-    ).count()
-
+    vagas_ocupadas = await db.run_sync(ocupacao.obter_vagas_ocupadas, estacionamento_id)
     total_vagas = db_estacionamento.total_vagas
 
-    entradas_hoje = db.query(models_acesso.AcessoDB).filter(
-        models_acesso.AcessoDB.id_estacionamento == estacionamento_id,
-        cast(models_acesso.AcessoDB.hora_entrada, Date) == today_local_date
-    ).count()
-
-    saidas_hoje = db.query(models_acesso.AcessoDB).filter(
-        models_acesso.AcessoDB.id_estacionamento == estacionamento_id,
-        cast(models_acesso.AcessoDB.hora_saida, Date) == today_local_date
-    ).count()
-
-    faturamento_hoje_result = db.query(func.sum(models_faturamento.FaturamentoDB.valor)).filter(
-        and_(
-            cast(models_faturamento.FaturamentoDB.data_faturamento, Date) == today_local_date,
-            models_faturamento.FaturamentoDB.id_acesso == models_acesso.AcessoDB.id,
-            models_acesso.AcessoDB.id_estacionamento == estacionamento_id
-        )
-    ).scalar()
-    faturamento_hoje = float(faturamento_hoje_result) if faturamento_hoje_result else 0.0
-
-    entradas_ontem = db.query(models_acesso.AcessoDB).filter(
-        models_acesso.AcessoDB.id_estacionamento == estacionamento_id,
-        cast(models_acesso.AcessoDB.hora_entrada, Date) == yesterday_local_date
-    ).count()
-    saidas_ontem = db.query(models_acesso.AcessoDB).filter(
-        models_acesso.AcessoDB.id_estacionamento == estacionamento_id,
-        cast(models_acesso.AcessoDB.hora_saida, Date) == yesterday_local_date
-    ).count()
+    # Intervalo semiaberto sobre a chave primária (id_estacionamento, dia, hora):
+    # uma única varredura de índice, agregada por hora no banco.
+    hoje = EstatisticaHoraDB.dia == today_local_date
+    estatisticas_hora = (await db.execute(
+        select(
+            EstatisticaHoraDB.hora,
+            func.sum(case((hoje, EstatisticaHoraDB.entradas), else_=0)),
+            func.sum(case((hoje, EstatisticaHoraDB.saidas), else_=0)),
+            func.sum(case((hoje, EstatisticaHoraDB.faturamento), else_=0.0)),
+            func.sum(case((hoje, 0), else_=EstatisticaHoraDB.entradas)),
+            func.sum(case((hoje, 0), else_=EstatisticaHoraDB.saidas))
+        ).where(
+            EstatisticaHoraDB.id_estacionamento == estacionamento_id,
+            EstatisticaHoraDB.dia >= yesterday_local_date,
+            EstatisticaHoraDB.dia < today_local_date + timedelta(days=1)
+        ).group_by(EstatisticaHoraDB.hora)
+    )).all()
+
+    entradas_hoje = saidas_hoje = entradas_ontem = saidas_ontem = 0
+    faturamento_hoje = 0.0
+    acessos_por_hora_dict = {i: 0 for i in range(24)}
+    for hora, entradas, saidas, faturamento, entradas_dia_anterior, saidas_dia_anterior in estatisticas_hora:
+        entradas_hoje += entradas
+        saidas_hoje += saidas
+        faturamento_hoje += faturamento
+        entradas_ontem += entradas_dia_anterior
+        saidas_ontem += saidas_dia_anterior
+        acessos_por_hora_dict[hora] = entradas
 
     ocupacao_hoje_delta = entradas_hoje - saidas_hoje
     ocupacao_ontem_delta = entradas_ontem - saidas_ontem
@@ -80,18 +183,6 @@ def get_visao_geral_data(
     if ocupacao_ontem_delta != 0:
         porcentagem_ocupacao = ((ocupacao_hoje_delta - ocupacao_ontem_delta) / abs(ocupacao_ontem_delta)) * 100
 
-    acessos_por_hora_dict = {i: 0 for i in range(24)}
-
-    acessos_hoje_local_range = db.query(models_acesso.AcessoDB).filter(
-        models_acesso.AcessoDB.id_estacionamento == estacionamento_id,
-        cast(models_acesso.AcessoDB.hora_entrada, Date) == today_local_date
-    ).all()
-
-    for acesso in acessos_hoje_local_range:
-        hora_entrada_local_aware = acesso.hora_entrada.replace(tzinfo=brazil_timezone) if acesso.hora_entrada.tzinfo is None else acesso.hora_entrada
-        hora = hora_entrada_local_aware.hour
-        acessos_por_hora_dict[hora] = acessos_por_hora_dict.get(hora, 0) + 1
-
     grafico_ocupacao_hora_data = [
         OcupacaoHoraData(hora=h, acessos=acessos_por_hora_dict[h]) for h in range(24)
     ]
@@ -102,7 +193,7 @@ def get_visao_geral_data(
         porcentagem_ocupacao=round(porcentagem_ocupacao, 2),
         entradas_hoje=entradas_hoje,
         saidas_hoje=saidas_hoje,
-        faturamento_hoje=faturamento_hoje
+        faturamento_hoje=round(faturamento_hoje, 2)
     )
 
     return VisaoGeralResponse(
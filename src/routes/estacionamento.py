@@ -1,11 +1,22 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, status, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.models import estacionamento as models
-from src.models.usuario import UsuarioDB, Usuario
-from src.auth.dependencies import get_current_user
+from src.models.estatistica_hora import EstatisticaHoraDB
+from src.models.faturamento_diario import FaturamentoDiarioDB
+from src.models.ocupacao import OcupacaoDB
+from src.models.usuario import UsuarioDB
+from src.auth.dependencies import get_current_user, Principal
+from src.services import ocupacao
+from src.services.config_estacionamento import EstacionamentoConfig, armazenar_config, invalidar_config, obter_config
+from src.services.dashboard import invalidar_dashboard
+
+class OcupacaoReconciliada(BaseModel):
+    id_estacionamento: int
+    vagas_ocupadas: int
 
 class EstacionamentoUpdate(BaseModel):
     nome: Optional[str] = None
@@ -23,9 +34,9 @@ router = APIRouter(
 def check_estacionamento_access(
     estacionamento_id: int,
     db: Session,
-    current_user: Usuario
-) -> models.EstacionamentoDB:
-    db_estacionamento = db.query(models.EstacionamentoDB).filter(models.EstacionamentoDB.id == estacionamento_id).first()
+    current_user: Principal
+) -> EstacionamentoConfig:
+    db_estacionamento = obter_config(db, estacionamento_id)
     if not db_estacionamento:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estacionamento não encontrado")
 
@@ -44,7 +55,7 @@ def check_estacionamento_access(
 def criar_estacionamento(
     estacionamento: models.EstacionamentoCreate,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Cria um novo estacionamento no banco de dados. Apenas administradores.
@@ -64,6 +75,8 @@ def criar_estacionamento(
 
     db_estacionamento = models.EstacionamentoDB(**estacionamento.model_dump(), admin_id=current_user.id)
     db.add(db_estacionamento)
+    db.flush()
+    db.add(OcupacaoDB(id_estacionamento=db_estacionamento.id, vagas_ocupadas=0))
     db.commit()
     db.refresh(db_estacionamento)
     return db_estacionamento
@@ -71,8 +84,8 @@ def criar_estacionamento(
 
 @router.get("/", response_model=List[models.Estacionamento])
 def listar_estacionamentos(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Lista os estacionamentos visíveis para o usuário logado.
@@ -82,11 +95,9 @@ def listar_estacionamentos(
     query = db.query(models.EstacionamentoDB)
 
     if current_user.role == 'admin':
-        managed_employee_ids = [
-            emp.id for emp in db.query(UsuarioDB)
-            .filter(UsuarioDB.admin_id == current_user.id, UsuarioDB.role == 'funcionario')
-            .all()
-        ]
+        managed_employee_ids = select(UsuarioDB.id).where(
+            UsuarioDB.admin_id == current_user.id, UsuarioDB.role == 'funcionario'
+        )
 
         query = query.filter(
             (models.EstacionamentoDB.admin_id == current_user.id) |
@@ -106,8 +117,8 @@ def listar_estacionamentos(
 @router.get("/{estacionamento_id}", response_model=models.Estacionamento)
 def obter_estacionamento(
     estacionamento_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Obtém um estacionamento específico pelo ID, com controle de acesso.
@@ -121,12 +132,13 @@ def atualizar_estacionamento(
     estacionamento_id: int,
     estacionamento_update: EstacionamentoUpdate,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Atualiza um estacionamento existente, com controle de acesso.
     """
-    db_estacionamento = check_estacionamento_access(estacionamento_id, db, current_user)
+    check_estacionamento_access(estacionamento_id, db, current_user)
+    db_estacionamento = db.get(models.EstacionamentoDB, estacionamento_id)
 
     update_data = estacionamento_update.model_dump(exclude_unset=True)
 
@@ -136,6 +148,8 @@ def atualizar_estacionamento(
     db.add(db_estacionamento)
     db.commit()
     db.refresh(db_estacionamento)
+    armazenar_config(db_estacionamento)
+    invalidar_dashboard(estacionamento_id)
     return db_estacionamento
 
 
@@ -143,12 +157,41 @@ def atualizar_estacionamento(
 def deletar_estacionamento(
     estacionamento_id: int,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Deleta um estacionamento específico, com controle de acesso.
     """
-    estacionamento = check_estacionamento_access(estacionamento_id, db, current_user)
+    check_estacionamento_access(estacionamento_id, db, current_user)
+    estacionamento = db.get(models.EstacionamentoDB, estacionamento_id)
 
+    db.query(OcupacaoDB).filter(OcupacaoDB.id_estacionamento == estacionamento_id).delete(synchronize_session=False)
+    db.query(EstatisticaHoraDB).filter(EstatisticaHoraDB.id_estacionamento == estacionamento_id).delete(synchronize_session=False)
+    db.query(FaturamentoDiarioDB).filter(FaturamentoDiarioDB.id_estacionamento == estacionamento_id).delete(synchronize_session=False)
     db.delete(estacionamento)
     db.commit()
+    invalidar_config(estacionamento_id)
+    invalidar_dashboard(estacionamento_id)
+
+
+@router.post("/{estacionamento_id}/ocupacao/reconciliar", response_model=OcupacaoReconciliada)
+def reconciliar_ocupacao(
+    estacionamento_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Recalcula o contador de vagas ocupadas a partir dos acessos em aberto. Apenas administradores.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem reconciliar a ocupação."
+        )
+
+    check_estacionamento_access(estacionamento_id, db, current_user)
+
+    resultado = ocupacao.reconciliar_ocupacao(db, estacionamento_id)
+    db.commit()
+    invalidar_dashboard(estacionamento_id)
+    return OcupacaoReconciliada(id_estacionamento=estacionamento_id, vagas_ocupadas=resultado[estacionamento_id])
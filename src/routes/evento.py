@@ -3,11 +3,11 @@ from zoneinfo import ZoneInfo
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.models import evento as models_evento
 from src.models.evento import EventoCreate, EventoUpdate, Evento
-from src.models import usuario as models_usuario
-from src.auth.dependencies import get_current_user
+from src.auth.dependencies import get_current_user, Principal
+from src.services.eventos_ativos import indice_eventos
 
 router = APIRouter(
     prefix="/eventos",
@@ -20,7 +20,7 @@ brazil_timezone = ZoneInfo('America/Sao_Paulo')
 def criar_evento(
     evento: EventoCreate,
     db: Session = Depends(get_db),
-    current_user: models_usuario.Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     data_hora_inicio_to_save = evento.data_hora_inicio
     data_hora_fim_to_save = evento.data_hora_fim
@@ -35,14 +35,15 @@ def criar_evento(
     )
     db.add(db_evento)
     db.commit()
+    indice_eventos.invalidar(evento.id_estacionamento)
     db.refresh(db_evento)
     return db_evento
 
 @router.get("/{evento_id}", response_model=Evento)
 def get_evento(
     evento_id: int,
-    db: Session = Depends(get_db),
-    _current_user: models_usuario.Usuario = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    _current_user: Principal = Depends(get_current_user)
 ):
     db_evento = db.query(models_evento.EventoDB).filter(
         models_evento.EventoDB.id == evento_id
@@ -59,7 +60,7 @@ def atualizar_evento(
     evento_id: int,
     evento: EventoUpdate,
     db: Session = Depends(get_db),
-    _current_user: models_usuario.Usuario = Depends(get_current_user)
+    _current_user: Principal = Depends(get_current_user)
 ):
     db_evento = db.query(models_evento.EventoDB).filter(
         models_evento.EventoDB.id == evento_id
@@ -70,6 +71,7 @@ def atualizar_evento(
             detail="Evento não encontrado."
         )
 
+    id_estacionamento_anterior = db_evento.id_estacionamento
     update_data = evento.model_dump(exclude_unset=True)
 
     if "data_hora_inicio" in update_data and update_data["data_hora_inicio"] is not None:
@@ -80,8 +82,11 @@ def atualizar_evento(
     for key, value in update_data.items():
         setattr(db_evento, key, value)
 
+    id_estacionamento_atual = db_evento.id_estacionamento
     db.add(db_evento)
     db.commit()
+    indice_eventos.invalidar(id_estacionamento_anterior)
+    indice_eventos.invalidar(id_estacionamento_atual)
     db.refresh(db_evento)
     return db_evento
 
@@ -89,7 +94,7 @@ def atualizar_evento(
 def deletar_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    _current_user: models_usuario.Usuario = Depends(get_current_user)
+    _current_user: Principal = Depends(get_current_user)
 ):
     db_evento = db.query(models_evento.EventoDB).filter(
         models_evento.EventoDB.id == evento_id
@@ -99,14 +104,16 @@ def deletar_evento(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evento não encontrado."
         )
+    id_estacionamento = db_evento.id_estacionamento
     db.delete(db_evento)
     db.commit()
+    indice_eventos.invalidar(id_estacionamento)
 
 @router.get("/estacionamento/{estacionamento_id}", response_model=List[Evento])
 def listar_eventos_por_estacionamento(
     estacionamento_id: int,
-    db: Session = Depends(get_db),
-    _current_user: models_usuario.Usuario = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    _current_user: Principal = Depends(get_current_user)
 ):
     eventos = db.query(models_evento.EventoDB).filter(
         models_evento.EventoDB.id_estacionamento == estacionamento_id
@@ -0,0 +1,110 @@
+import csv
+import io
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from src.database import get_async_read_db
+from src.models.acesso import AcessoDB
+from src.models.faturamento import FaturamentoDB
+from src.auth.dependencies import get_current_user, Principal
+from src.services.escopo import filtro_acessos_visiveis, hora_local_naive
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Exportação"],
+)
+
+TAMANHO_LOTE_EXPORTACAO = 5000
+
+COLUNAS_ACESSOS = (
+    AcessoDB.id, AcessoDB.placa, AcessoDB.id_estacionamento, AcessoDB.hora_entrada, AcessoDB.hora_saida,
+    AcessoDB.valor_total, AcessoDB.tipo_acesso, AcessoDB.id_evento, AcessoDB.admin_id
+)
+COLUNAS_FATURAMENTO = (
+    FaturamentoDB.id, FaturamentoDB.id_acesso, AcessoDB.id_estacionamento, AcessoDB.placa,
+    FaturamentoDB.data_faturamento, FaturamentoDB.valor, AcessoDB.tipo_acesso, AcessoDB.id_evento
+)
+
+
+def _filtro_tenant(current_user: Principal):
+    """Mesmo escopo de GET /api/acessos/: os acessos do admin e dos funcionários que ele gerencia."""
+    filtro = filtro_acessos_visiveis(current_user)
+    if filtro is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado a exportar dados.")
+    return filtro
+
+
+@router.get("/acessos.csv")
+async def exportar_acessos(
+    data_inicio: Optional[datetime] = Query(None, description="hora_entrada >= data_inicio"),
+    data_fim: Optional[datetime] = Query(None, description="hora_entrada < data_fim"),
+    id_estacionamento: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Exporta os acessos em CSV. As linhas são lidas por cursor do servidor em
+    lotes de TAMANHO_LOTE_EXPORTACAO e enviadas à medida que chegam, sem
+    montar objetos ORM nem modelos Pydantic.
+    """
+    query = select(*COLUNAS_ACESSOS).where(_filtro_tenant(current_user))
+    if data_inicio is not None:
+        query = query.where(AcessoDB.hora_entrada >= hora_local_naive(data_inicio))
+    if data_fim is not None:
+        query = query.where(AcessoDB.hora_entrada < hora_local_naive(data_fim))
+    if id_estacionamento is not None:
+        query = query.where(AcessoDB.id_estacionamento == id_estacionamento)
+
+    return _resposta_csv(db, query.order_by(AcessoDB.id), COLUNAS_ACESSOS, "acessos.csv")
+
+
+@router.get("/faturamento.csv")
+async def exportar_faturamento(
+    data_inicio: Optional[datetime] = Query(None, description="data_faturamento >= data_inicio"),
+    data_fim: Optional[datetime] = Query(None, description="data_faturamento < data_fim"),
+    id_estacionamento: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Exporta o faturamento em CSV, com placa e estacionamento do acesso, em streaming."""
+    query = select(*COLUNAS_FATURAMENTO).join(AcessoDB, FaturamentoDB.id_acesso == AcessoDB.id).where(
+        _filtro_tenant(current_user)
+    )
+    if data_inicio is not None:
+        query = query.where(FaturamentoDB.data_faturamento >= hora_local_naive(data_inicio))
+    if data_fim is not None:
+        query = query.where(FaturamentoDB.data_faturamento < hora_local_naive(data_fim))
+    if id_estacionamento is not None:
+        query = query.where(AcessoDB.id_estacionamento == id_estacionamento)
+
+    return _resposta_csv(db, query.order_by(FaturamentoDB.id), COLUNAS_FATURAMENTO, "faturamento.csv")
+
+
+def _resposta_csv(db: AsyncSession, query, colunas, nome_arquivo: str) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_csv(db, query, [coluna.key for coluna in colunas]),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}"'}
+    )
+
+
+async def _stream_csv(db: AsyncSession, query, cabecalho):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    try:
+        writer.writerow(cabecalho)
+        yield buffer.getvalue()
+        result = await db.stream(query.execution_options(yield_per=TAMANHO_LOTE_EXPORTACAO))
+        async for partition in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                [valor.isoformat() if isinstance(valor, datetime) else valor for valor in linha] for linha in partition
+            )
+            yield buffer.getvalue()
+    finally:
+        await db.close()
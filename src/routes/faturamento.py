@@ -0,0 +1,41 @@
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from src.database import get_read_db
+from src.models.faturamento_diario import RelatorioFaturamento
+from src.auth.dependencies import get_current_user, Principal
+from src.services import faturamento_diario
+
+router = APIRouter(
+    prefix="/faturamento",
+    tags=["Faturamento"],
+)
+
+
+@router.get("/relatorio", response_model=RelatorioFaturamento)
+def relatorio_faturamento(
+    inicio: date,
+    fim: date = Query(..., description="Data final, exclusiva."),
+    agrupamento: Literal['dia', 'semana', 'mes'] = 'dia',
+    agrupar_por: List[Literal['estacionamento', 'tipo_acesso', 'evento']] = Query([]),
+    id_estacionamento: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Faturamento dos estacionamentos do usuário em [inicio, fim), por dia, semana
+    ou mês e, opcionalmente, por estacionamento, tipo de acesso e evento.
+    Lido da tabela faturamento_diario, mantida a cada saída.
+    """
+    if current_user.role not in ['admin', 'funcionario']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para consultar o faturamento.")
+
+    if fim <= inicio:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fim deve ser posterior a inicio.")
+
+    authorized_admin_id = current_user.id if current_user.role == 'admin' else current_user.admin_id
+    return faturamento_diario.relatorio(
+        db, authorized_admin_id, inicio, fim, agrupamento, list(dict.fromkeys(agrupar_por)), id_estacionamento
+    )
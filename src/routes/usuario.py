@@ -1,22 +1,50 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from src.database import get_db
-from src.models.usuario import PessoaDB, UsuarioDB, UsuarioCreate, Usuario, PessoaCreate, UsuarioUpdatePayload
-from src.security import get_password_hash
-from src.auth.dependencies import get_current_user, get_current_admin_user
+from src.database import get_async_db, get_db, get_read_db
+from src.models.usuario import (
+    Pessoa, PessoaDB, UsuarioDB, UsuarioCreate, Usuario, PessoaCreate, UsuarioUpdatePayload,
+    UsuarioImportItem, UsuarioImportResultado
+)
+from src.services.senhas import PoolSenhasOcupado, pool_senhas
+from src.auth.dependencies import get_current_user, get_current_admin_user, revogar_tokens, Principal
 
 router = APIRouter(
     prefix="/usuarios",
     tags=["Usuários"]
 )
 
+MAX_ITENS_IMPORTACAO = 1000
+# Gravações da importação refeitas após conflitos com requisições concorrentes.
+TENTATIVAS_IMPORTACAO = 3
+COLUNAS_PESSOA = ("nome", "cpf", "email")
+COLUNAS_USUARIO = ("login", "password", "role")
+
+
+def _gerar_hash(password: str) -> str:
+    try:
+        return pool_senhas.gerar_hash_sync(password)
+    except PoolSenhasOcupado as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de senhas sobrecarregado, tente novamente.",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+
 @router.post("/", response_model=Usuario, status_code=status.HTTP_201_CREATED)
-async def create_user_by_admin(
+def create_user_by_admin(
     pessoa_data: PessoaCreate,
     user_data: UsuarioCreate,
     db: Session = Depends(get_db),
-    current_admin_user: Usuario = Depends(get_current_admin_user)
+    current_admin_user: Principal = Depends(get_current_admin_user)
 ):
     if current_admin_user.role != 'admin':
         raise HTTPException(
@@ -45,7 +73,7 @@ async def create_user_by_admin(
             detail="Login já cadastrado."
         )
 
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = _gerar_hash(user_data.password)
 
     db_user = UsuarioDB(
         id_pessoa=db_pessoa.id,
@@ -63,10 +91,212 @@ async def create_user_by_admin(
 
     return db_user
 
+
+def _registros_importacao(corpo: bytes, content_type: str) -> List[Any]:
+    """
+    Lê o corpo da importação: CSV (text/csv) com as colunas nome, cpf, email,
+    login, password e role, ou JSON com uma lista de {"pessoa", "usuario"}.
+    """
+    try:
+        texto = corpo.decode("utf-8-sig")
+        if content_type.startswith("text/csv"):
+            return [
+                {
+                    "pessoa": {coluna: linha.get(coluna) or None for coluna in COLUNAS_PESSOA},
+                    "usuario": {coluna: linha[coluna] for coluna in COLUNAS_USUARIO if linha.get(coluna)},
+                }
+                for linha in csv.DictReader(io.StringIO(texto))
+            ]
+        registros = json.loads(texto)
+    except (UnicodeDecodeError, csv.Error, json.JSONDecodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Corpo inválido: {exc}") from exc
+    if not isinstance(registros, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O corpo deve ser uma lista de registros.")
+    return registros
+
+
+def _detalhe_validacao(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(parte) for parte in erro['loc'])}: {erro['msg']}" for erro in exc.errors())
+
+
+@router.post("/import", response_model=List[UsuarioImportResultado])
+async def importar_funcionarios(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Cria vários funcionários de uma vez a partir de uma lista JSON ou de um CSV.
+    A unicidade de CPF, e-mail e login é verificada com uma consulta IN cada, as
+    senhas são processadas no pool de senhas, intercaladas com os logins, e todas
+    as linhas válidas são gravadas em uma única transação. Se outra requisição
+    gravar um CPF, e-mail ou login do lote enquanto as senhas são geradas, a
+    unicidade é verificada de novo e só as linhas afetadas recebem 409. Cada
+    registro recebe seu próprio resultado.
+    """
+    registros = _registros_importacao(await request.body(), request.headers.get("content-type", ""))
+    if len(registros) > MAX_ITENS_IMPORTACAO:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"A importação pode ter no máximo {MAX_ITENS_IMPORTACAO} registros.")
+
+    resultados: Dict[int, UsuarioImportResultado] = {}
+    itens: Dict[int, UsuarioImportItem] = {}
+    for indice, registro in enumerate(registros):
+        try:
+            item = UsuarioImportItem.model_validate(registro)
+        except ValidationError as exc:
+            resultados[indice] = UsuarioImportResultado(
+                indice=indice, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=_detalhe_validacao(exc)
+            )
+            continue
+        if item.usuario.role != 'funcionario':
+            resultados[indice] = UsuarioImportResultado(
+                indice=indice, status_code=status.HTTP_400_BAD_REQUEST, detail="A importação aceita apenas funcionários."
+            )
+            continue
+        itens[indice] = item
+
+    aceitos = await _verificar_unicidade(db, itens, resultados)
+    if aceitos:
+        # Encerra a transação de leitura antes do argon2, que pode levar
+        # segundos: a conexão volta ao pool enquanto as senhas são geradas.
+        await db.commit()
+        try:
+            hashes = await pool_senhas.gerar_hashes([item.usuario.password for _, item, _ in aceitos])
+        except PoolSenhasOcupado as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Serviço de senhas sobrecarregado, tente novamente.",
+                headers={"Retry-After": "1"},
+            ) from exc
+        senhas = {indice: senha for (indice, _, _), senha in zip(aceitos, hashes)}
+
+        for _ in range(TENTATIVAS_IMPORTACAO):
+            try:
+                gravados = await _gravar_importacao(db, aceitos, senhas, current_admin_user.id)
+                await db.commit()
+            except IntegrityError:
+                # As restrições UNIQUE do banco pegaram uma linha gravada por
+                # outra requisição depois da verificação; refaz a verificação
+                # só com as linhas aceitas e grava as que continuam válidas.
+                await db.rollback()
+                aceitos = await _verificar_unicidade(db, {indice: item for indice, item, _ in aceitos}, resultados)
+                if not aceitos:
+                    break
+                continue
+            resultados.update(gravados)
+            break
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A importação conflitou com gravações concorrentes, tente novamente."
+            )
+
+    return [resultados[indice] for indice in range(len(registros))]
+
+
+async def _verificar_unicidade(
+    db: AsyncSession,
+    itens: Dict[int, UsuarioImportItem],
+    resultados: Dict[int, UsuarioImportResultado]
+) -> List[Tuple[int, UsuarioImportItem, Optional[PessoaDB]]]:
+    """
+    Registra 409 em `resultados` para os itens com CPF, e-mail ou login já
+    cadastrados ou repetidos no lote e retorna os demais, com a pessoa já
+    cadastrada sem usuário a reaproveitar, quando houver.
+    """
+    cpfs = {item.pessoa.cpf for item in itens.values()}
+    emails = {item.pessoa.email for item in itens.values() if item.pessoa.email}
+    logins = {item.usuario.login for item in itens.values()}
+
+    pessoas_por_cpf = {}
+    if cpfs:
+        pessoas_por_cpf = {
+            db_pessoa.cpf: (db_pessoa, id_usuario) for db_pessoa, id_usuario in await db.execute(
+                select(PessoaDB, UsuarioDB.id)
+                .outerjoin(UsuarioDB, UsuarioDB.id_pessoa == PessoaDB.id)
+                .where(PessoaDB.cpf.in_(cpfs))
+            )
+        }
+    emails_existentes = set()
+    if emails:
+        emails_existentes = set((await db.scalars(select(PessoaDB.email).where(PessoaDB.email.in_(emails)))).all())
+    logins_existentes = set()
+    if logins:
+        logins_existentes = set((await db.scalars(select(UsuarioDB.login).where(UsuarioDB.login.in_(logins)))).all())
+
+    vistos_cpf, vistos_email, vistos_login = set(), set(), set()
+    aceitos = []
+    for indice, item in itens.items():
+        pessoa_existente = pessoas_por_cpf.get(item.pessoa.cpf)
+        email = item.pessoa.email
+        detail = None
+        if item.pessoa.cpf in vistos_cpf or (pessoa_existente and pessoa_existente[1] is not None):
+            detail = "CPF já cadastrado para outro usuário."
+        elif item.usuario.login in vistos_login or item.usuario.login in logins_existentes:
+            detail = "Login já cadastrado."
+        elif email and not pessoa_existente and (email in vistos_email or email in emails_existentes):
+            detail = "E-mail já cadastrado."
+        if detail:
+            resultados[indice] = UsuarioImportResultado(indice=indice, status_code=status.HTTP_409_CONFLICT, detail=detail)
+            continue
+        vistos_cpf.add(item.pessoa.cpf)
+        vistos_login.add(item.usuario.login)
+        if email:
+            vistos_email.add(email)
+        # Como em POST /usuarios/, uma pessoa já cadastrada sem usuário é reaproveitada.
+        aceitos.append((indice, item, pessoa_existente[0] if pessoa_existente else None))
+    return aceitos
+
+
+async def _gravar_importacao(
+    db: AsyncSession,
+    aceitos: List[Tuple[int, UsuarioImportItem, Optional[PessoaDB]]],
+    senhas: Dict[int, str],
+    admin_id: int
+) -> Dict[int, UsuarioImportResultado]:
+    novas_pessoas = [(indice, item) for indice, item, db_pessoa in aceitos if db_pessoa is None]
+    pessoas = {indice: db_pessoa for indice, _, db_pessoa in aceitos if db_pessoa is not None}
+    if novas_pessoas:
+        db_pessoas = (await db.scalars(
+            insert(PessoaDB).returning(PessoaDB, sort_by_parameter_order=True),
+            [item.pessoa.model_dump() for _, item in novas_pessoas]
+        )).all()
+        pessoas.update({indice: db_pessoa for (indice, _), db_pessoa in zip(novas_pessoas, db_pessoas)})
+
+    db_usuarios = (await db.scalars(
+        insert(UsuarioDB).returning(UsuarioDB, sort_by_parameter_order=True),
+        [
+            {
+                "id_pessoa": pessoas[indice].id,
+                "login": item.usuario.login,
+                "senha": senhas[indice],
+                "role": 'funcionario',
+                "admin_id": admin_id,
+            }
+            for indice, item, _ in aceitos
+        ]
+    )).all()
+
+    return {
+        indice: UsuarioImportResultado(
+            indice=indice,
+            status_code=status.HTTP_201_CREATED,
+            usuario=Usuario(
+                id=db_user.id,
+                id_pessoa=db_user.id_pessoa,
+                login=db_user.login,
+                role=db_user.role,
+                admin_id=db_user.admin_id,
+                pessoa=Pessoa.model_validate(pessoas[indice])
+            )
+        )
+        for (indice, _, _), db_user in zip(aceitos, db_usuarios)
+    }
+
 @router.get("/", response_model=List[Usuario])
-async def list_users(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+def list_users(
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     query = db.query(UsuarioDB).options(joinedload(UsuarioDB.pessoa))
 
@@ -83,10 +313,10 @@ async def list_users(
     return query.all()
 
 @router.get("/{user_id}", response_model=Usuario)
-async def get_user(
+def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     db_user = db.query(UsuarioDB).options(joinedload(UsuarioDB.pessoa)).filter(UsuarioDB.id == user_id).first()
     if not db_user:
@@ -108,11 +338,11 @@ async def get_user(
     return db_user
 
 @router.put("/{user_id}", response_model=Usuario)
-async def update_user(
+def update_user(
     user_id: int,
     data_to_update: UsuarioUpdatePayload,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     db_user = db.query(UsuarioDB).options(joinedload(UsuarioDB.pessoa)).filter(UsuarioDB.id == user_id).first()
     if not db_user:
@@ -136,6 +366,7 @@ async def update_user(
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado")
 
+    login_anterior = db_user.login
     if data_to_update.user_data.login:
         existing_login = db.query(UsuarioDB).filter(
             UsuarioDB.login == data_to_update.user_data.login, UsuarioDB.id != user_id
@@ -145,11 +376,11 @@ async def update_user(
         db_user.login = data_to_update.user_data.login
 
     if data_to_update.user_data.password:
-        db_user.senha = get_password_hash(data_to_update.user_data.password)
+        db_user.senha = _gerar_hash(data_to_update.user_data.password)
 
     db_user.role = data_to_update.user_data.role
 
-    db_pessoa = db.query(PessoaDB).filter(PessoaDB.id == db_user.id_pessoa).first()
+    db_pessoa = db_user.pessoa
     if db_pessoa:
         for field, value in data_to_update.pessoa_data.model_dump(exclude_unset=True).items():
             setattr(db_pessoa, field, value)
@@ -158,16 +389,16 @@ async def update_user(
 
 
     db.commit()
+    revogar_tokens(login_anterior)
     db.refresh(db_user)
-    db.refresh(db_pessoa)
 
     return db_user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_admin_user: Usuario = Depends(get_current_admin_user)
+    current_admin_user: Principal = Depends(get_current_admin_user)
 ):
     db_user = db.query(UsuarioDB).filter(UsuarioDB.id == user_id).first()
     if not db_user:
@@ -182,10 +413,12 @@ async def delete_user(
     if db_user.role == 'admin':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não é permitido deletar outros administradores.")
 
-    db_pessoa = db.query(PessoaDB).filter(PessoaDB.id == db_user.id_pessoa).first()
+    db_pessoa = db_user.pessoa
     if db_pessoa:
         db.delete(db_pessoa)
 
+    login = db_user.login
     db.delete(db_user)
     db.commit()
+    revogar_tokens(login)
     return
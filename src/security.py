@@ -1,13 +1,24 @@
 import os
+import uuid
 from datetime import datetime, timedelta, timezone
 from jose import jwt
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 SECRET_KEY = os.getenv("SECRET_KEY", "uma_chave_de_desenvolvimento_simples_e_longa_sem_problemas")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "5"))
+REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", str(12 * 60)))
 
-password_hash = PasswordHash.recommended()
+# Os padrões são os de PasswordHash.recommended(). Hashes existentes continuam
+# válidos ao mudar os parâmetros, pois cada hash guarda os seus.
+password_hash = PasswordHash((
+    Argon2Hasher(
+        time_cost=int(os.getenv("ARGON2_TIME_COST", "3")),
+        memory_cost=int(os.getenv("ARGON2_MEMORY_COST", "65536")),
+        parallelism=int(os.getenv("ARGON2_PARALLELISM", "4")),
+    ),
+))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -19,9 +30,32 @@ def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
 
 def create_access_token(data: dict):
-    """Cria um novo token de acesso (JWT)."""
+    """
+    Cria um novo token de acesso (JWT) de curta duração. `data` deve trazer
+    sub, role, uid e admin_id, para que a autorização não precise do banco.
+    """
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    agora = datetime.now(timezone.utc)
+    to_encode.update({
+        "typ": "access",
+        "iat": agora.timestamp(),
+        "exp": agora + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    })
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+def create_refresh_token(login: str):
+    """Cria um refresh token (JWT), aceito apenas por /api/token/refresh."""
+    agora = datetime.now(timezone.utc)
+    to_encode = {
+        "sub": login,
+        "typ": "refresh",
+        "jti": uuid.uuid4().hex,
+        "iat": agora.timestamp(),
+        "exp": agora + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def claims_usuario(user) -> dict:
+    """Claims de tenancy embutidos no token de acesso."""
+    return {"sub": user.login, "role": user.role, "uid": user.id, "admin_id": user.admin_id}
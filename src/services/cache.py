@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Cache LRU limitado a `maxsize` entradas, com expiração por TTL. Com
+    `maxsize` None nada é descartado antes de expirar; as entradas vencidas
+    são removidas a cada escrita.
+
+    Seguro para uso entre threads. Cada instância se registra pelo nome para
+    que `estatisticas_caches` exponha os contadores de acerto e falha.
+    """
+
+    def __init__(self, nome: str, maxsize: Optional[int], ttl: float):
+        self.nome = nome
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        _caches[nome] = self
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] <= agora:
+                if item is not None:
+                    del self._itens[chave]
+                self.misses += 1
+                return default
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[1]
+
+    def set(self, chave: Hashable, valor: Any, ttl: Optional[float] = None) -> None:
+        expira_em = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+        with self._lock:
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            if self.maxsize is None:
+                agora = time.monotonic()
+                while self._itens and next(iter(self._itens.values()))[0] <= agora:
+                    self._itens.popitem(last=False)
+            while self.maxsize is not None and len(self._itens) > self.maxsize:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, chave: Hashable) -> None:
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tamanho": len(self._itens),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def estatisticas_caches() -> Dict[str, Dict[str, Any]]:
+    return {nome: cache.stats() for nome, cache in _caches.items()}
+
+
+def limpar_caches() -> None:
+    for cache in _caches.values():
+        cache.limpar()
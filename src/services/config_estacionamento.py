@@ -0,0 +1,93 @@
+import os
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.estacionamento import EstacionamentoDB
+from src.services.cache import TTLCache
+
+estacionamento_cache = TTLCache(
+    "estacionamentos",
+    maxsize=int(os.getenv("ESTACIONAMENTO_CACHE_MAXSIZE", "1024")),
+    ttl=float(os.getenv("ESTACIONAMENTO_CACHE_TTL", "300")),
+)
+
+Valor = Optional[Union[Decimal, float]]
+
+
+@dataclass(frozen=True)
+class EstacionamentoConfig:
+    """Cópia imutável da configuração de um estacionamento, segura para compartilhar entre requisições."""
+    id: int
+    nome: str
+    endereco: Optional[str]
+    total_vagas: int
+    valor_primeira_hora: Valor
+    valor_demais_horas: Valor
+    valor_diaria: Valor
+    admin_id: Optional[int]
+
+    @classmethod
+    def from_db(cls, db_estacionamento: EstacionamentoDB) -> "EstacionamentoConfig":
+        return cls(
+            id=db_estacionamento.id,
+            nome=db_estacionamento.nome,
+            endereco=db_estacionamento.endereco,
+            total_vagas=db_estacionamento.total_vagas,
+            valor_primeira_hora=db_estacionamento.valor_primeira_hora,
+            valor_demais_horas=db_estacionamento.valor_demais_horas,
+            valor_diaria=db_estacionamento.valor_diaria,
+            admin_id=db_estacionamento.admin_id,
+        )
+
+
+def obter_config(db: Session, id_estacionamento: int) -> Optional[EstacionamentoConfig]:
+    """Retorna a configuração do estacionamento, consultando o banco só em caso de falha no cache."""
+    return obter_configs(db, [id_estacionamento]).get(id_estacionamento)
+
+
+def obter_configs(db: Session, ids_estacionamento: Iterable[int]) -> Dict[int, EstacionamentoConfig]:
+    """Versão em lote de `obter_config`: as falhas no cache são buscadas com uma única consulta IN."""
+    configs = {}
+    faltantes = set()
+    for id_estacionamento in set(ids_estacionamento):
+        config = estacionamento_cache.get(id_estacionamento)
+        if config is None:
+            faltantes.add(id_estacionamento)
+        else:
+            configs[id_estacionamento] = config
+
+    if faltantes:
+        for db_estacionamento in db.execute(
+            select(EstacionamentoDB).where(EstacionamentoDB.id.in_(faltantes))
+        ).scalars():
+            config = EstacionamentoConfig.from_db(db_estacionamento)
+            estacionamento_cache.set(config.id, config)
+            configs[config.id] = config
+
+    return configs
+
+
+def armazenar_config(db_estacionamento: EstacionamentoDB) -> EstacionamentoConfig:
+    """Grava no cache a configuração recém-salva (write-through)."""
+    config = EstacionamentoConfig.from_db(db_estacionamento)
+    estacionamento_cache.set(config.id, config)
+    return config
+
+
+def invalidar_config(id_estacionamento: int) -> None:
+    estacionamento_cache.invalidar(id_estacionamento)
+
+
+def aquecer_configs(db: Session) -> int:
+    """Carrega no cache até `maxsize` estacionamentos, para que as primeiras requisições não paguem a falha. Retorna quantos."""
+    quantidade = 0
+    for db_estacionamento in db.execute(
+        select(EstacionamentoDB).order_by(EstacionamentoDB.id).limit(estacionamento_cache.maxsize)
+    ).scalars():
+        armazenar_config(db_estacionamento)
+        quantidade += 1
+    return quantidade
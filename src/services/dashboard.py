@@ -0,0 +1,67 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from src.models.dashboard import OcupacaoAoVivo
+from src.services import ocupacao
+from src.services.cache import TTLCache
+from src.services.config_estacionamento import obter_config
+from src.services.escopo import brazil_timezone
+from src.services.feed_ocupacao import Movimentacao, evento_sse
+
+dashboard_cache = TTLCache(
+    "dashboard",
+    maxsize=int(os.getenv("DASHBOARD_CACHE_MAXSIZE", "1024")),
+    ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "5")),
+)
+
+
+@dataclass(frozen=True)
+class RespostaDashboard:
+    """Visão geral já serializada, com o ETag forte derivado do próprio corpo."""
+    corpo: bytes
+    etag: str
+
+    @classmethod
+    def from_corpo(cls, corpo: bytes) -> "RespostaDashboard":
+        return cls(corpo=corpo, etag=f'"{hashlib.sha256(corpo).hexdigest()[:32]}"')
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara If-None-Match com o ETag (comparação fraca, como exige o RFC 9110)."""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def invalidar_dashboard(id_estacionamento: int) -> None:
+    """Descarta a visão geral em cache; chamado após entradas, saídas e alterações do estacionamento."""
+    dashboard_cache.invalidar(id_estacionamento)
+
+
+def mensagem_ocupacao(db: Session, id_estacionamento: int, movimentacao: Movimentacao) -> Optional[bytes]:
+    """
+    Mensagem SSE do feed ao vivo: ocupação atual mais as entradas, saídas e o
+    faturamento da movimentação. None se o estacionamento não existe mais.
+    """
+    db_estacionamento = obter_config(db, id_estacionamento)
+    if db_estacionamento is None:
+        return None
+    dados = OcupacaoAoVivo(
+        id_estacionamento=id_estacionamento,
+        vagas_ocupadas=ocupacao.obter_vagas_ocupadas(db, id_estacionamento),
+        total_vagas=db_estacionamento.total_vagas,
+        entradas=movimentacao.entradas,
+        saidas=movimentacao.saidas,
+        faturamento=round(movimentacao.faturamento, 2),
+        momento=datetime.now(brazil_timezone).replace(tzinfo=None)
+    )
+    return evento_sse("ocupacao", dados.model_dump_json())
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from src.auth.dependencies import Principal
+from src.models.acesso import AcessoDB
+from src.models.usuario import UsuarioDB
+
+brazil_timezone = ZoneInfo('America/Sao_Paulo')
+
+
+def hora_local_naive(momento: Optional[datetime]) -> Optional[datetime]:
+    """Converte um instante com fuso para o horário local sem fuso, como é gravado no banco."""
+    if momento is None or momento.tzinfo is None:
+        return momento
+    return momento.astimezone(brazil_timezone).replace(tzinfo=None)
+
+
+def filtro_acessos_visiveis(current_user: Principal):
+    """
+    Condição sobre AcessoDB com os acessos que `current_user` pode ver: o admin
+    vê os seus e os dos funcionários que gerencia (por subconsulta, sem uma ida
+    extra ao banco); o funcionário vê os do seu admin. Retorna None quando o
+    usuário não vê acesso algum.
+    """
+    if current_user.role == 'admin':
+        managed_employee_ids = select(UsuarioDB.id).where(
+            UsuarioDB.admin_id == current_user.id, UsuarioDB.role == 'funcionario'
+        )
+        return (AcessoDB.admin_id == current_user.id) | (AcessoDB.admin_id.in_(managed_employee_ids))
+    if current_user.role == 'funcionario' and current_user.admin_id is not None:
+        return AcessoDB.admin_id == current_user.admin_id
+    return None
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.acesso import AcessoDB
+from src.models.estatistica_hora import EstatisticaHoraDB
+from src.models.faturamento import FaturamentoDB
+
+TAMANHO_LOTE_RECONSTRUCAO = 5000
+
+Chave = Tuple[int, date, int]
+
+
+class _Totais:
+    __slots__ = ("entradas", "saidas", "faturamento")
+
+    def __init__(self):
+        self.entradas = 0
+        self.saidas = 0
+        self.faturamento = 0.0
+
+
+def _chave(id_estacionamento: int, momento: datetime) -> Chave:
+    return id_estacionamento, momento.date(), momento.hour
+
+
+def registrar_entradas(db: Session, entradas: Iterable[Tuple[int, datetime]]) -> None:
+    """Soma entradas (id_estacionamento, hora_entrada) às estatísticas por hora, na transação corrente."""
+    totais: Dict[Chave, _Totais] = defaultdict(_Totais)
+    for id_estacionamento, hora_entrada in entradas:
+        totais[_chave(id_estacionamento, hora_entrada)].entradas += 1
+    _somar(db, totais)
+
+
+def registrar_saidas(db: Session, saidas: Iterable[Tuple[int, datetime, float]]) -> None:
+    """Soma saídas (id_estacionamento, hora_saida, valor) às estatísticas por hora, na transação corrente."""
+    totais: Dict[Chave, _Totais] = defaultdict(_Totais)
+    for id_estacionamento, hora_saida, valor in saidas:
+        total = totais[_chave(id_estacionamento, hora_saida)]
+        total.saidas += 1
+        total.faturamento += valor or 0.0
+    _somar(db, totais)
+
+
+def reconstruir_estatisticas(db: Session, id_estacionamento: Optional[int] = None) -> int:
+    """
+    Recalcula as estatísticas por hora a partir de `acesso` e `faturamento`,
+    para carga inicial ou correção. Não faz commit. Retorna quantas linhas foram gravadas.
+    """
+    totais: Dict[Chave, _Totais] = defaultdict(_Totais)
+
+    acessos_query = select(AcessoDB.id_estacionamento, AcessoDB.hora_entrada, AcessoDB.hora_saida)
+    faturamento_query = select(AcessoDB.id_estacionamento, FaturamentoDB.data_faturamento, FaturamentoDB.valor).join(
+        AcessoDB, FaturamentoDB.id_acesso == AcessoDB.id
+    )
+    remover = delete(EstatisticaHoraDB)
+    if id_estacionamento is not None:
+        acessos_query = acessos_query.where(AcessoDB.id_estacionamento == id_estacionamento)
+        faturamento_query = faturamento_query.where(AcessoDB.id_estacionamento == id_estacionamento)
+        remover = remover.where(EstatisticaHoraDB.id_estacionamento == id_estacionamento)
+
+    for id_atual, hora_entrada, hora_saida in db.execute(
+        acessos_query.execution_options(yield_per=TAMANHO_LOTE_RECONSTRUCAO)
+    ):
+        totais[_chave(id_atual, hora_entrada)].entradas += 1
+        if hora_saida is not None:
+            totais[_chave(id_atual, hora_saida)].saidas += 1
+
+    for id_atual, data_faturamento, valor in db.execute(
+        faturamento_query.execution_options(yield_per=TAMANHO_LOTE_RECONSTRUCAO)
+    ):
+        if data_faturamento is not None:
+            totais[_chave(id_atual, data_faturamento)].faturamento += valor or 0.0
+
+    db.execute(remover)
+    linhas = _linhas(totais)
+    if linhas:
+        db.execute(insert(EstatisticaHoraDB), linhas)
+    db.flush()
+    return len(linhas)
+
+
+def _linhas(totais: Dict[Chave, _Totais]) -> List[dict]:
+    return [
+        {
+            "id_estacionamento": id_estacionamento,
+            "dia": dia,
+            "hora": hora,
+            "entradas": total.entradas,
+            "saidas": total.saidas,
+            "faturamento": total.faturamento,
+        }
+        for (id_estacionamento, dia, hora), total in sorted(totais.items())
+    ]
+
+
+def _somar(db: Session, totais: Dict[Chave, _Totais]) -> None:
+    """
+    Incrementa as linhas com INSERT ... ON CONFLICT DO UPDATE, atômico entre
+    transações concorrentes. As chaves são ordenadas para evitar deadlocks.
+    """
+    linhas = _linhas(totais)
+    if not linhas:
+        return
+
+    dialeto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialeto.insert(EstatisticaHoraDB).values(linhas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EstatisticaHoraDB.id_estacionamento, EstatisticaHoraDB.dia, EstatisticaHoraDB.hora],
+        set_={
+            "entradas": EstatisticaHoraDB.entradas + stmt.excluded.entradas,
+            "saidas": EstatisticaHoraDB.saidas + stmt.excluded.saidas,
+            "faturamento": EstatisticaHoraDB.faturamento + stmt.excluded.faturamento,
+        },
+    )
+    db.execute(stmt)
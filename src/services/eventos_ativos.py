@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.evento import EventoDB
+
+EVENTOS_CACHE_TTL = float(os.getenv("EVENTOS_CACHE_TTL", "60"))
+
+
+class _Intervalos:
+    """Eventos de um estacionamento ordenados por início, com o maior fim acumulado."""
+
+    def __init__(self, eventos: List[Tuple[int, datetime, datetime, Optional[int]]], carregado_em: float):
+        eventos = sorted(eventos, key=lambda evento: (evento[1], evento[0]))
+        self.ids = [evento[0] for evento in eventos]
+        self.inicios = [evento[1] for evento in eventos]
+        self.fins = [evento[2] for evento in eventos]
+        self.admin_ids = [evento[3] for evento in eventos]
+        self.maior_fim = []
+        for fim in self.fins:
+            self.maior_fim.append(max(fim, self.maior_fim[-1]) if self.maior_fim else fim)
+        self.carregado_em = carregado_em
+
+    def evento_ativo(self, momento: datetime, admin_id: Optional[int]) -> Optional[int]:
+        encontrado = None
+        i = bisect_right(self.inicios, momento) - 1
+        while i >= 0 and self.maior_fim[i] >= momento:
+            if self.fins[i] >= momento and self.admin_ids[i] == admin_id:
+                if encontrado is None or self.ids[i] < encontrado:
+                    encontrado = self.ids[i]
+            i -= 1
+        return encontrado
+
+
+class IndiceEventos:
+    """
+    Índice em memória dos eventos de cada estacionamento, usado para classificar
+    entradas sem consultar o banco.
+
+    Os eventos de um estacionamento são carregados na primeira consulta e
+    descartados por `invalidar` (chamado pelas rotas de evento) ou após
+    EVENTOS_CACHE_TTL segundos, o que limita a defasagem entre workers.
+    """
+
+    def __init__(self, ttl: float = EVENTOS_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._intervalos: Dict[int, _Intervalos] = {}
+        self._versoes: Dict[int, int] = {}
+
+    def evento_ativo(self, db: Session, id_estacionamento: int, admin_id: Optional[int], momento: datetime) -> Optional[int]:
+        """Retorna o id do evento ativo em `momento`, ou None."""
+        return self._obter(db, id_estacionamento).evento_ativo(momento, admin_id)
+
+    def invalidar(self, id_estacionamento: Optional[int] = None) -> None:
+        with self._lock:
+            if id_estacionamento is None:
+                for id_atual in self._intervalos:
+                    self._versoes[id_atual] = self._versoes.get(id_atual, 0) + 1
+                self._intervalos.clear()
+            else:
+                self._versoes[id_estacionamento] = self._versoes.get(id_estacionamento, 0) + 1
+                self._intervalos.pop(id_estacionamento, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._intervalos.clear()
+            self._versoes.clear()
+
+    def _obter(self, db: Session, id_estacionamento: int) -> _Intervalos:
+        agora = time.monotonic()
+        with self._lock:
+            intervalos = self._intervalos.get(id_estacionamento)
+            versao = self._versoes.get(id_estacionamento, 0)
+        if intervalos is not None and agora - intervalos.carregado_em < self.ttl:
+            return intervalos
+
+        eventos = db.execute(
+            select(EventoDB.id, EventoDB.data_hora_inicio, EventoDB.data_hora_fim, EventoDB.admin_id)
+            .where(EventoDB.id_estacionamento == id_estacionamento)
+        ).all()
+        intervalos = _Intervalos([tuple(evento) for evento in eventos], agora)
+
+        with self._lock:
+            if self._versoes.get(id_estacionamento, 0) == versao:
+                self._intervalos[id_estacionamento] = intervalos
+        return intervalos
+
+
+indice_eventos = IndiceEventos()
@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.acesso import AcessoDB
+from src.models.estacionamento import EstacionamentoDB
+from src.models.faturamento import FaturamentoDB
+from src.models.faturamento_diario import SEM_EVENTO, FaturamentoDiarioDB, FaturamentoPeriodo, RelatorioFaturamento
+
+TAMANHO_LOTE_RECONSTRUCAO = 5000
+
+DIMENSOES = {
+    "estacionamento": FaturamentoDiarioDB.id_estacionamento,
+    "tipo_acesso": FaturamentoDiarioDB.tipo_acesso,
+    "evento": FaturamentoDiarioDB.id_evento,
+}
+
+Chave = Tuple[int, date, str, int]
+
+
+class _Totais:
+    __slots__ = ("quantidade", "valor")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.valor = 0.0
+
+
+def registrar_faturamentos(db: Session, faturamentos: Iterable[Tuple[int, datetime, str, Optional[int], float]]) -> None:
+    """
+    Soma faturamentos (id_estacionamento, data_faturamento, tipo_acesso, id_evento, valor)
+    ao faturamento diário, na transação corrente.
+    """
+    totais: Dict[Chave, _Totais] = defaultdict(_Totais)
+    for id_estacionamento, data_faturamento, tipo_acesso, id_evento, valor in faturamentos:
+        total = totais[(id_estacionamento, data_faturamento.date(), tipo_acesso, id_evento or SEM_EVENTO)]
+        total.quantidade += 1
+        total.valor += valor or 0.0
+    _somar(db, totais)
+
+
+def reconstruir_faturamento_diario(db: Session, id_estacionamento: Optional[int] = None) -> int:
+    """
+    Recalcula o faturamento diário a partir de `faturamento` e `acesso`, para
+    carga inicial ou correção. Não faz commit. Retorna quantas linhas foram gravadas.
+    """
+    totais: Dict[Chave, _Totais] = defaultdict(_Totais)
+
+    faturamento_query = select(
+        AcessoDB.id_estacionamento, FaturamentoDB.data_faturamento, AcessoDB.tipo_acesso, AcessoDB.id_evento, FaturamentoDB.valor
+    ).join(AcessoDB, FaturamentoDB.id_acesso == AcessoDB.id)
+    remover = delete(FaturamentoDiarioDB)
+    if id_estacionamento is not None:
+        faturamento_query = faturamento_query.where(AcessoDB.id_estacionamento == id_estacionamento)
+        remover = remover.where(FaturamentoDiarioDB.id_estacionamento == id_estacionamento)
+
+    for id_atual, data_faturamento, tipo_acesso, id_evento, valor in db.execute(
+        faturamento_query.execution_options(yield_per=TAMANHO_LOTE_RECONSTRUCAO)
+    ):
+        if data_faturamento is None:
+            continue
+        total = totais[(id_atual, data_faturamento.date(), tipo_acesso, id_evento or SEM_EVENTO)]
+        total.quantidade += 1
+        total.valor += valor or 0.0
+
+    db.execute(remover)
+    linhas = _linhas(totais)
+    if linhas:
+        db.execute(insert(FaturamentoDiarioDB), linhas)
+    db.flush()
+    return len(linhas)
+
+
+def relatorio(
+    db: Session,
+    admin_id: Optional[int],
+    inicio: date,
+    fim: date,
+    agrupamento: str,
+    dimensoes: Sequence[str],
+    id_estacionamento: Optional[int] = None
+) -> RelatorioFaturamento:
+    """
+    Faturamento em [inicio, fim) dos estacionamentos de `admin_id`, por
+    dia, semana (iniciada na segunda) ou mês, e pelas `dimensoes` pedidas.
+
+    O banco agrega por dia; a semana e o mês são montados aqui a partir
+    dessas linhas, o que mantém a consulta igual no PostgreSQL e no SQLite.
+    """
+    colunas = [DIMENSOES[dimensao] for dimensao in dimensoes]
+    query = select(
+        FaturamentoDiarioDB.dia, *colunas, func.sum(FaturamentoDiarioDB.quantidade), func.sum(FaturamentoDiarioDB.valor)
+    ).join(
+        EstacionamentoDB, FaturamentoDiarioDB.id_estacionamento == EstacionamentoDB.id
+    ).where(
+        EstacionamentoDB.admin_id == admin_id,
+        FaturamentoDiarioDB.dia >= inicio,
+        FaturamentoDiarioDB.dia < fim
+    ).group_by(FaturamentoDiarioDB.dia, *colunas)
+    if id_estacionamento is not None:
+        query = query.where(FaturamentoDiarioDB.id_estacionamento == id_estacionamento)
+
+    totais: Dict[tuple, _Totais] = defaultdict(_Totais)
+    for dia, *valores_dimensoes, quantidade, valor in db.execute(query):
+        total = totais[(_periodo(dia, agrupamento), *valores_dimensoes)]
+        total.quantidade += quantidade
+        total.valor += valor
+
+    itens = []
+    for (periodo, *valores_dimensoes), total in sorted(totais.items()):
+        campos = dict(zip(dimensoes, valores_dimensoes))
+        id_evento = campos.get("evento")
+        itens.append(FaturamentoPeriodo(
+            periodo=periodo,
+            id_estacionamento=campos.get("estacionamento"),
+            tipo_acesso=campos.get("tipo_acesso"),
+            id_evento=None if id_evento == SEM_EVENTO else id_evento,
+            quantidade=total.quantidade,
+            valor=round(total.valor, 2)
+        ))
+
+    return RelatorioFaturamento(
+        inicio=inicio,
+        fim=fim,
+        agrupamento=agrupamento,
+        quantidade=sum(item.quantidade for item in itens),
+        total=round(sum(total.valor for total in totais.values()), 2),
+        itens=itens
+    )
+
+
+def _periodo(dia: date, agrupamento: str) -> date:
+    if agrupamento == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if agrupamento == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+def _linhas(totais: Dict[Chave, _Totais]) -> List[dict]:
+    return [
+        {
+            "id_estacionamento": id_estacionamento,
+            "dia": dia,
+            "tipo_acesso": tipo_acesso,
+            "id_evento": id_evento,
+            "quantidade": total.quantidade,
+            "valor": total.valor,
+        }
+        for (id_estacionamento, dia, tipo_acesso, id_evento), total in sorted(totais.items())
+    ]
+
+
+def _somar(db: Session, totais: Dict[Chave, _Totais]) -> None:
+    """Incrementa as linhas com INSERT ... ON CONFLICT DO UPDATE, em ordem de chave para evitar deadlocks."""
+    linhas = _linhas(totais)
+    if not linhas:
+        return
+
+    dialeto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialeto.insert(FaturamentoDiarioDB).values(linhas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            FaturamentoDiarioDB.id_estacionamento, FaturamentoDiarioDB.dia,
+            FaturamentoDiarioDB.tipo_acesso, FaturamentoDiarioDB.id_evento
+        ],
+        set_={
+            "quantidade": FaturamentoDiarioDB.quantidade + stmt.excluded.quantidade,
+            "valor": FaturamentoDiarioDB.valor + stmt.excluded.valor,
+        },
+    )
+    db.execute(stmt)
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Set, Union
+
+
+@dataclass
+class Movimentacao:
+    """Entradas, saídas e faturamento de um commit em um estacionamento."""
+    entradas: int = 0
+    saidas: int = 0
+    faturamento: float = 0.0
+
+
+class _Fim:
+    pass
+
+
+FIM = _Fim()
+
+
+class Assinatura:
+    """Fila limitada de um assinante, ligada ao event loop em que foi criada."""
+
+    def __init__(self, chave: Hashable, maxsize: int):
+        self.chave = chave
+        self.loop = asyncio.get_running_loop()
+        self.fila: "asyncio.Queue[Union[bytes, _Fim]]" = asyncio.Queue(maxsize)
+        self.descartada = False
+
+    async def proxima(self, timeout: Optional[float] = None) -> Union[bytes, _Fim, None]:
+        """Próxima mensagem, FIM se a assinatura foi descartada, ou None após `timeout` segundos."""
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FeedOcupacao:
+    """
+    Pub/sub em memória, por estacionamento, para o feed ao vivo do dashboard.
+
+    Cada mensagem é serializada uma vez por quem publica e o mesmo `bytes` vai
+    para a fila de todos os assinantes. Um assinante cuja fila enche é
+    descartado: recebe FIM e deve reconectar. `publicar` pode ser chamado de
+    qualquer thread; a entrega sempre acontece no loop do assinante.
+    """
+
+    def __init__(self, maxsize_fila: int):
+        self.maxsize_fila = maxsize_fila
+        self.publicadas = 0
+        self.descartadas = 0
+        self._lock = threading.Lock()
+        self._assinaturas: Dict[Hashable, Set[Assinatura]] = defaultdict(set)
+
+    def assinar(self, chave: Hashable) -> Assinatura:
+        """Cria uma assinatura; deve ser chamado dentro do event loop que vai consumi-la."""
+        assinatura = Assinatura(chave, self.maxsize_fila)
+        with self._lock:
+            self._assinaturas[chave].add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.chave)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del self._assinaturas[assinatura.chave]
+
+    def tem_assinantes(self, chave: Hashable) -> bool:
+        with self._lock:
+            return chave in self._assinaturas
+
+    def publicar(self, chave: Hashable, mensagem: bytes) -> None:
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(chave, ()))
+            self.publicadas += 1
+        try:
+            loop_atual = asyncio.get_running_loop()
+        except RuntimeError:
+            loop_atual = None
+        for assinatura in assinaturas:
+            if assinatura.loop is loop_atual:
+                self._entregar(assinatura, mensagem)
+                continue
+            try:
+                assinatura.loop.call_soon_threadsafe(self._entregar, assinatura, mensagem)
+            except RuntimeError:
+                self.cancelar(assinatura)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._assinaturas.clear()
+            self.publicadas = 0
+            self.descartadas = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "estacionamentos": len(self._assinaturas),
+                "assinantes": sum(len(assinaturas) for assinaturas in self._assinaturas.values()),
+                "maxsize_fila": self.maxsize_fila,
+                "publicadas": self.publicadas,
+                "descartadas": self.descartadas,
+            }
+
+    def _entregar(self, assinatura: Assinatura, mensagem: bytes) -> None:
+        if assinatura.descartada:
+            return
+        try:
+            assinatura.fila.put_nowait(mensagem)
+        except asyncio.QueueFull:
+            self._descartar(assinatura)
+
+    def _descartar(self, assinatura: Assinatura) -> None:
+        self.cancelar(assinatura)
+        assinatura.descartada = True
+        while not assinatura.fila.empty():
+            assinatura.fila.get_nowait()
+        assinatura.fila.put_nowait(FIM)
+        with self._lock:
+            self.descartadas += 1
+
+
+def evento_sse(evento: str, dados: str) -> bytes:
+    """Formata uma mensagem server-sent events com uma única linha de dados."""
+    return f"event: {evento}\ndata: {dados}\n\n".encode()
+
+
+feed_ocupacao = FeedOcupacao(maxsize_fila=int(os.getenv("FEED_OCUPACAO_MAXSIZE_FILA", "32")))
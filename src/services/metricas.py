@@ -0,0 +1,328 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (100, 1000, 10000, 100000, 1000000, 10000000)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+SEM_ROTA = "<sem_rota>"
+
+# Uma mesma instrução executada mais vezes que isso numa requisição é
+# registrada no log como provável N+1.
+LIMITE_REPETICOES_SQL = int(os.getenv("SQL_REPETICOES_LIMITE", "5"))
+# Requisições com mais consultas que isso geram um aviso no log.
+ORCAMENTO_CONSULTAS_SQL = int(os.getenv("SQL_ORCAMENTO_CONSULTAS", "50"))
+# Devolve X-Consultas-SQL, X-Tempo-SQL-ms e X-Consultas-SQL-Repetidas nas respostas.
+CABECALHOS_DEBUG_SQL = os.getenv("SQL_DEBUG_HEADERS", "false").strip().lower() in ("1", "true", "yes", "on")
+
+logger = logging.getLogger(__name__)
+
+Serie = Tuple[str, Tuple[str, ...]]
+
+
+class _Shard:
+    """Séries de uma única thread; só essa thread escreve nelas, então não há lock na gravação."""
+    __slots__ = ("contadores", "histogramas")
+
+    def __init__(self):
+        self.contadores: Dict[Serie, float] = {}
+        self.histogramas: Dict[Serie, List[float]] = {}
+
+
+class Metricas:
+    """
+    Registro de métricas em memória, exportado no formato texto do Prometheus.
+
+    Cada thread grava no próprio shard, sem lock: o caminho quente é um
+    lookup em dict e alguns incrementos. O lock só é usado para registrar um
+    shard novo e na exportação, que soma os shards de todas as threads. A
+    cópia dos shards durante a exportação pode perder uma gravação em curso,
+    o que é aceitável para métricas.
+
+    Quando uma thread termina (as do threadpool do anyio são criadas e
+    descartadas ao longo do tempo), o shard dela é somado a um shard único de
+    threads encerradas e sai da lista, que assim acompanha só as threads vivas.
+    """
+
+    def __init__(self):
+        self._definicoes: Dict[str, Tuple[str, str, Tuple[str, ...], Optional[Sequence[float]]]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[_Shard] = []
+        self._encerradas = _Shard()
+
+    def contador(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()) -> None:
+        self._definicoes[nome] = ("counter", ajuda, rotulos, None)
+
+    def gauge(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()) -> None:
+        self._definicoes[nome] = ("gauge", ajuda, rotulos, None)
+
+    def histograma(self, nome: str, ajuda: str, buckets: Sequence[float], rotulos: Tuple[str, ...] = ()) -> None:
+        self._definicoes[nome] = ("histogram", ajuda, rotulos, tuple(buckets))
+
+    def incrementar(self, nome: str, rotulos: Tuple[str, ...] = (), valor: float = 1) -> None:
+        contadores = self._shard().contadores
+        chave = (nome, rotulos)
+        contadores[chave] = contadores.get(chave, 0) + valor
+
+    def observar(self, nome: str, valor: float, rotulos: Tuple[str, ...] = ()) -> None:
+        histogramas = self._shard().histogramas
+        chave = (nome, rotulos)
+        contagens = histogramas.get(chave)
+        buckets = self._definicoes[nome][3]
+        if contagens is None:
+            # Um contador por bucket, mais +Inf, soma e total.
+            contagens = histogramas[chave] = [0] * (len(buckets) + 3)
+        contagens[bisect_left(buckets, valor)] += 1
+        contagens[-2] += valor
+        contagens[-1] += 1
+
+    def exportar(self) -> str:
+        contadores: Dict[Serie, float] = {}
+        histogramas: Dict[Serie, List[float]] = {}
+        with self._lock:
+            shards = list(self._shards)
+            encerradas = _Shard()
+            encerradas.contadores = dict(self._encerradas.contadores)
+            encerradas.histogramas = dict(self._encerradas.histogramas)
+        for shard in (encerradas, *shards):
+            for chave, valor in list(shard.contadores.items()):
+                contadores[chave] = contadores.get(chave, 0) + valor
+            for chave, contagens in list(shard.histogramas.items()):
+                contagens = list(contagens)
+                acumulado = histogramas.get(chave)
+                histogramas[chave] = contagens if acumulado is None else [a + b for a, b in zip(acumulado, contagens)]
+
+        linhas = []
+        for nome, (tipo, ajuda, nomes_rotulos, buckets) in self._definicoes.items():
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            if tipo == "histogram":
+                for (nome_serie, rotulos), contagens in sorted(histogramas.items()):
+                    if nome_serie != nome:
+                        continue
+                    base = _rotulos(nomes_rotulos, rotulos)
+                    acumulado = 0
+                    for limite, contagem in zip((*buckets, float("inf")), contagens):
+                        acumulado += contagem
+                        linhas.append(f'{nome}_bucket{_com_le(base, limite)} {_numero(acumulado)}')
+                    linhas.append(f"{nome}_sum{base} {_numero(contagens[-2])}")
+                    linhas.append(f"{nome}_count{base} {_numero(contagens[-1])}")
+            else:
+                for (nome_serie, rotulos), valor in sorted(contadores.items()):
+                    if nome_serie == nome:
+                        linhas.append(f"{nome}{_rotulos(nomes_rotulos, rotulos)} {_numero(valor)}")
+        return "\n".join(linhas) + "\n"
+
+    def limpar(self) -> None:
+        with self._lock:
+            for shard in (self._encerradas, *self._shards):
+                shard.contadores.clear()
+                shard.histogramas.clear()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            # O threading.local descarta os valores da thread quando ela
+            # termina; o marcador coletado nesse momento aposenta o shard.
+            self._local.marcador = marcador = _Marcador()
+            weakref.finalize(marcador, self._aposentar, shard).atexit = False
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _aposentar(self, shard: _Shard) -> None:
+        with self._lock:
+            self._shards.remove(shard)
+            contadores = self._encerradas.contadores
+            for chave, valor in shard.contadores.items():
+                contadores[chave] = contadores.get(chave, 0) + valor
+            histogramas = self._encerradas.histogramas
+            for chave, contagens in shard.histogramas.items():
+                acumulado = histogramas.get(chave)
+                # Listas novas, não somadas no lugar: a exportação lê cópias rasas destes dicts.
+                histogramas[chave] = list(contagens) if acumulado is None else [a + b for a, b in zip(acumulado, contagens)]
+
+
+class _Marcador:
+    __slots__ = ("__weakref__",)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(nomes: Tuple[str, ...], valores: Tuple[str, ...]) -> str:
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores)) + "}"
+
+
+def _com_le(base: str, limite: float) -> str:
+    le = f'le="{"+Inf" if limite == float("inf") else _numero(limite)}"'
+    return "{" + le + "}" if not base else base[:-1] + "," + le + "}"
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+class ConsultasRequisicao:
+    """
+    Consultas SQL feitas durante uma requisição, acumuladas pelos eventos do
+    SQLAlchemy. O texto da instrução, com os parâmetros ainda separados, é a
+    assinatura usada para achar repetições: um N+1 aparece como a mesma
+    instrução executada uma vez por item.
+    """
+    __slots__ = ("quantidade", "tempo", "execucoes")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.tempo = 0.0
+        self.execucoes: Dict[str, int] = {}
+
+    def registrar(self, instrucao: str, duracao: float) -> None:
+        self.quantidade += 1
+        self.tempo += duracao
+        self.execucoes[instrucao] = self.execucoes.get(instrucao, 0) + 1
+
+    def repetidas(self, limite: int = 1) -> List[Tuple[str, int]]:
+        """Instruções executadas mais de `limite` vezes, da mais repetida para a menos."""
+        return sorted(
+            ((instrucao, vezes) for instrucao, vezes in self.execucoes.items() if vezes > limite),
+            key=lambda item: -item[1]
+        )
+
+
+# A requisição corrente; o contexto é copiado para o threadpool das rotas
+# síncronas, então as consultas feitas lá também são contadas.
+consultas_requisicao: ContextVar[Optional[ConsultasRequisicao]] = ContextVar("consultas_requisicao", default=None)
+
+metricas = Metricas()
+metricas.contador("http_requisicoes_total", "Requisições HTTP concluídas.", ("metodo", "rota", "status"))
+metricas.histograma(
+    "http_requisicao_duracao_segundos", "Latência das requisições HTTP.", BUCKETS_SEGUNDOS, ("metodo", "rota")
+)
+metricas.histograma(
+    "http_resposta_tamanho_bytes", "Tamanho do corpo das respostas HTTP.", BUCKETS_BYTES, ("metodo", "rota")
+)
+metricas.gauge("http_requisicoes_em_andamento", "Requisições HTTP em andamento.", ("metodo",))
+metricas.histograma(
+    "db_consultas_por_requisicao", "Consultas SQL executadas por requisição.", BUCKETS_CONSULTAS, ("metodo", "rota")
+)
+metricas.histograma(
+    "db_tempo_por_requisicao_segundos", "Tempo gasto no banco por requisição.", BUCKETS_SEGUNDOS, ("metodo", "rota")
+)
+metricas.contador(
+    "db_consultas_repetidas_total", "Requisições com instruções SQL repetidas além do limite (provável N+1).",
+    ("metodo", "rota")
+)
+metricas.contador("db_consultas_total", "Consultas SQL executadas.")
+metricas.histograma("db_consulta_duracao_segundos", "Duração de cada consulta SQL.", BUCKETS_SEGUNDOS)
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mede cada requisição HTTP por rota (o caminho com
+    parâmetros, como /api/acessos/{id}), não pela URL, para manter a
+    quantidade de séries limitada. Requisições que não casam com nenhuma
+    rota são agrupadas em SEM_ROTA.
+
+    A rota só é conhecida depois do roteamento, então as requisições em
+    andamento são contadas apenas por método.
+
+    Ao fim de cada requisição, instruções repetidas mais de
+    LIMITE_REPETICOES_SQL vezes e requisições acima de ORCAMENTO_CONSULTAS_SQL
+    consultas são registradas no log. Com CABECALHOS_DEBUG_SQL, as contagens
+    vão nos cabeçalhos da resposta; consultas feitas depois do início do corpo
+    (em respostas em streaming) ficam de fora deles.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        resposta = {"status": 500, "bytes": 0}
+
+        async def send_medido(message):
+            if message["type"] == "http.response.start":
+                resposta["status"] = message["status"]
+                if CABECALHOS_DEBUG_SQL:
+                    message = {**message, "headers": [*message.get("headers", []), *_cabecalhos_sql(consultas)]}
+            elif message["type"] == "http.response.body":
+                resposta["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        consultas = ConsultasRequisicao()
+        token = consultas_requisicao.set(consultas)
+        metricas.incrementar("http_requisicoes_em_andamento", (metodo,))
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_medido)
+        finally:
+            duracao = time.perf_counter() - inicio
+            consultas_requisicao.reset(token)
+            metricas.incrementar("http_requisicoes_em_andamento", (metodo,), -1)
+            rota = scope.get("route")
+            rotulos = (metodo, getattr(rota, "path", SEM_ROTA))
+            metricas.incrementar("http_requisicoes_total", (*rotulos, str(resposta["status"])))
+            metricas.observar("http_requisicao_duracao_segundos", duracao, rotulos)
+            metricas.observar("http_resposta_tamanho_bytes", resposta["bytes"], rotulos)
+            metricas.observar("db_consultas_por_requisicao", consultas.quantidade, rotulos)
+            metricas.observar("db_tempo_por_requisicao_segundos", consultas.tempo, rotulos)
+            _verificar_consultas(consultas, rotulos)
+
+
+def _cabecalhos_sql(consultas: ConsultasRequisicao) -> List[Tuple[bytes, bytes]]:
+    return [
+        (b"x-consultas-sql", str(consultas.quantidade).encode()),
+        (b"x-tempo-sql-ms", f"{consultas.tempo * 1000:.3f}".encode()),
+        (b"x-consultas-sql-repetidas", str(len(consultas.repetidas())).encode()),
+    ]
+
+
+def _verificar_consultas(consultas: ConsultasRequisicao, rotulos: Tuple[str, str]) -> None:
+    metodo, rota = rotulos
+    if consultas.quantidade > ORCAMENTO_CONSULTAS_SQL:
+        logger.warning(
+            "%s %s fez %d consultas SQL (orçamento: %d).", metodo, rota, consultas.quantidade, ORCAMENTO_CONSULTAS_SQL
+        )
+    repetidas = consultas.repetidas(LIMITE_REPETICOES_SQL)
+    if repetidas:
+        metricas.incrementar("db_consultas_repetidas_total", rotulos)
+        for instrucao, vezes in repetidas:
+            logger.warning("Possível N+1 em %s %s: %d execuções de %s", metodo, rota, vezes, " ".join(instrucao.split()))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_consulta(_conn, _cursor, _statement, _parameters, context, _executemany):
+    if context is not None:
+        context._inicio_metricas = time.perf_counter()  # pylint: disable=protected-access
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_consulta(_conn, _cursor, statement, _parameters, context, _executemany):
+    inicio = getattr(context, "_inicio_metricas", None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    metricas.incrementar("db_consultas_total")
+    metricas.observar("db_consulta_duracao_segundos", duracao)
+    consultas = consultas_requisicao.get()
+    if consultas is not None:
+        consultas.registrar(statement, duracao)
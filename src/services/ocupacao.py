@@ -0,0 +1,142 @@
+from typing import Dict, Optional
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models.acesso import AcessoDB
+from src.models.estacionamento import EstacionamentoDB
+from src.models.ocupacao import OcupacaoDB
+
+
+def reservar_vagas(db: Session, id_estacionamento: int, total_vagas: int, quantidade: int = 1) -> bool:
+    """
+    Ocupa `quantidade` vagas de forma atômica, na transação corrente.
+
+    O UPDATE condicional trava a linha do contador, então duas entradas
+    concorrentes nunca ultrapassam `total_vagas`. Retorna False se não houver
+    vagas suficientes.
+    """
+    if _incrementar(db, id_estacionamento, total_vagas, quantidade):
+        return True
+
+    if db.get(OcupacaoDB, id_estacionamento) is None:
+        criar_contador(db, id_estacionamento)
+        return _incrementar(db, id_estacionamento, total_vagas, quantidade)
+
+    return False
+
+
+def reservar_ate(db: Session, id_estacionamento: int, total_vagas: int, quantidade: int) -> int:
+    """
+    Ocupa até `quantidade` vagas, limitado às vagas livres, na transação corrente.
+
+    Trava a linha do contador durante a leitura. Retorna quantas vagas foram ocupadas.
+    """
+    contador_query = select(OcupacaoDB.vagas_ocupadas).where(
+        OcupacaoDB.id_estacionamento == id_estacionamento
+    ).with_for_update()
+    vagas_ocupadas = db.execute(contador_query).scalar()
+    if vagas_ocupadas is None:
+        criar_contador(db, id_estacionamento)
+        vagas_ocupadas = db.execute(contador_query).scalar()
+
+    reservadas = min(quantidade, max(total_vagas - vagas_ocupadas, 0))
+    if reservadas > 0:
+        db.execute(
+            update(OcupacaoDB)
+            .where(OcupacaoDB.id_estacionamento == id_estacionamento)
+            .values(vagas_ocupadas=OcupacaoDB.vagas_ocupadas + reservadas)
+            .execution_options(synchronize_session=False)
+        )
+    return reservadas
+
+
+def liberar_vagas(db: Session, id_estacionamento: int, quantidade: int = 1) -> None:
+    """Libera `quantidade` vagas na transação corrente, sem deixar o contador negativo."""
+    db.execute(
+        update(OcupacaoDB)
+        .where(OcupacaoDB.id_estacionamento == id_estacionamento)
+        .values(vagas_ocupadas=case(
+            (OcupacaoDB.vagas_ocupadas > quantidade, OcupacaoDB.vagas_ocupadas - quantidade),
+            else_=0
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def obter_vagas_ocupadas(db: Session, id_estacionamento: int) -> int:
+    """Lê o contador sem criá-lo, para que funcione também em réplicas somente leitura."""
+    vagas_ocupadas = db.execute(
+        select(OcupacaoDB.vagas_ocupadas).where(OcupacaoDB.id_estacionamento == id_estacionamento)
+    ).scalar()
+    if vagas_ocupadas is None:
+        return _contar_acessos_abertos(db, id_estacionamento).get(id_estacionamento, 0)
+    return vagas_ocupadas
+
+
+def criar_contador(db: Session, id_estacionamento: int) -> int:
+    """
+    Cria o contador de um estacionamento a partir dos acessos em aberto.
+
+    Usado para estacionamentos anteriores ao contador. Se outra transação
+    criar a mesma linha ao mesmo tempo, o valor dela prevalece.
+    """
+    vagas_ocupadas = _contar_acessos_abertos(db, id_estacionamento).get(id_estacionamento, 0)
+    try:
+        with db.begin_nested():
+            db.add(OcupacaoDB(id_estacionamento=id_estacionamento, vagas_ocupadas=vagas_ocupadas))
+    except IntegrityError:
+        pass
+    return vagas_ocupadas
+
+
+def reconciliar_ocupacao(db: Session, id_estacionamento: Optional[int] = None) -> Dict[int, int]:
+    """
+    Reconstrói os contadores a partir dos acessos sem `hora_saida`.
+
+    Trava os contadores existentes antes da contagem para que entradas e saídas
+    concorrentes esperem a reconciliação. Não faz commit.
+    """
+    estacionamentos_query = select(EstacionamentoDB.id)
+    if id_estacionamento is not None:
+        estacionamentos_query = estacionamentos_query.where(EstacionamentoDB.id == id_estacionamento)
+    ids_estacionamento = db.execute(estacionamentos_query).scalars().all()
+
+    contadores_query = select(OcupacaoDB).where(OcupacaoDB.id_estacionamento.in_(ids_estacionamento)).with_for_update()
+    contadores = {contador.id_estacionamento: contador for contador in db.execute(contadores_query).scalars()}
+
+    abertos = _contar_acessos_abertos(db, id_estacionamento)
+
+    resultado = {}
+    for id_atual in ids_estacionamento:
+        vagas_ocupadas = abertos.get(id_atual, 0)
+        contador = contadores.get(id_atual)
+        if contador is None:
+            db.add(OcupacaoDB(id_estacionamento=id_atual, vagas_ocupadas=vagas_ocupadas))
+        else:
+            contador.vagas_ocupadas = vagas_ocupadas
+        resultado[id_atual] = vagas_ocupadas
+
+    db.flush()
+    return resultado
+
+
+def _incrementar(db: Session, id_estacionamento: int, total_vagas: int, quantidade: int) -> bool:
+    result = db.execute(
+        update(OcupacaoDB)
+        .where(
+            OcupacaoDB.id_estacionamento == id_estacionamento,
+            OcupacaoDB.vagas_ocupadas + quantidade <= total_vagas
+        )
+        .values(vagas_ocupadas=OcupacaoDB.vagas_ocupadas + quantidade)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def _contar_acessos_abertos(db: Session, id_estacionamento: Optional[int] = None) -> Dict[int, int]:
+    query = select(AcessoDB.id_estacionamento, func.count(AcessoDB.id)).where(AcessoDB.hora_saida.is_(None))
+    if id_estacionamento is not None:
+        query = query.where(AcessoDB.id_estacionamento == id_estacionamento)
+    query = query.group_by(AcessoDB.id_estacionamento)
+    return dict(db.execute(query).all())
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+import src.database
+from src.services.config_estacionamento import aquecer_configs
+
+logger = logging.getLogger(__name__)
+
+
+class Prontidao:
+    """
+    Prepara a aplicação em segundo plano, sem segurar o lifespan: espera o
+    banco com backoff exponencial e depois aquece os caches. /ready responde
+    503 até as duas etapas terminarem; /health continua respondendo durante
+    todo o processo.
+
+    O tempo de partida é medido do `iniciar` até a aplicação ficar pronta e
+    comparado com `orcamento` segundos; estourar o orçamento gera um aviso no log.
+    """
+
+    def __init__(self, atraso_inicial: float, atraso_maximo: float, orcamento: float):
+        self.atraso_inicial = atraso_inicial
+        self.atraso_maximo = atraso_maximo
+        self.orcamento = orcamento
+        self.banco = False
+        self.caches = False
+        self.tentativas = 0
+        self.ultimo_erro: Optional[str] = None
+        self.estacionamentos_aquecidos = 0
+        self.tempo_partida: Optional[float] = None
+        self._inicio: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pronto(self) -> bool:
+        return self.banco and self.caches
+
+    def iniciar(self) -> None:
+        self._reiniciar()
+        self._inicio = time.perf_counter()
+        self._task = asyncio.create_task(self._preparar())
+
+    async def encerrar(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def aguardar(self) -> None:
+        """Espera a preparação terminar; usado por scripts e testes."""
+        if self._task is not None:
+            await self._task
+
+    def stats(self) -> Dict[str, Any]:
+        decorrido = None
+        if self._inicio is not None:
+            decorrido = self.tempo_partida if self.tempo_partida is not None else time.perf_counter() - self._inicio
+        return {
+            "pronto": self.pronto,
+            "banco": self.banco,
+            "caches": self.caches,
+            "tentativas": self.tentativas,
+            "ultimo_erro": self.ultimo_erro,
+            "estacionamentos_aquecidos": self.estacionamentos_aquecidos,
+            "tempo_partida_s": None if decorrido is None else round(decorrido, 3),
+            "orcamento_s": self.orcamento,
+        }
+
+    async def _preparar(self) -> None:
+        await self._esperar_banco()
+        try:
+            async with src.database.AsyncSessionLocal() as db:
+                self.estacionamentos_aquecidos = await db.run_sync(aquecer_configs)
+        except Exception as e:  # pylint: disable=broad-except
+            # Cache frio só custa latência nas primeiras requisições; não impede a prontidão.
+            logger.warning("Falha ao aquecer os caches: %s", e)
+        self.caches = True
+
+        self.tempo_partida = time.perf_counter() - self._inicio
+        if self.tempo_partida > self.orcamento:
+            logger.warning(
+                "Partida levou %.2fs, acima do orçamento de %.2fs (%d tentativas de conexão).",
+                self.tempo_partida, self.orcamento, self.tentativas
+            )
+        else:
+            logger.info("Aplicação pronta em %.2fs.", self.tempo_partida)
+
+    async def _esperar_banco(self) -> None:
+        atraso = self.atraso_inicial
+        while True:
+            self.tentativas += 1
+            try:
+                async with src.database.async_engine.connect() as conexao:
+                    await conexao.execute(text("SELECT 1"))
+            except Exception as e:  # pylint: disable=broad-except
+                self.ultimo_erro = str(e)
+                logger.warning("Banco indisponível (tentativa %d), nova tentativa em %.1fs: %s", self.tentativas, atraso, e)
+                await asyncio.sleep(atraso)
+                atraso = min(atraso * 2, self.atraso_maximo)
+                continue
+            self.banco = True
+            self.ultimo_erro = None
+            return
+
+    def _reiniciar(self) -> None:
+        self.banco = False
+        self.caches = False
+        self.tentativas = 0
+        self.ultimo_erro = None
+        self.estacionamentos_aquecidos = 0
+        self.tempo_partida = None
+
+
+def esperar_banco_sync(engine, atraso_inicial: float, atraso_maximo: float) -> int:
+    """
+    Versão síncrona da espera da prontidão, para comandos que rodam antes da
+    API (como `migrar`): tenta conectar com o mesmo backoff exponencial até o
+    banco responder. Retorna quantas tentativas foram necessárias.
+    """
+    atraso = atraso_inicial
+    tentativas = 0
+    while True:
+        tentativas += 1
+        try:
+            with engine.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+            return tentativas
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning("Banco indisponível (tentativa %d), nova tentativa em %.1fs: %s", tentativas, atraso, e)
+            time.sleep(atraso)
+            atraso = min(atraso * 2, atraso_maximo)
+
+
+prontidao = Prontidao(
+    atraso_inicial=float(os.getenv("DB_WAIT_INITIAL_DELAY", "0.5")),
+    atraso_maximo=float(os.getenv("DB_WAIT_MAX_DELAY", "10")),
+    orcamento=float(os.getenv("STARTUP_BUDGET_SECONDS", "10")),
+)
@@ -0,0 +1,142 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src import security
+
+
+class PoolSenhasOcupado(Exception):
+    """A fila do pool de senhas está cheia ou a operação excedeu o timeout."""
+
+
+class PoolSenhas:
+    """
+    Executa hash e verificação argon2 em um pool de processos dedicado.
+
+    No máximo `tamanho + limite_fila` operações ficam pendentes; além disso,
+    novas chamadas falham na hora com PoolSenhasOcupado, em vez de acumular
+    logins que o cliente já teria abandonado. Com `tamanho` 0 o argon2 roda
+    na própria thread, sem processos (útil em desenvolvimento).
+    """
+
+    def __init__(self, tamanho: int, limite_fila: int, timeout: float, timeout_lote: float = 120):
+        self.tamanho = tamanho
+        self.limite_fila = limite_fila
+        self.timeout = timeout
+        self.timeout_lote = timeout_lote
+        self.em_andamento = 0
+        self.rejeitadas = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def verificar(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.executar(security.verify_password, plain_password, hashed_password)
+
+    async def gerar_hash(self, password: str) -> str:
+        return await self.executar(security.get_password_hash, password)
+
+    async def gerar_hashes(self, passwords: List[str]) -> List[str]:
+        """
+        Gera muitos hashes, uma senha por tarefa, com no máximo `tamanho - 1`
+        tarefas no pool ao mesmo tempo: sobra sempre um processo para os
+        logins, que também não esperam atrás do lote inteiro na fila. Cada
+        senha ocupa sua própria vaga e tem o timeout normal; o lote todo é
+        limitado por `timeout_lote`.
+        """
+        if not passwords:
+            return []
+        if self.tamanho == 0:
+            return [await self.gerar_hash(password) for password in passwords]
+        semaforo = asyncio.Semaphore(max(self.tamanho - 1, 1))
+
+        async def gerar(password: str) -> str:
+            async with semaforo:
+                return await self.gerar_hash(password)
+
+        try:
+            return await asyncio.wait_for(asyncio.gather(*(gerar(password) for password in passwords)), self.timeout_lote)
+        except asyncio.TimeoutError as exc:
+            self._contar_timeout()
+            raise PoolSenhasOcupado("Tempo esgotado ao gerar as senhas do lote.") from exc
+
+    def gerar_hash_sync(self, password: str) -> str:
+        """Para rotas síncronas, que já rodam no threadpool: bloqueia só a thread atual."""
+        return self.executar_sync(security.get_password_hash, password)
+
+    async def executar(self, funcao: Callable, *args, timeout: Optional[float] = None) -> Any:
+        if self.tamanho == 0:
+            return await asyncio.to_thread(funcao, *args)
+        future = self._submeter(funcao, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError as exc:
+            self._contar_timeout()
+            raise PoolSenhasOcupado("Tempo esgotado no pool de senhas.") from exc
+
+    def executar_sync(self, funcao: Callable, *args) -> Any:
+        if self.tamanho == 0:
+            return funcao(*args)
+        future = self._submeter(funcao, *args)
+        try:
+            return future.result(self.timeout)
+        except concurrent.futures.TimeoutError as exc:
+            future.cancel()
+            self._contar_timeout()
+            raise PoolSenhasOcupado("Tempo esgotado no pool de senhas.") from exc
+
+    def encerrar(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tamanho": self.tamanho,
+                "limite_fila": self.limite_fila,
+                "timeout": self.timeout,
+                "timeout_lote": self.timeout_lote,
+                "em_andamento": self.em_andamento,
+                "rejeitadas": self.rejeitadas,
+                "timeouts": self.timeouts,
+            }
+
+    def _submeter(self, funcao: Callable, *args) -> concurrent.futures.Future:
+        with self._lock:
+            if self.em_andamento >= self.tamanho + self.limite_fila:
+                self.rejeitadas += 1
+                raise PoolSenhasOcupado("Fila do pool de senhas cheia.")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.tamanho)
+            self.em_andamento += 1
+            executor = self._executor
+        try:
+            future = executor.submit(funcao, *args)
+        except BaseException:
+            self._concluir(None)
+            raise
+        # A vaga só é liberada quando o processo termina, mesmo após um timeout,
+        # para que o limite reflita o trabalho real em andamento.
+        future.add_done_callback(self._concluir)
+        return future
+
+    def _concluir(self, _future: Optional[concurrent.futures.Future]) -> None:
+        with self._lock:
+            self.em_andamento -= 1
+
+    def _contar_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+
+pool_senhas = PoolSenhas(
+    tamanho=int(os.getenv("PASSWORD_POOL_SIZE", str(os.cpu_count() or 1))),
+    limite_fila=int(os.getenv("PASSWORD_POOL_QUEUE", "64")),
+    timeout=float(os.getenv("PASSWORD_POOL_TIMEOUT", "10")),
+    timeout_lote=float(os.getenv("PASSWORD_POOL_BATCH_TIMEOUT", "120")),
+)
@@ -0,0 +1,218 @@
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.models.estacionamento import EstacionamentoDB
+from src.models.evento import EventoDB
+from src.services.config_estacionamento import EstacionamentoConfig
+
+MODO_HORA = 'hora'
+MODO_HORA_EVENTO = 'hora_evento'
+MODO_EVENTO = 'evento'
+MODO_ISENTO = 'isento'
+
+_CODIGOS_MODO = {MODO_HORA: 0, MODO_HORA_EVENTO: 1, MODO_EVENTO: 2, MODO_ISENTO: 3}
+
+
+@dataclass(frozen=True)
+class PlanoTarifario:
+    """
+    Tarifa já convertida para float de um acesso.
+
+    - MODO_HORA: primeira hora + demais horas, virando diária após 24h.
+    - MODO_HORA_EVENTO: acesso de evento sem valor único; cobra por hora, sem diária.
+    - MODO_EVENTO: valor único do evento.
+    - MODO_ISENTO: nada a cobrar, mantém o tipo de acesso original.
+    """
+    modo: str
+    valor_primeira_hora: float = 0.0
+    valor_demais_horas: float = 0.0
+    valor_diaria: float = 0.0
+    valor_evento: float = 0.0
+    tipo_acesso: str = 'hora'
+
+
+def compilar_plano(
+    estacionamento: Union[EstacionamentoConfig, EstacionamentoDB],
+    tipo_acesso: str,
+    id_evento: Optional[int] = None,
+    evento: Optional[EventoDB] = None
+) -> PlanoTarifario:
+    """Monta o plano tarifário de um acesso. Planos iguais são compartilhados."""
+    return _compilar_plano(
+        estacionamento.valor_primeira_hora,
+        estacionamento.valor_demais_horas,
+        estacionamento.valor_diaria,
+        tipo_acesso,
+        bool(id_evento),
+        evento.valor_acesso_unico if evento is not None else None
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compilar_plano(valor_primeira_hora, valor_demais_horas, valor_diaria, tipo_acesso, possui_evento, valor_evento) -> PlanoTarifario:
+    tarifas = {
+        "valor_primeira_hora": _to_float(valor_primeira_hora),
+        "valor_demais_horas": _to_float(valor_demais_horas),
+        "valor_diaria": _to_float(valor_diaria),
+    }
+
+    if tipo_acesso == 'evento' and possui_evento:
+        if valor_evento is not None:
+            return PlanoTarifario(modo=MODO_EVENTO, valor_evento=float(valor_evento), tipo_acesso='evento')
+        return PlanoTarifario(modo=MODO_HORA_EVENTO, **tarifas)
+
+    if tipo_acesso == 'hora':
+        return PlanoTarifario(modo=MODO_HORA, **tarifas)
+
+    return PlanoTarifario(modo=MODO_ISENTO, tipo_acesso=tipo_acesso)
+
+
+def price(entrada: datetime, saida: datetime, plano: PlanoTarifario) -> Tuple[float, str]:
+    """Calcula o valor de uma permanência. Retorna (valor, tipo_acesso final)."""
+    if plano.modo == MODO_EVENTO:
+        return round(plano.valor_evento, 2), 'evento'
+
+    if plano.modo == MODO_ISENTO:
+        return 0.0, plano.tipo_acesso
+
+    total_seconds = (saida - entrada).total_seconds()
+
+    if plano.modo == MODO_HORA_EVENTO:
+        total_minutes = total_seconds / 60
+        if total_minutes <= 60:
+            return round(plano.valor_primeira_hora, 2), 'hora'
+
+        hours_to_charge = total_minutes / 60
+        if total_minutes % 60 > 0:
+            hours_to_charge = int(hours_to_charge) + 1
+        return round(_valor_horas(hours_to_charge, plano), 2), 'hora'
+
+    total_hours = total_seconds / 3600
+    if total_hours <= 24:
+        if total_hours <= 1:
+            return round(plano.valor_primeira_hora, 2), 'hora'
+
+        hours_to_charge = total_hours
+        if total_hours % 1 > 0:
+            hours_to_charge = int(total_hours) + 1
+        return round(_valor_horas(hours_to_charge, plano), 2), 'hora'
+
+    hours_rounded_up = int(total_seconds / 3600)
+    if total_seconds % 3600 > 0:
+        hours_rounded_up += 1
+
+    full_days = hours_rounded_up // 24
+    remaining_hours_after_days = hours_rounded_up % 24
+
+    valor_total = full_days * plano.valor_diaria
+    if remaining_hours_after_days > 0:
+        if remaining_hours_after_days == 1:
+            valor_total += plano.valor_primeira_hora
+        else:
+            valor_total += plano.valor_primeira_hora + (remaining_hours_after_days - 1) * plano.valor_demais_horas
+    return round(valor_total, 2), 'diaria'
+
+
+def price_many(
+    entradas: Sequence[datetime],
+    saidas: Sequence[datetime],
+    planos: Sequence[PlanoTarifario]
+) -> Tuple[List[float], List[str]]:
+    """
+    Versão vetorizada de `price` para muitas permanências de uma vez.
+
+    Aceita listas de datetime ou arrays datetime64 e reproduz `price`
+    exatamente: as mesmas operações em float64, e o arredondamento final só
+    recorre ao `round` do Python nos valores próximos de um empate.
+    """
+    if len(entradas) == 0:
+        return [], []
+
+    indices_planos = {}
+    planos_unicos = []
+    posicoes = np.empty(len(planos), dtype=np.int64)
+    for i, plano in enumerate(planos):
+        indice = indices_planos.get(id(plano))
+        if indice is None:
+            indice = indices_planos[id(plano)] = len(planos_unicos)
+            planos_unicos.append(plano)
+        posicoes[i] = indice
+
+    modo = np.array([_CODIGOS_MODO[p.modo] for p in planos_unicos])[posicoes]
+    primeira = np.array([p.valor_primeira_hora for p in planos_unicos])[posicoes]
+    demais = np.array([p.valor_demais_horas for p in planos_unicos])[posicoes]
+    diaria = np.array([p.valor_diaria for p in planos_unicos])[posicoes]
+    evento = np.array([p.valor_evento for p in planos_unicos])[posicoes]
+    tipo_isento = np.array([p.tipo_acesso for p in planos_unicos], dtype=object)[posicoes]
+
+    total_seconds = _total_seconds(entradas, saidas)
+
+    total_hours = total_seconds / 3600
+    horas_cobradas = np.where(total_hours % 1 > 0, np.floor(total_hours) + 1, total_hours)
+    valor_hora = np.where(total_hours <= 1, primeira, _valores_horas(horas_cobradas, primeira, demais))
+
+    hours_rounded_up = np.floor(total_seconds / 3600) + (total_seconds % 3600 > 0)
+    full_days = hours_rounded_up // 24
+    remaining = hours_rounded_up % 24
+    valor_diaria = full_days * diaria + np.where(
+        remaining == 0,
+        0.0,
+        np.where(remaining == 1, primeira, primeira + (remaining - 1) * demais)
+    )
+
+    total_minutes = total_seconds / 60
+    horas_evento = np.where(total_minutes % 60 > 0, np.floor(total_minutes / 60) + 1, total_minutes / 60)
+    valor_hora_evento = np.where(total_minutes <= 60, primeira, _valores_horas(horas_evento, primeira, demais))
+
+    diaria_aplicada = total_hours > 24
+    valores = np.select(
+        [modo == 0, modo == 1, modo == 2],
+        [np.where(diaria_aplicada, valor_diaria, valor_hora), valor_hora_evento, evento],
+        default=0.0
+    )
+    tipos = np.where(
+        modo == 0,
+        np.where(diaria_aplicada, 'diaria', 'hora').astype(object),
+        np.where(modo == 1, 'hora', np.where(modo == 2, 'evento', tipo_isento))
+    )
+
+    return _arredondar(valores).tolist(), tipos.tolist()
+
+
+def _total_seconds(entradas, saidas) -> np.ndarray:
+    if isinstance(entradas, np.ndarray) and isinstance(saidas, np.ndarray):
+        microseconds = (saidas.astype('datetime64[us]') - entradas.astype('datetime64[us]')).astype(np.int64)
+        return microseconds / 1e6
+    return np.fromiter(
+        ((saida - entrada).total_seconds() for entrada, saida in zip(entradas, saidas)),
+        dtype=np.float64,
+        count=len(entradas)
+    )
+
+
+def _arredondar(valores: np.ndarray) -> np.ndarray:
+    centavos = valores * 100
+    arredondados = np.rint(centavos) / 100
+    quase_empate = np.abs(centavos - np.floor(centavos) - 0.5) < 1e-6
+    for i in np.flatnonzero(quase_empate):
+        arredondados[i] = round(float(valores[i]), 2)
+    return arredondados
+
+
+def _valor_horas(hours_to_charge, plano: PlanoTarifario) -> float:
+    valor_total = plano.valor_primeira_hora
+    if hours_to_charge > 1:
+        valor_total += (hours_to_charge - 1) * plano.valor_demais_horas
+    return valor_total
+
+
+def _valores_horas(horas_cobradas: np.ndarray, primeira: np.ndarray, demais: np.ndarray) -> np.ndarray:
+    return np.where(horas_cobradas > 1, primeira + (horas_cobradas - 1) * demais, primeira)
+
+
+def _to_float(valor) -> float:
+    return float(valor) if valor is not None else 0.0
@@ -6,20 +6,29 @@ from datetime import timedelta
 import pytest
 from starlette.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from _pytest.monkeypatch import MonkeyPatch
 
 from src.main import app
-from src.database import get_db
+from src.database import get_db, get_async_db, get_read_db, get_async_read_db
 from src.models.base import Base
 from src.models.usuario import UsuarioDB, PessoaDB
 from src.security import get_password_hash, create_access_token
+from src.services.cache import limpar_caches
+from src.services.eventos_ativos import indice_eventos
+from src.services.feed_ocupacao import feed_ocupacao
+from src.services.metricas import metricas
 
 # Importar modelos para limpeza explícita
 from src.models import acesso as models_acesso
 from src.models import estacionamento as models_estacionamento
 from src.models import evento as models_evento
 from src.models import faturamento as models_faturamento
+from src.models import ocupacao as models_ocupacao
+from src.models.estatistica_hora import EstatisticaHoraDB
+from src.models.faturamento_diario import FaturamentoDiarioDB
 
 
 os.environ["TESTING"] = "True"
@@ -29,11 +38,22 @@ test_engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# As rotas assíncronas usam conexões próprias (aiosqlite) sobre o mesmo arquivo,
+# por isso a sessão síncrona dos testes faz commit em vez de rollback.
+test_async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(test_async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database_environment(monkeypatch_session):
     monkeypatch_session.setattr("src.database.engine", test_engine)
     monkeypatch_session.setattr("src.database.SessionLocal", TestingSessionLocal)
+    monkeypatch_session.setattr("src.database.read_engine", test_engine)
+    monkeypatch_session.setattr("src.database.ReadSessionLocal", TestingSessionLocal)
+    monkeypatch_session.setattr("src.database.async_engine", test_async_engine)
+    monkeypatch_session.setattr("src.database.AsyncSessionLocal", TestingAsyncSessionLocal)
+    monkeypatch_session.setattr("src.database.async_read_engine", test_async_engine)
+    monkeypatch_session.setattr("src.database.AsyncReadSessionLocal", TestingAsyncSessionLocal)
 
     Base.metadata.create_all(bind=test_engine)
 
@@ -42,25 +62,57 @@ def setup_test_database_environment(monkeypatch_session):
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_in_memory_caches():
+    indice_eventos.limpar()
+    limpar_caches()
+    feed_ocupacao.limpar()
+    metricas.limpar()
+    yield
+    indice_eventos.limpar()
+    limpar_caches()
+    feed_ocupacao.limpar()
+
+
+@pytest.fixture(name="max_consultas")
+def max_consultas_fixture(monkeypatch):
+    """
+    Liga os cabeçalhos de depuração SQL e devolve uma função que verifica o
+    número de consultas feitas por uma requisição:
+
+        max_consultas(client.get("/api/acessos/", headers=auth_headers), 1)
+    """
+    monkeypatch.setattr("src.services.metricas.CABECALHOS_DEBUG_SQL", True)
+
+    def verificar(response, limite):
+        quantidade = int(response.headers["X-Consultas-SQL"])
+        assert quantidade <= limite, (
+            f"{response.request.method} {response.request.url.path} fez {quantidade} consultas SQL "
+            f"(máximo {limite}; {response.headers['X-Consultas-SQL-Repetidas']} instruções repetidas)"
+        )
+        return quantidade
+
+    return verificar
+
+
 @pytest.fixture(name="db_session", scope="function")
 def db_session_fixture():
-    connection = test_engine.connect()
-    transaction = connection.begin()
-    db = TestingSessionLocal(bind=connection)
+    db = TestingSessionLocal()
     try:
         yield db
     finally:
+        db.rollback()
+        db.query(models_ocupacao.OcupacaoDB).delete()
+        db.query(EstatisticaHoraDB).delete()
+        db.query(FaturamentoDiarioDB).delete()
         db.query(models_acesso.AcessoDB).delete()
         db.query(models_estacionamento.EstacionamentoDB).delete()
         db.query(models_evento.EventoDB).delete()
         db.query(models_faturamento.FaturamentoDB).delete()
         db.query(UsuarioDB).delete()
         db.query(PessoaDB).delete()
-        db.commit()  # Commit das deleções para garantir que sejam aplicadas antes do rollback
-
+        db.commit()
         db.close()
-        transaction.rollback()  # Reverte a transação da fixture
-        connection.close()
 
 
 @pytest.fixture(name="client", scope="function")
@@ -68,7 +120,14 @@ def test_client_fixture(db_session):
     def _override_get_db():
         yield db_session
 
+    async def _override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
+    app.dependency_overrides[get_async_db] = _override_get_async_db
+    app.dependency_overrides[get_async_read_db] = _override_get_async_db
 
     with TestClient(app) as c:
         yield c
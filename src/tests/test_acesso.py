@@ -1,6 +1,10 @@
+import json
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from fastapi import status
+from src.models.acesso import AcessoDB
+from src.models.faturamento import FaturamentoDB
+from src.models.ocupacao import OcupacaoDB
 
 
 brazil_timezone = ZoneInfo('America/Sao_Paulo')
@@ -329,3 +333,347 @@ def test_list_acessos_unauthorized(client):
 def test_get_acesso_by_id_unauthorized(client):
     response = client.get("/api/acessos/1")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_register_exit_frees_spot(client, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Vaga Liberada",
+        "total_vagas": 1,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response_estacionamento = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    entry_data = {
+        "placa": "LIVRE1",
+        "id_estacionamento": estacionamento_id
+    }
+    response_entry = client.post("/api/acessos/", json=entry_data, headers=auth_headers)
+    assert response_entry.status_code == status.HTTP_201_CREATED
+    acesso_id = response_entry.json()["id"]
+
+    response_full = client.post("/api/acessos/", json=entry_data, headers=auth_headers)
+    assert response_full.status_code == status.HTTP_400_BAD_REQUEST
+
+    response_exit = client.put(f"/api/acessos/{acesso_id}/saida", headers=auth_headers)
+    assert response_exit.status_code == status.HTTP_200_OK
+
+    response_again = client.post("/api/acessos/", json=entry_data, headers=auth_headers)
+    assert response_again.status_code == status.HTTP_201_CREATED
+
+
+def test_register_entry_without_counter(client, db_session, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Sem Contador",
+        "total_vagas": 2,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response_estacionamento = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    entry_data = {
+        "placa": "SEMCONT",
+        "id_estacionamento": estacionamento_id
+    }
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).status_code == status.HTTP_201_CREATED
+
+    db_session.query(OcupacaoDB).delete()
+    db_session.commit()
+
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).status_code == status.HTTP_201_CREATED
+    response_full = client.post("/api/acessos/", json=entry_data, headers=auth_headers)
+    assert response_full.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_reconciliar_ocupacao(client, db_session, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Reconciliar",
+        "total_vagas": 5,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response_estacionamento = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    for placa in ["REC1", "REC2"]:
+        client.post("/api/acessos/", json={"placa": placa, "id_estacionamento": estacionamento_id}, headers=auth_headers)
+
+    contador = db_session.get(OcupacaoDB, estacionamento_id)
+    contador.vagas_ocupadas = 5
+    db_session.commit()
+
+    response = client.post(f"/api/estacionamentos/{estacionamento_id}/ocupacao/reconciliar", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id_estacionamento": estacionamento_id, "vagas_ocupadas": 2}
+
+    db_session.refresh(contador)
+    assert contador.vagas_ocupadas == 2
+
+
+def test_reconciliar_ocupacao_employee_forbidden(client, auth_headers, auth_headers_employee):
+    response_estacionamento = client.post(
+        "/api/estacionamentos/",
+        json={"nome": "Estacionamento Reconciliar Func", "total_vagas": 5},
+        headers=auth_headers
+    )
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    response = client.post(f"/api/estacionamentos/{estacionamento_id}/ocupacao/reconciliar", headers=auth_headers_employee)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_register_entries_batch(client, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Lote",
+        "total_vagas": 2,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response_estacionamento = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    hora_cancela = (datetime.now(brazil_timezone) - timedelta(hours=2)).replace(microsecond=0)
+    batch = [
+        {"placa": "LOTE1", "id_estacionamento": estacionamento_id, "hora_entrada": hora_cancela.isoformat()},
+        {"placa": "LOTE2", "id_estacionamento": 999},
+        {"placa": "LOTE3", "id_estacionamento": estacionamento_id},
+        {"placa": "LOTE4", "id_estacionamento": estacionamento_id},
+    ]
+    response = client.post("/api/acessos/batch", json=batch, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert [item["indice"] for item in data] == [0, 1, 2, 3]
+    assert [item["status_code"] for item in data] == [201, 404, 201, 400]
+    assert data[0]["acesso"]["placa"] == "LOTE1"
+    assert data[0]["acesso"]["hora_entrada"] == hora_cancela.replace(tzinfo=None).isoformat()
+    assert data[0]["acesso"]["tipo_acesso"] == "hora"
+    assert data[2]["acesso"]["id"] != data[0]["acesso"]["id"]
+    assert data[3]["detail"] == "Estacionamento lotado."
+
+    response_full = client.post("/api/acessos/", json={"placa": "LOTE5", "id_estacionamento": estacionamento_id}, headers=auth_headers)
+    assert response_full.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_register_entries_batch_event_access(client, auth_headers_employee, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Lote Evento",
+        "total_vagas": 10,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response_estacionamento = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    inicio_evento = (datetime.now(brazil_timezone) - timedelta(hours=3)).replace(microsecond=0)
+    event_data = {
+        "nome": "Show Lote",
+        "data_hora_inicio": inicio_evento.isoformat(),
+        "data_hora_fim": (inicio_evento + timedelta(hours=4)).isoformat(),
+        "valor_acesso_unico": 30.0,
+        "id_estacionamento": estacionamento_id
+    }
+    event_id = client.post("/api/eventos/", json=event_data, headers=auth_headers).json()["id"]
+
+    batch = [
+        {"placa": "EVLOTE1", "id_estacionamento": estacionamento_id, "hora_entrada": (inicio_evento + timedelta(hours=1)).isoformat()},
+        {"placa": "EVLOTE2", "id_estacionamento": estacionamento_id, "hora_entrada": (inicio_evento - timedelta(hours=1)).isoformat()},
+    ]
+    response = client.post("/api/acessos/batch", json=batch, headers=auth_headers_employee)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data[0]["acesso"]["tipo_acesso"] == "evento"
+    assert data[0]["acesso"]["id_evento"] == event_id
+    assert data[1]["acesso"]["tipo_acesso"] == "hora"
+    assert data[1]["acesso"]["id_evento"] is None
+
+
+def test_register_entries_batch_rejects_out_of_window(client, auth_headers):
+    estacionamento_data = {"nome": "Estacionamento Janela", "total_vagas": 10}
+    estacionamento_id = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers).json()["id"]
+
+    agora = datetime.now(brazil_timezone)
+    batch = [
+        {"placa": "FUTURO1", "id_estacionamento": estacionamento_id, "hora_entrada": (agora + timedelta(hours=1)).isoformat()},
+        {"placa": "ANTIGO1", "id_estacionamento": estacionamento_id, "hora_entrada": (agora - timedelta(days=400)).isoformat()},
+        {"placa": "SKEW1", "id_estacionamento": estacionamento_id, "hora_entrada": (agora + timedelta(seconds=30)).isoformat()},
+    ]
+    response = client.post("/api/acessos/batch", json=batch, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["status_code"] for item in data] == [422, 422, 201]
+    assert data[0]["detail"] == "hora_entrada no futuro."
+    assert "janela" in data[1]["detail"]
+
+    ativos = client.get("/api/acessos/", params={"id_estacionamento": estacionamento_id}, headers=auth_headers).json()
+    assert [acesso["placa"] for acesso in ativos] == ["SKEW1"]
+
+
+def test_register_exits_batch(client, db_session, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Saida Lote",
+        "total_vagas": 3,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response_estacionamento = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    estacionamento_id = response_estacionamento.json()["id"]
+
+    now_local = datetime.now(brazil_timezone)
+    batch = [
+        {"placa": "SLOTE1", "id_estacionamento": estacionamento_id, "hora_entrada": (now_local - timedelta(hours=2, minutes=30)).isoformat()},
+        {"placa": "SLOTE2", "id_estacionamento": estacionamento_id, "hora_entrada": (now_local - timedelta(hours=24, minutes=30)).isoformat()},
+        {"placa": "SLOTE3", "id_estacionamento": estacionamento_id},
+    ]
+    entradas = client.post("/api/acessos/batch", json=batch, headers=auth_headers).json()
+    acesso_ids = [item["acesso"]["id"] for item in entradas]
+
+    client.put(f"/api/acessos/{acesso_ids[2]}/saida", headers=auth_headers)
+
+    response = client.put(
+        "/api/acessos/saida/batch",
+        json=[acesso_ids[0], acesso_ids[1], acesso_ids[2], 999, acesso_ids[0]],
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert [item["status_code"] for item in data] == [200, 200, 400, 404, 400]
+    assert data[0]["acesso"]["valor_total"] == 10.0 + 5.0 * 2
+    assert data[0]["acesso"]["tipo_acesso"] == "hora"
+    assert data[1]["acesso"]["valor_total"] == 50.0 + 10.0
+    assert data[1]["acesso"]["tipo_acesso"] == "diaria"
+    assert data[0]["acesso"]["hora_saida"] is not None
+
+    faturamentos = db_session.query(FaturamentoDB).filter(FaturamentoDB.id_acesso.in_(acesso_ids[:2])).all()
+    assert sorted(f.valor for f in faturamentos) == [20.0, 60.0]
+    assert db_session.get(OcupacaoDB, estacionamento_id).vagas_ocupadas == 0
+
+
+def test_register_exits_batch_other_admin_forbidden(client, auth_headers, auth_headers_employee, db_session):
+    estacionamento_data = {"nome": "Estacionamento Saida Lote Proibido", "total_vagas": 3}
+    estacionamento_id = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers).json()["id"]
+    acesso_id = client.post(
+        "/api/acessos/", json={"placa": "PROIB1", "id_estacionamento": estacionamento_id}, headers=auth_headers
+    ).json()["id"]
+
+    db_acesso = db_session.get(AcessoDB, acesso_id)
+    db_acesso.admin_id = None
+    db_session.commit()
+
+    response = client.put("/api/acessos/saida/batch", json=[acesso_id, 999999], headers=auth_headers_employee)
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["status_code"] for item in response.json()] == [status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND]
+    db_session.expire_all()
+    assert db_session.get(AcessoDB, acesso_id).hora_saida is None
+
+
+def test_list_active_by_plate_and_exit_by_plate(client, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Placa Ativa",
+        "total_vagas": 10,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    estacionamento_id = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers).json()["id"]
+
+    acesso_id = client.post(
+        "/api/acessos/", json={"placa": "ATIVA1", "id_estacionamento": estacionamento_id}, headers=auth_headers
+    ).json()["id"]
+    client.post("/api/acessos/", json={"placa": "OUTRA1", "id_estacionamento": estacionamento_id}, headers=auth_headers)
+
+    params = {"placa": "ATIVA1", "id_estacionamento": estacionamento_id}
+    response = client.get("/api/acessos/ativos", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [a["id"] for a in response.json()] == [acesso_id]
+
+    response_exit = client.put("/api/acessos/ativos/saida", params=params, headers=auth_headers)
+    assert response_exit.status_code == status.HTTP_200_OK
+    assert response_exit.json()["id"] == acesso_id
+    assert response_exit.json()["valor_total"] == 10.0
+
+    assert client.get("/api/acessos/ativos", params=params, headers=auth_headers).json() == []
+
+    response_again = client.put("/api/acessos/ativos/saida", params=params, headers=auth_headers)
+    assert response_again.status_code == status.HTTP_404_NOT_FOUND
+    assert response_again.json()["detail"] == "Nenhum acesso em aberto para esta placa."
+
+
+def test_list_active_by_plate_unauthorized(client):
+    response = client.get("/api/acessos/ativos", params={"placa": "ATIVA1", "id_estacionamento": 1})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_list_acessos_keyset_pagination(client, auth_headers, max_consultas):
+    estacionamento_data = {"nome": "Estacionamento Paginado", "total_vagas": 10}
+    estacionamento_id = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers).json()["id"]
+
+    ids = [
+        client.post("/api/acessos/", json={"placa": f"PAG{i}", "id_estacionamento": estacionamento_id}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+
+    first_page = client.get("/api/acessos/", params={"limit": 2}, headers=auth_headers)
+    assert first_page.status_code == status.HTTP_200_OK
+    assert [a["id"] for a in first_page.json()] == ids[:2]
+    assert first_page.headers["X-Next-Cursor"] == str(ids[1])
+    # O escopo dos funcionários do admin vai na mesma consulta, como subconsulta.
+    max_consultas(first_page, 1)
+
+    second_page = client.get("/api/acessos/", params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]}, headers=auth_headers)
+    assert [a["id"] for a in second_page.json()] == ids[2:]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+def test_list_acessos_filters(client, auth_headers):
+    estacionamento_data = {"nome": "Estacionamento Filtros", "total_vagas": 10, "valor_primeira_hora": 10.0}
+    estacionamento_id = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers).json()["id"]
+
+    aberto_id = client.post("/api/acessos/", json={"placa": "FILT1", "id_estacionamento": estacionamento_id}, headers=auth_headers).json()["id"]
+    fechado_id = client.post("/api/acessos/", json={"placa": "FILT2", "id_estacionamento": estacionamento_id}, headers=auth_headers).json()["id"]
+    client.put(f"/api/acessos/{fechado_id}/saida", headers=auth_headers)
+
+    abertos = client.get("/api/acessos/", params={"em_aberto": True, "id_estacionamento": estacionamento_id}, headers=auth_headers).json()
+    assert [a["id"] for a in abertos] == [aberto_id]
+
+    fechados = client.get("/api/acessos/", params={"em_aberto": False}, headers=auth_headers).json()
+    assert [a["id"] for a in fechados] == [fechado_id]
+
+    por_placa = client.get("/api/acessos/", params={"placa": "FILT2"}, headers=auth_headers).json()
+    assert [a["id"] for a in por_placa] == [fechado_id]
+
+    amanha = (datetime.now(brazil_timezone) + timedelta(days=1)).isoformat()
+    assert client.get("/api/acessos/", params={"data_inicio": amanha}, headers=auth_headers).json() == []
+    assert len(client.get("/api/acessos/", params={"data_fim": amanha}, headers=auth_headers).json()) == 2
+
+
+def test_list_acessos_ndjson(client, auth_headers):
+    estacionamento_data = {"nome": "Estacionamento NDJSON", "total_vagas": 10}
+    estacionamento_id = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers).json()["id"]
+    ids = [
+        client.post("/api/acessos/", json={"placa": f"ND{i}", "id_estacionamento": estacionamento_id}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+
+    response = client.get("/api/acessos/", params={"formato": "ndjson", "cursor": ids[0]}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [linha["id"] for linha in linhas] == ids[1:]
+    assert linhas[0]["placa"] == "ND1"
+
+
+def test_list_acessos_cursor_exposto_via_cors(client, auth_headers):
+    response = client.get("/api/acessos/", headers={**auth_headers, "Origin": "http://localhost:3000"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+    assert "X-Next-Cursor" in response.headers["Access-Control-Expose-Headers"]
@@ -1,3 +1,13 @@
+import asyncio
+import time
+
+import pytest
+from jose import jwt
+
+from src.auth.dependencies import refresh_tokens_revogados, revogar_refresh_token, revogar_tokens, token_revogado
+from src.services.senhas import PoolSenhas, PoolSenhasOcupado
+
+
 def test_login_com_sucesso(client, test_admin_user):
     """
     Testa se o endpoint /api/token retorna um token de acesso com credenciais válidas.
@@ -34,3 +44,125 @@ def test_login_com_usuario_inexistente(client):
     )
     assert response.status_code == 401
     assert response.json() == {"detail": "Login ou senha incorretos"}
+
+
+def test_pool_senhas_limita_fila_e_timeout():
+    """
+    Testa se o pool de senhas conta timeouts e recusa chamadas além da fila.
+    """
+    pool = PoolSenhas(tamanho=1, limite_fila=0, timeout=0.05)
+    try:
+        with pytest.raises(PoolSenhasOcupado):
+            asyncio.run(pool.executar(time.sleep, 0.5))
+        with pytest.raises(PoolSenhasOcupado):
+            pool.executar_sync(abs, -1)
+        assert pool.stats()["timeouts"] == 1
+        assert pool.stats()["rejeitadas"] == 1
+
+        time.sleep(0.6)
+        pool.timeout = 5
+        assert pool.stats()["em_andamento"] == 0
+        assert pool.executar_sync(abs, -1) == 1
+    finally:
+        pool.encerrar()
+
+
+def test_login_com_pool_saturado(client, test_admin_user, monkeypatch):
+    """
+    Testa se o endpoint /api/token responde 503 quando o pool de senhas está cheio.
+    """
+    admin_user_obj, admin_password = test_admin_user
+    pool = PoolSenhas(tamanho=1, limite_fila=0, timeout=5)
+    try:
+        # Ocupa a única vaga do pool com uma chamada que bloqueia o processo.
+        ocupada = pool._submeter(time.sleep, 1)  # pylint: disable=protected-access
+        monkeypatch.setattr("src.routes.auth.pool_senhas", pool)
+
+        response = client.post(
+            "/api/token",
+            data={"username": admin_user_obj.login, "password": admin_password}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert pool.stats()["rejeitadas"] == 1
+
+        ocupada.result(5)
+    finally:
+        pool.encerrar()
+
+
+def test_refresh_token_rotacao(client, test_admin_user):
+    """
+    Testa se /api/token/refresh emite um novo par de tokens e revoga o refresh token usado.
+    """
+    admin_user_obj, admin_password = test_admin_user
+    tokens = client.post(
+        "/api/token",
+        data={"username": admin_user_obj.login, "password": admin_password}
+    ).json()
+
+    claims = jwt.get_unverified_claims(tokens["access_token"])
+    assert (claims["uid"], claims["role"], claims["admin_id"]) == (admin_user_obj.id, "admin", None)
+
+    response = client.get("/api/usuarios/", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert response.status_code == 401
+
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["access_token"]})
+    assert response.status_code == 401
+
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    novos = response.json()
+    assert client.get("/api/usuarios/", headers={"Authorization": f"Bearer {novos['access_token']}"}).status_code == 200
+
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_tokens_revogados_apos_alteracao_do_usuario(client, test_employee_user, auth_headers):
+    """
+    Testa se alterar o usuário revoga os tokens de acesso e de refresh emitidos antes.
+    """
+    employee_obj, employee_password = test_employee_user
+    tokens = client.post(
+        "/api/token",
+        data={"username": employee_obj.login, "password": employee_password}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get(f"/api/usuarios/{employee_obj.id}", headers=headers).status_code == 200
+
+    response = client.put(
+        f"/api/usuarios/{employee_obj.id}",
+        json={
+            "user_data": {"login": employee_obj.login, "role": "funcionario", "admin_id": employee_obj.admin_id},
+            "pessoa_data": {"nome": "Funcionário Alterado"},
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    assert client.get(f"/api/usuarios/{employee_obj.id}", headers=headers).status_code == 401
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    tokens = client.post(
+        "/api/token",
+        data={"username": employee_obj.login, "password": employee_password}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get(f"/api/usuarios/{employee_obj.id}", headers=headers).status_code == 200
+
+
+def test_revogacao_por_login_sobrevive_a_muitos_refresh(monkeypatch):
+    """
+    Testa se a rotação de refresh tokens não descarta a revogação de um login.
+    """
+    monkeypatch.setattr(refresh_tokens_revogados, "maxsize", 10)
+    emitido_em = time.time() - 1
+    revogar_tokens("usuario_revogado")
+    for indice in range(100):
+        revogar_refresh_token(f"jti-{indice}")
+
+    assert token_revogado({"sub": "usuario_revogado", "iat": emitido_em})
+    assert token_revogado({"sub": "outro", "iat": emitido_em, "jti": "jti-99"})
+    assert not token_revogado({"sub": "outro", "iat": emitido_em, "jti": "jti-0"})
@@ -0,0 +1,341 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from fastapi import status
+from src import cli
+from src.main import app
+from src.models.acesso import AcessoDB
+from src.models.estatistica_hora import EstatisticaHoraDB
+from src.models.usuario import PessoaDB, UsuarioDB
+from src.security import get_password_hash
+from src.services.historico_ocupacao import varrer
+from src.services.feed_ocupacao import FIM, FeedOcupacao, feed_ocupacao
+
+
+brazil_timezone = ZoneInfo('America/Sao_Paulo')
+
+
+def criar_estacionamento(client, auth_headers, total_vagas=10):
+    estacionamento_data = {
+        "nome": "Estacionamento Dashboard",
+        "total_vagas": total_vagas,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()["id"]
+
+
+def linhas_estatisticas(db_session, estacionamento_id):
+    db_session.expire_all()
+    return [
+        (linha.dia, linha.hora, linha.entradas, linha.saidas, round(linha.faturamento, 2))
+        for linha in db_session.query(EstatisticaHoraDB)
+        .filter(EstatisticaHoraDB.id_estacionamento == estacionamento_id)
+        .order_by(EstatisticaHoraDB.dia, EstatisticaHoraDB.hora)
+    ]
+
+
+def test_dashboard_visao_geral(client, auth_headers):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+
+    acesso_ids = []
+    for placa in ["DSH0001", "DSH0002"]:
+        response = client.post("/api/acessos/", json={"placa": placa, "id_estacionamento": estacionamento_id}, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        acesso_ids.append(response.json()["id"])
+    assert client.put(f"/api/acessos/{acesso_ids[0]}/saida", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    response = client.get(f"/api/dashboard/{estacionamento_id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["metrics"]["vagas_ocupadas"] == 1
+    assert data["metrics"]["total_vagas"] == 10
+    assert data["metrics"]["entradas_hoje"] == 2
+    assert data["metrics"]["saidas_hoje"] == 1
+    assert data["metrics"]["faturamento_hoje"] == 10.0
+    hora_atual = datetime.now(brazil_timezone).hour
+    assert data["grafico_ocupacao_hora"][hora_atual]["acessos"] == 2
+    assert sum(item["acessos"] for item in data["grafico_ocupacao_hora"]) == 2
+
+
+def test_dashboard_query_count(client, auth_headers, max_consultas):
+    estacionamento_id = criar_estacionamento(client, auth_headers, total_vagas=50)
+    client.get(f"/api/dashboard/{estacionamento_id}", headers=auth_headers)
+
+    contagens = []
+    for quantidade in (1, 20):
+        lote = [{"placa": f"QRY{quantidade}{i:04d}", "id_estacionamento": estacionamento_id} for i in range(quantidade)]
+        client.post("/api/acessos/batch", json=lote, headers=auth_headers)
+        response = client.get(f"/api/dashboard/{estacionamento_id}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        contagens.append(max_consultas(response, 2))
+
+    # Contador de ocupação + agregação por hora, independente do volume de acessos.
+    assert contagens == [2, 2]
+
+
+def test_dashboard_not_found(client, auth_headers):
+    response = client.get("/api/dashboard/99999", headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_reconstruir_estatisticas_igual_incremental(client, db_session, auth_headers):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    agora = datetime.now(brazil_timezone).replace(tzinfo=None)
+    lote = [
+        {"placa": "RBD0001", "id_estacionamento": estacionamento_id, "hora_entrada": (agora - timedelta(hours=3)).isoformat()},
+        {"placa": "RBD0002", "id_estacionamento": estacionamento_id, "hora_entrada": (agora - timedelta(hours=26)).isoformat()},
+        {"placa": "RBD0003", "id_estacionamento": estacionamento_id},
+    ]
+    response = client.post("/api/acessos/batch", json=lote, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    acesso_ids = [item["acesso"]["id"] for item in response.json()]
+    response = client.put("/api/acessos/saida/batch", json=acesso_ids[:2], headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    incremental = linhas_estatisticas(db_session, estacionamento_id)
+    assert sum(linha[2] for linha in incremental) == 3
+    assert sum(linha[3] for linha in incremental) == 2
+
+    db_session.query(EstatisticaHoraDB).delete()
+    db_session.commit()
+
+    cli.main(["reconstruir-estatisticas", "--estacionamento", str(estacionamento_id)])
+
+    assert linhas_estatisticas(db_session, estacionamento_id) == incremental
+
+
+def test_dashboard_etag_e_cache(client, auth_headers, max_consultas):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    url = f"/api/dashboard/{estacionamento_id}"
+
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    assert etag.startswith('"')
+
+    # Respostas servidas do cache, com ou sem 304, não vão ao banco.
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    max_consultas(response, 0)
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": f'"outro", W/{etag}'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    max_consultas(response, 0)
+
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] == etag
+    max_consultas(response, 0)
+
+    client.post("/api/acessos/", json={"placa": "ETG0001", "id_estacionamento": estacionamento_id}, headers=auth_headers)
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["metrics"]["entradas_hoje"] == 1
+
+
+def test_dashboard_etag_exposto_via_cors(client, auth_headers):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    response = client.get(
+        f"/api/dashboard/{estacionamento_id}", headers={**auth_headers, "Origin": "https://tppe-estacionamento.vercel.app"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert "ETag" in response.headers["Access-Control-Expose-Headers"]
+
+
+def test_dashboard_cache_respeita_permissao(client, auth_headers, db_session):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    assert client.get(f"/api/dashboard/{estacionamento_id}", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    pessoa = PessoaDB(nome="Outro Admin", cpf="22222222222", email="outro_admin@example.com")
+    db_session.add(pessoa)
+    db_session.commit()
+    db_session.add(UsuarioDB(id_pessoa=pessoa.id, login="outro_admin", senha=get_password_hash("outra_senha"), role="admin"))
+    db_session.commit()
+    token = client.post("/api/token", data={"username": "outro_admin", "password": "outra_senha"}).json()["access_token"]
+
+    response = client.get(f"/api/dashboard/{estacionamento_id}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_feed_ocupacao_fan_out_e_descarte():
+    async def cenario():
+        feed = FeedOcupacao(maxsize_fila=2)
+        rapido = feed.assinar(1)
+        lento = feed.assinar(1)
+        outro = feed.assinar(2)
+
+        feed.publicar(1, b"a")
+        assert await rapido.proxima(1) == b"a"
+        feed.publicar(1, b"b")
+        assert await rapido.proxima(1) == b"b"
+        feed.publicar(1, b"c")
+        assert await rapido.proxima(1) == b"c"
+
+        assert await lento.proxima(1) is FIM
+        assert await outro.proxima(0.01) is None
+        assert feed.stats()["assinantes"] == 2
+        assert feed.stats()["descartadas"] == 1
+
+        feed.cancelar(rapido)
+        feed.cancelar(outro)
+        assert not feed.tem_assinantes(1)
+
+    asyncio.run(cenario())
+
+
+def test_feed_ocupacao_publica_apos_commit(client, auth_headers):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+
+    async def assinar():
+        return feed_ocupacao.assinar(estacionamento_id)
+
+    loop = asyncio.new_event_loop()
+    try:
+        assinatura = loop.run_until_complete(assinar())
+
+        response = client.post("/api/acessos/", json={"placa": "SSE0001", "id_estacionamento": estacionamento_id}, headers=auth_headers)
+        acesso_id = response.json()["id"]
+        mensagem = loop.run_until_complete(assinatura.proxima(1))
+        assert mensagem.startswith(b"event: ocupacao\ndata: ")
+        dados = json.loads(mensagem.decode().split("data: ", 1)[1])
+        assert dados["vagas_ocupadas"] == 1
+        assert dados["total_vagas"] == 10
+        assert (dados["entradas"], dados["saidas"], dados["faturamento"]) == (1, 0, 0.0)
+
+        client.put(f"/api/acessos/{acesso_id}/saida", headers=auth_headers)
+        dados = json.loads(loop.run_until_complete(assinatura.proxima(1)).decode().split("data: ", 1)[1])
+        assert dados["vagas_ocupadas"] == 0
+        assert (dados["entradas"], dados["saidas"], dados["faturamento"]) == (0, 1, 10.0)
+    finally:
+        loop.close()
+
+
+def test_stream_ocupacao_envia_estado_e_movimentacoes(client, auth_headers):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+
+    # O TestClient só devolve a resposta depois que o corpo termina, então o
+    # stream é consumido chamando a aplicação ASGI diretamente.
+    recebidas: asyncio.Queue = asyncio.Queue()
+    desconectar = asyncio.Event()
+
+    async def receive():
+        await desconectar.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensagem):
+        await recebidas.put(mensagem)
+
+    async def proximo_evento():
+        while True:
+            mensagem = await asyncio.wait_for(recebidas.get(), 5)
+            if mensagem["type"] == "http.response.body" and mensagem.get("body"):
+                evento = mensagem["body"].decode()
+                assert evento.startswith("event: ocupacao\ndata: ")
+                return json.loads(evento.split("data: ", 1)[1])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": f"/api/dashboard/{estacionamento_id}/stream", "raw_path": b"", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", auth_headers["Authorization"].encode())],
+        "client": ("testclient", 50000), "server": ("testserver", 80),
+    }
+
+    loop = asyncio.new_event_loop()
+    try:
+        tarefa = loop.create_task(app(scope, receive, send))
+        inicio = loop.run_until_complete(asyncio.wait_for(recebidas.get(), 5))
+        assert inicio["status"] == status.HTTP_200_OK
+        assert (b"content-type", b"text/event-stream; charset=utf-8") in inicio["headers"]
+
+        estado = loop.run_until_complete(proximo_evento())
+        assert estado["vagas_ocupadas"] == 0
+        assert (estado["entradas"], estado["saidas"]) == (0, 0)
+        assert feed_ocupacao.tem_assinantes(estacionamento_id)
+
+        response = client.post("/api/acessos/", json={"placa": "SSE0002", "id_estacionamento": estacionamento_id}, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+        movimentacao = loop.run_until_complete(proximo_evento())
+        assert movimentacao["vagas_ocupadas"] == 1
+        assert (movimentacao["entradas"], movimentacao["saidas"]) == (1, 0)
+
+        desconectar.set()
+        loop.run_until_complete(asyncio.wait_for(tarefa, 5))
+        assert not feed_ocupacao.tem_assinantes(estacionamento_id)
+    finally:
+        loop.close()
+
+
+def test_stream_ocupacao_permissao(client, auth_headers):
+    response = client.get("/api/dashboard/999999/stream", headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert not feed_ocupacao.tem_assinantes(999999)
+
+
+def test_varrer_pico_e_media():
+    inicio = datetime(2025, 3, 10, 8, 30)
+    eventos = [
+        (datetime(2025, 3, 10, 8, 45), 1),
+        (datetime(2025, 3, 10, 9, 0), -1),
+        (datetime(2025, 3, 10, 9, 0), 1),
+        (datetime(2025, 3, 10, 9, 30), 1),
+    ]
+    pontos = list(varrer(eventos, 1, inicio, datetime(2025, 3, 10, 10, 15), timedelta(hours=1)))
+
+    assert [(p.inicio.hour, p.inicio.minute, p.fim.hour, p.fim.minute) for p in pontos] == [(8, 30, 9, 0), (9, 0, 10, 0), (10, 0, 10, 15)]
+    assert [p.pico for p in pontos] == [2, 3, 3]
+    assert [p.media for p in pontos] == [1.5, 2.5, 3.0]
+
+
+def test_serie_ocupacao(client, auth_headers, db_session, test_admin_user):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    admin, _ = test_admin_user
+    dia = datetime(2025, 3, 10)
+    intervalos = [
+        (dia - timedelta(hours=2), dia + timedelta(hours=1)),
+        (dia + timedelta(minutes=30), dia + timedelta(hours=2)),
+        (dia + timedelta(hours=1), None),
+    ]
+    for indice, (entrada, saida) in enumerate(intervalos):
+        db_session.add(AcessoDB(
+            placa=f"HIS{indice:04d}", id_estacionamento=estacionamento_id, hora_entrada=entrada,
+            hora_saida=saida, tipo_acesso='hora', admin_id=admin.id
+        ))
+    db_session.commit()
+
+    response = client.get(
+        f"/api/dashboard/{estacionamento_id}/ocupacao",
+        params={"inicio": dia.isoformat(), "fim": (dia + timedelta(hours=3)).isoformat(), "bucket": "1h"},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    pontos = response.json()
+    assert [ponto["pico"] for ponto in pontos] == [2, 2, 1]
+    assert [ponto["media"] for ponto in pontos] == [1.5, 2.0, 1.0]
+
+    response = client.get(
+        f"/api/dashboard/{estacionamento_id}/ocupacao",
+        params={"inicio": dia.isoformat(), "fim": (dia + timedelta(days=2)).isoformat(), "bucket": "1d"},
+        headers=auth_headers
+    )
+    assert [ponto["pico"] for ponto in response.json()] == [2, 1]
+
+
+def test_serie_ocupacao_intervalo_invalido(client, auth_headers):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    url = f"/api/dashboard/{estacionamento_id}/ocupacao"
+
+    response = client.get(url, params={"inicio": "2025-03-10T10:00:00", "fim": "2025-03-10T09:00:00"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.get(url, params={"inicio": "2020-01-01T00:00:00", "fim": "2025-01-01T00:00:00", "bucket": "15m"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
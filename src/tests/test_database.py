@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.cli import ALEMBIC_INI, REVISAO_INICIAL, migrar
+from src.models.base import Base
+from src.services.prontidao import Prontidao
+from src.database import MonitoredAsyncQueuePool, MonitoredQueuePool, _estatisticas_pool, async_database_url, pool_kwargs
+
+
+def test_async_database_url_postgres():
+    url = async_database_url("postgresql://admin:admin123@db:5432/estacionamento")
+    assert url == "postgresql+asyncpg://admin:admin123@db:5432/estacionamento"
+
+
+def test_async_database_url_sqlite():
+    assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_pool_kwargs_sqlite_usa_pool_padrao():
+    assert pool_kwargs("sqlite:///./test.db") == {}
+
+
+def test_pool_kwargs_lidos_do_ambiente(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    kwargs = pool_kwargs("postgresql://admin:admin123@db:5432/estacionamento", assincrono=True)
+    assert kwargs["poolclass"] is MonitoredAsyncQueuePool
+    assert kwargs["pool_size"] == 20
+    assert kwargs["max_overflow"] == 0
+    assert kwargs["pool_pre_ping"] is False
+
+
+def test_pool_monitorado_registra_espera():
+    engine = create_engine("sqlite:///./test.db", poolclass=MonitoredQueuePool, pool_size=1, max_overflow=0)
+    with engine.connect():
+        estatisticas = _estatisticas_pool(engine)
+        assert estatisticas["em_uso"] == 1
+    estatisticas = _estatisticas_pool(engine)
+    assert estatisticas["em_uso"] == 0
+    assert estatisticas["esperas"] == 1
+    assert estatisticas["timeouts"] == 0
+    engine.dispose()
+
+
+def test_health_pool(client):
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert "primario" in data
+    assert "primario_async" in data
+
+
+def test_ready_apos_inicializacao(client):
+    for _ in range(100):
+        response = client.get("/ready")
+        if response.status_code == 200:
+            break
+        time.sleep(0.05)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["banco"] is True
+    assert data["caches"] is True
+    assert data["tempo_partida_s"] is not None
+
+
+def test_prontidao_nao_bloqueia_com_banco_indisponivel(monkeypatch, tmp_path):
+    engine_indisponivel = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/inexistente/banco.db", poolclass=NullPool)
+    monkeypatch.setattr("src.database.async_engine", engine_indisponivel)
+    prontidao = Prontidao(atraso_inicial=0.01, atraso_maximo=0.02, orcamento=1)
+
+    async def cenario():
+        inicio = time.perf_counter()
+        prontidao.iniciar()
+        assert time.perf_counter() - inicio < 0.1
+        await asyncio.sleep(0.1)
+        estado = prontidao.stats()
+        await prontidao.encerrar()
+        return estado
+
+    estado = asyncio.run(cenario())
+    assert estado["pronto"] is False
+    assert estado["banco"] is False
+    assert estado["tentativas"] > 1
+    assert estado["ultimo_erro"]
+
+
+def test_migrar_banco_novo(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/novo.db")
+    monkeypatch.setattr("src.database.engine", engine)
+    # alembic.ini e as migrações são localizados pelo pacote, não pelo diretório atual.
+    monkeypatch.chdir(tmp_path)
+    migrar()
+    migrar()
+    tabelas = inspect(engine).get_table_names()
+    assert set(Base.metadata.tables) <= set(tabelas)
+    with engine.connect() as conexao:
+        assert conexao.execute(text("SELECT version_num FROM alembic_version")).scalar() is not None
+    engine.dispose()
+
+
+def test_migrar_banco_criado_sem_migracoes(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/antigo.db")
+    # Reproduz um banco do create_all anterior às migrações: o esquema da
+    # revisão inicial, com dados, e sem a tabela alembic_version.
+    config = Config(str(ALEMBIC_INI))
+    with engine.begin() as conexao:
+        config.attributes["connection"] = conexao
+        command.upgrade(config, REVISAO_INICIAL)
+        conexao.execute(text("DROP TABLE alembic_version"))
+        conexao.execute(text("INSERT INTO pessoa (id, nome, cpf) VALUES (1, 'Admin', '000.000.000-01')"))
+        conexao.execute(text("INSERT INTO usuarios (id, id_pessoa, login, senha, role) VALUES (1, 1, 'admin', 'x', 'admin')"))
+        conexao.execute(text(
+            "INSERT INTO estacionamento (id, nome, total_vagas, valor_primeira_hora, valor_demais_horas, valor_diaria, admin_id) "
+            "VALUES (1, 'Centro', 10, 10, 5, 50, 1)"
+        ))
+        conexao.execute(text(
+            "INSERT INTO acesso (id, placa, hora_entrada, hora_saida, valor_total, tipo_acesso, id_estacionamento, admin_id) VALUES "
+            "(1, 'ABC1234', '2025-03-10 08:00:00', '2025-03-10 10:00:00', 15, 'hora', 1, 1), "
+            "(2, 'DEF5678', '2025-03-10 09:00:00', NULL, NULL, 'hora', 1, 1)"
+        ))
+        conexao.execute(text("INSERT INTO faturamento (id, valor, data_faturamento, id_acesso) VALUES (1, 15, '2025-03-10 10:00:00', 1)"))
+    assert "ix_acesso_estacionamento_hora_entrada" not in {indice["name"] for indice in inspect(engine).get_indexes("acesso")}
+
+    monkeypatch.setattr("src.database.engine", engine)
+    migrar()
+
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    indices = {indice["name"] for indice in inspect(engine).get_indexes("acesso")}
+    assert {
+        "ix_acesso_ativo_estacionamento_placa", "ix_acesso_estacionamento_hora_entrada", "ix_acesso_estacionamento_hora_saida"
+    } <= indices
+    with engine.connect() as conexao:
+        assert conexao.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0002"
+        assert conexao.execute(text("SELECT vagas_ocupadas FROM ocupacao_estacionamento WHERE id_estacionamento = 1")).scalar() == 1
+        assert conexao.execute(text("SELECT SUM(entradas), SUM(saidas), SUM(faturamento) FROM acesso_hourly_stats")).one() == (2, 1, 15.0)
+        assert conexao.execute(text("SELECT SUM(quantidade), SUM(valor) FROM faturamento_diario")).one() == (1, 15.0)
+    engine.dispose()
+
+
+def test_migrar_espera_o_banco(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/lento.db")
+    conectar = engine.connect
+    falhas = []
+
+    def conectar_depois_de_duas_falhas():
+        if len(falhas) < 2:
+            falhas.append(time.monotonic())
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+        return conectar()
+
+    monkeypatch.setattr(engine, "connect", conectar_depois_de_duas_falhas)
+    monkeypatch.setattr("src.database.engine", engine)
+    monkeypatch.setattr("src.cli.prontidao", Prontidao(atraso_inicial=0.01, atraso_maximo=0.02, orcamento=5))
+    migrar()
+    assert len(falhas) == 2
+    with engine.connect() as conexao:
+        assert conexao.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0002"
+    engine.dispose()
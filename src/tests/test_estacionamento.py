@@ -1,4 +1,7 @@
+from datetime import date
+
 from fastapi import status
+from src.models.faturamento_diario import SEM_EVENTO, FaturamentoDiarioDB
 
 def test_criar_estacionamento(client, auth_headers):
     estacionamento_data = {
@@ -37,3 +40,46 @@ def test_listar_estacionamentos_sem_autenticacao(client):
     response = client.get("/api/estacionamentos/")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
     assert response.json() == {"detail": "Not authenticated"}
+
+def test_atualizar_estacionamento_reflete_no_cache(client, auth_headers):
+    estacionamento_id = client.post(
+        "/api/estacionamentos/", json={"nome": "Estacionamento Cache", "total_vagas": 1}, headers=auth_headers
+    ).json()["id"]
+    entry_data = {"placa": "CACHE1", "id_estacionamento": estacionamento_id}
+
+    assert client.get(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).json()["total_vagas"] == 1
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).status_code == status.HTTP_201_CREATED
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.put(f"/api/estacionamentos/{estacionamento_id}", json={"total_vagas": 2}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    assert client.get(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).json()["total_vagas"] == 2
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).status_code == status.HTTP_201_CREATED
+
+    stats = client.get("/health/caches").json()["estacionamentos"]
+    assert stats["hits"] >= 3
+    assert stats["misses"] >= 1
+
+def test_deletar_estacionamento_invalida_cache(client, auth_headers):
+    estacionamento_id = client.post(
+        "/api/estacionamentos/", json={"nome": "Estacionamento Cache Deletado", "total_vagas": 1}, headers=auth_headers
+    ).json()["id"]
+    assert client.get(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    assert client.delete(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).status_code == status.HTTP_204_NO_CONTENT
+    assert client.get(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+
+def test_deletar_estacionamento_remove_faturamento_diario(client, auth_headers, db_session):
+    estacionamento_id = client.post(
+        "/api/estacionamentos/", json={"nome": "Estacionamento Faturamento Deletado", "total_vagas": 1}, headers=auth_headers
+    ).json()["id"]
+    db_session.add(FaturamentoDiarioDB(
+        id_estacionamento=estacionamento_id, dia=date(2025, 3, 10), tipo_acesso="hora", id_evento=SEM_EVENTO,
+        quantidade=1, valor=10.0
+    ))
+    db_session.commit()
+
+    assert client.delete(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).status_code == status.HTTP_204_NO_CONTENT
+    db_session.expire_all()
+    assert db_session.query(FaturamentoDiarioDB).filter(FaturamentoDiarioDB.id_estacionamento == estacionamento_id).count() == 0
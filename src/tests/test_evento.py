@@ -165,3 +165,38 @@ def test_listar_eventos_por_estacionamento(client, auth_headers):
     assert len(data) >= 2
     assert any(e["nome"] == "Evento Lista 1" for e in data)
     assert any(e["nome"] == "Evento Lista 2" for e in data)
+
+def test_entrada_reflete_evento_atualizado_e_deletado(client, auth_headers):
+    estacionamento_id = create_test_estacionamento(client, auth_headers, {
+        "nome": "Estacionamento Indice Eventos",
+        "total_vagas": 100, "valor_primeira_hora": 10.0, "valor_demais_horas": 5.0, "valor_diaria": 50.0
+    })
+    entry_data = {"placa": "IDX1", "id_estacionamento": estacionamento_id}
+
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).json()["tipo_acesso"] == "hora"
+
+    now_local = datetime.now(brazil_timezone)
+    evento_id = client.post(
+        "/api/eventos/",
+        headers=auth_headers,
+        json={
+            "nome": "Evento Indice",
+            "data_hora_inicio": (now_local + timedelta(hours=1)).isoformat(),
+            "data_hora_fim": (now_local + timedelta(hours=2)).isoformat(),
+            "valor_acesso_unico": 10.0,
+            "id_estacionamento": estacionamento_id
+        },
+    ).json()["id"]
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).json()["tipo_acesso"] == "hora"
+
+    client.put(
+        f"/api/eventos/{evento_id}",
+        headers=auth_headers,
+        json={"data_hora_inicio": (now_local - timedelta(hours=1)).isoformat()},
+    )
+    response = client.post("/api/acessos/", json=entry_data, headers=auth_headers).json()
+    assert response["tipo_acesso"] == "evento"
+    assert response["id_evento"] == evento_id
+
+    client.delete(f"/api/eventos/{evento_id}", headers=auth_headers)
+    assert client.post("/api/acessos/", json=entry_data, headers=auth_headers).json()["tipo_acesso"] == "hora"
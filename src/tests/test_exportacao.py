@@ -0,0 +1,63 @@
+import csv
+import io
+from fastapi import status
+from src.models.usuario import PessoaDB, UsuarioDB
+from src.security import get_password_hash
+
+
+def criar_estacionamento(client, auth_headers):
+    estacionamento_data = {
+        "nome": "Estacionamento Exportação",
+        "total_vagas": 10,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()["id"]
+
+
+def ler_csv(response):
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def test_exportar_acessos_e_faturamento(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("src.routes.exportacao.TAMANHO_LOTE_EXPORTACAO", 2)
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    lote = [{"placa": f"EXP{i:04d}", "id_estacionamento": estacionamento_id} for i in range(5)]
+    acesso_ids = [item["acesso"]["id"] for item in client.post("/api/acessos/batch", json=lote, headers=auth_headers).json()]
+    client.put("/api/acessos/saida/batch", json=acesso_ids[:3], headers=auth_headers)
+
+    response = client.get("/api/export/acessos.csv", params={"id_estacionamento": estacionamento_id}, headers=auth_headers)
+    assert 'filename="acessos.csv"' in response.headers["content-disposition"]
+    linhas = ler_csv(response)
+    assert [int(linha["id"]) for linha in linhas] == acesso_ids
+    assert [linha["placa"] for linha in linhas] == [item["placa"] for item in lote]
+    assert [linha["hora_saida"] == "" for linha in linhas] == [False, False, False, True, True]
+    assert float(linhas[0]["valor_total"]) == 10.0
+
+    linhas = ler_csv(client.get("/api/export/faturamento.csv", headers=auth_headers))
+    assert [int(linha["id_acesso"]) for linha in linhas] == acesso_ids[:3]
+    assert {linha["placa"] for linha in linhas} == {"EXP0000", "EXP0001", "EXP0002"}
+    assert sum(float(linha["valor"]) for linha in linhas) == 30.0
+
+    linhas = ler_csv(client.get("/api/export/acessos.csv", params={"data_fim": "2000-01-01T00:00:00"}, headers=auth_headers))
+    assert linhas == []
+
+
+def test_exportar_respeita_tenant(client, auth_headers, db_session):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    client.post("/api/acessos/", json={"placa": "TEN0001", "id_estacionamento": estacionamento_id}, headers=auth_headers)
+
+    pessoa = PessoaDB(nome="Outro Admin", cpf="33333333333", email="outro_export@example.com")
+    db_session.add(pessoa)
+    db_session.commit()
+    db_session.add(UsuarioDB(id_pessoa=pessoa.id, login="outro_export", senha=get_password_hash("outra_senha"), role="admin"))
+    db_session.commit()
+    token = client.post("/api/token", data={"username": "outro_export", "password": "outra_senha"}).json()["access_token"]
+
+    response = client.get("/api/export/acessos.csv", headers={"Authorization": f"Bearer {token}"})
+    assert ler_csv(response) == []
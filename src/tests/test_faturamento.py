@@ -0,0 +1,118 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from fastapi import status
+from src import cli
+from src.models.acesso import AcessoDB
+from src.models.faturamento import FaturamentoDB
+from src.models.faturamento_diario import FaturamentoDiarioDB
+
+
+brazil_timezone = ZoneInfo('America/Sao_Paulo')
+
+
+def criar_estacionamento(client, auth_headers, nome="Estacionamento Faturamento"):
+    estacionamento_data = {
+        "nome": nome,
+        "total_vagas": 10,
+        "valor_primeira_hora": 10.0,
+        "valor_demais_horas": 5.0,
+        "valor_diaria": 50.0
+    }
+    response = client.post("/api/estacionamentos/", json=estacionamento_data, headers=auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()["id"]
+
+
+def linhas_faturamento(db_session, estacionamento_id):
+    db_session.expire_all()
+    return [
+        (linha.dia, linha.tipo_acesso, linha.id_evento, linha.quantidade, round(linha.valor, 2))
+        for linha in db_session.query(FaturamentoDiarioDB)
+        .filter(FaturamentoDiarioDB.id_estacionamento == estacionamento_id)
+        .order_by(FaturamentoDiarioDB.dia, FaturamentoDiarioDB.tipo_acesso, FaturamentoDiarioDB.id_evento)
+    ]
+
+
+def test_relatorio_mantido_a_cada_saida(client, auth_headers, db_session):
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    agora = datetime.now(brazil_timezone).replace(tzinfo=None)
+    lote = [
+        {"placa": "FAT0001", "id_estacionamento": estacionamento_id},
+        {"placa": "FAT0002", "id_estacionamento": estacionamento_id, "hora_entrada": (agora - timedelta(hours=24, minutes=30)).isoformat()},
+        {"placa": "FAT0003", "id_estacionamento": estacionamento_id},
+    ]
+    acesso_ids = [item["acesso"]["id"] for item in client.post("/api/acessos/batch", json=lote, headers=auth_headers).json()]
+    assert client.put("/api/acessos/saida/batch", json=acesso_ids[:2], headers=auth_headers).status_code == status.HTTP_200_OK
+    assert client.put(f"/api/acessos/{acesso_ids[2]}/saida", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    hoje = agora.date()
+    response = client.get(
+        "/api/faturamento/relatorio",
+        params={"inicio": hoje.isoformat(), "fim": (hoje + timedelta(days=1)).isoformat(), "agrupar_por": ["tipo_acesso"]},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["quantidade"] == 3
+    assert data["total"] == 80.0
+    assert [(item["tipo_acesso"], item["quantidade"], item["valor"]) for item in data["itens"]] == [
+        ("diaria", 1, 60.0), ("hora", 2, 20.0)
+    ]
+
+    incremental = linhas_faturamento(db_session, estacionamento_id)
+    db_session.query(FaturamentoDiarioDB).delete()
+    db_session.commit()
+    cli.main(["reconstruir-faturamento", "--estacionamento", str(estacionamento_id)])
+    assert linhas_faturamento(db_session, estacionamento_id) == incremental
+
+
+def test_relatorio_por_semana_e_mes(client, auth_headers, db_session, test_admin_user):
+    admin, _ = test_admin_user
+    estacionamento_id = criar_estacionamento(client, auth_headers)
+    outro_id = criar_estacionamento(client, auth_headers, nome="Outro Estacionamento")
+    faturamentos = [
+        (estacionamento_id, datetime(2025, 3, 3, 10), 10.0),
+        (estacionamento_id, datetime(2025, 3, 9, 18), 15.0),
+        (estacionamento_id, datetime(2025, 3, 10, 9), 20.0),
+        (outro_id, datetime(2025, 3, 31, 23), 5.0),
+        (estacionamento_id, datetime(2025, 4, 1, 8), 50.0),
+    ]
+    for indice, (id_atual, momento, valor) in enumerate(faturamentos):
+        acesso = AcessoDB(
+            placa=f"MES{indice:04d}", id_estacionamento=id_atual, hora_entrada=momento - timedelta(hours=1),
+            hora_saida=momento, valor_total=valor, tipo_acesso='hora', admin_id=admin.id
+        )
+        db_session.add(acesso)
+        db_session.flush()
+        db_session.add(FaturamentoDB(id_acesso=acesso.id, valor=valor, data_faturamento=momento))
+    db_session.commit()
+    cli.main(["reconstruir-faturamento"])
+
+    url = "/api/faturamento/relatorio"
+    response = client.get(url, params={"inicio": "2025-03-01", "fim": "2025-04-01", "agrupamento": "semana"}, headers=auth_headers)
+    assert [(item["periodo"], item["valor"]) for item in response.json()["itens"]] == [
+        ("2025-03-03", 25.0), ("2025-03-10", 20.0), ("2025-03-31", 5.0)
+    ]
+
+    response = client.get(
+        url, params={"inicio": "2025-01-01", "fim": "2026-01-01", "agrupamento": "mes", "agrupar_por": ["estacionamento"]},
+        headers=auth_headers
+    )
+    data = response.json()
+    assert data["total"] == 100.0
+    assert [(item["periodo"], item["id_estacionamento"], item["valor"]) for item in data["itens"]] == [
+        ("2025-03-01", estacionamento_id, 45.0), ("2025-03-01", outro_id, 5.0), ("2025-04-01", estacionamento_id, 50.0)
+    ]
+
+    response = client.get(
+        url, params={"inicio": "2025-01-01", "fim": "2026-01-01", "id_estacionamento": outro_id, "agrupar_por": ["evento"]},
+        headers=auth_headers
+    )
+    assert [(item["id_evento"], item["valor"]) for item in response.json()["itens"]] == [(None, 5.0)]
+
+
+def test_relatorio_intervalo_invalido(client, auth_headers):
+    response = client.get(
+        "/api/faturamento/relatorio", params={"inicio": date(2025, 3, 2).isoformat(), "fim": "2025-03-01"}, headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,120 @@
+import gc
+import logging
+import threading
+
+from src.services.metricas import LIMITE_REPETICOES_SQL, ConsultasRequisicao, Metricas, _verificar_consultas
+
+
+def valor_metrica(texto, linha_inicio):
+    for linha in texto.splitlines():
+        if linha.startswith(linha_inicio + " "):
+            return float(linha.rsplit(" ", 1)[1])
+    return None
+
+
+def test_histograma_acumula_buckets():
+    metricas = Metricas()
+    metricas.histograma("latencia", "Latência.", (0.1, 1.0), ("rota",))
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        metricas.observar("latencia", valor, ("/a",))
+    texto = metricas.exportar()
+    assert valor_metrica(texto, 'latencia_bucket{rota="/a",le="0.1"}') == 2
+    assert valor_metrica(texto, 'latencia_bucket{rota="/a",le="1"}') == 3
+    assert valor_metrica(texto, 'latencia_bucket{rota="/a",le="+Inf"}') == 4
+    assert valor_metrica(texto, 'latencia_count{rota="/a"}') == 4
+    assert valor_metrica(texto, 'latencia_sum{rota="/a"}') == 3.65
+    assert "# TYPE latencia histogram" in texto
+
+
+def test_contador_soma_shards_de_varias_threads():
+    metricas = Metricas()
+    metricas.contador("eventos_total", "Eventos.", ("tipo",))
+
+    def gravar():
+        for _ in range(1000):
+            metricas.incrementar("eventos_total", ('a"b',))
+
+    threads = [threading.Thread(target=gravar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert valor_metrica(metricas.exportar(), 'eventos_total{tipo="a\\"b"}') == 4000
+
+
+def test_shards_de_threads_encerradas_sao_aposentados():
+    metricas = Metricas()
+    metricas.contador("eventos_total", "Eventos.")
+    metricas.histograma("duracao_segundos", "Duração.", (0.1, 1.0))
+
+    def gravar():
+        metricas.incrementar("eventos_total")
+        metricas.observar("duracao_segundos", 0.5)
+
+    for _ in range(50):
+        thread = threading.Thread(target=gravar)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert len(metricas._shards) == 0  # pylint: disable=protected-access
+    texto = metricas.exportar()
+    assert valor_metrica(texto, "eventos_total") == 50
+    assert valor_metrica(texto, 'duracao_segundos_bucket{le="1"}') == 50
+    assert valor_metrica(texto, "duracao_segundos_count") == 50
+
+
+def test_metrics_por_rota_com_consultas(client, auth_headers):
+    response = client.post(
+        "/api/estacionamentos/",
+        json={"nome": "Metricas", "endereco": "Rua M", "total_vagas": 5, "valor_primeira_hora": 10.0,
+              "valor_demais_horas": 5.0, "valor_diaria": 50.0},
+        headers=auth_headers
+    )
+    estacionamento_id = response.json()["id"]
+    for _ in range(2):
+        assert client.get(f"/api/estacionamentos/{estacionamento_id}", headers=auth_headers).status_code == 200
+    assert client.get("/api/estacionamentos/999999", headers=auth_headers).status_code == 404
+    client.get("/nao-existe")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    texto = response.text
+
+    rota = 'metodo="GET",rota="/api/estacionamentos/{estacionamento_id}"'
+    assert valor_metrica(texto, f'http_requisicoes_total{{{rota},status="200"}}') == 2
+    assert valor_metrica(texto, f'http_requisicoes_total{{{rota},status="404"}}') == 1
+    assert valor_metrica(texto, f'http_requisicao_duracao_segundos_count{{{rota}}}') == 3
+    assert valor_metrica(texto, f'http_resposta_tamanho_bytes_sum{{{rota}}}') > 0
+    assert valor_metrica(texto, 'http_requisicoes_total{metodo="GET",rota="<sem_rota>",status="404"}') == 1
+    assert valor_metrica(texto, 'db_consultas_por_requisicao_sum{metodo="POST",rota="/api/estacionamentos/"}') >= 1
+    assert valor_metrica(texto, "db_consultas_total") >= 1
+    assert valor_metrica(texto, 'http_requisicoes_em_andamento{metodo="GET"}') == 1
+
+
+def test_consultas_repetidas_registradas_como_n_mais_um(caplog):
+    consultas = ConsultasRequisicao()
+    consultas.registrar("SELECT 1", 0.001)
+    for _ in range(LIMITE_REPETICOES_SQL + 1):
+        consultas.registrar("SELECT pessoa.id\nFROM pessoa WHERE pessoa.id = ?", 0.001)
+
+    assert consultas.quantidade == LIMITE_REPETICOES_SQL + 2
+    assert consultas.repetidas() == [("SELECT pessoa.id\nFROM pessoa WHERE pessoa.id = ?", LIMITE_REPETICOES_SQL + 1)]
+    with caplog.at_level(logging.WARNING, logger="src.services.metricas"):
+        _verificar_consultas(consultas, ("GET", "/api/usuarios/"))
+    assert "Possível N+1 em GET /api/usuarios/" in caplog.text
+    assert "SELECT pessoa.id FROM pessoa WHERE pessoa.id = ?" in caplog.text
+
+
+def test_cabecalhos_debug_sql(client, auth_headers, max_consultas):
+    response = client.get("/api/estacionamentos/", headers=auth_headers)
+    assert response.status_code == 200
+    assert max_consultas(response, 1) == 1
+    assert float(response.headers["X-Tempo-SQL-ms"]) >= 0
+    assert response.headers["X-Consultas-SQL-Repetidas"] == "0"
+
+
+def test_cabecalhos_debug_sql_desligados_por_padrao(client, auth_headers):
+    response = client.get("/api/estacionamentos/", headers=auth_headers)
+    assert "X-Consultas-SQL" not in response.headers
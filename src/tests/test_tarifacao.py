@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.models.estacionamento import EstacionamentoDB
+from src.models.evento import EventoDB
+from src.services import tarifacao
+
+ENTRADA = datetime(2025, 1, 1, 10, 0, 0)
+
+
+def make_estacionamento():
+    return EstacionamentoDB(valor_primeira_hora=10.0, valor_demais_horas=5.0, valor_diaria=50.0)
+
+
+def test_price_primeira_hora():
+    plano = tarifacao.compilar_plano(make_estacionamento(), 'hora')
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(minutes=45), plano) == (10.0, 'hora')
+
+
+def test_price_demais_horas():
+    plano = tarifacao.compilar_plano(make_estacionamento(), 'hora')
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=2, minutes=30), plano) == (20.0, 'hora')
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=3), plano) == (20.0, 'hora')
+
+
+def test_price_diaria():
+    plano = tarifacao.compilar_plano(make_estacionamento(), 'hora')
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=24, minutes=10), plano) == (60.0, 'diaria')
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=51), plano) == (100.0 + 10.0 + 5.0 * 2, 'diaria')
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=48), plano) == (100.0, 'diaria')
+
+
+def test_price_evento():
+    evento = EventoDB(valor_acesso_unico=25.0)
+    plano = tarifacao.compilar_plano(make_estacionamento(), 'evento', 1, evento)
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=30), plano) == (25.0, 'evento')
+
+
+def test_price_evento_sem_valor_cobra_por_hora_sem_diaria():
+    plano = tarifacao.compilar_plano(make_estacionamento(), 'evento', 1, None)
+    assert tarifacao.price(ENTRADA, ENTRADA + timedelta(hours=30), plano) == (10.0 + 5.0 * 29, 'hora')
+
+
+def test_compilar_plano_reutiliza_planos_iguais():
+    primeiro = tarifacao.compilar_plano(make_estacionamento(), 'hora')
+    segundo = tarifacao.compilar_plano(make_estacionamento(), 'hora')
+    assert primeiro is segundo
+
+
+def test_price_many_equals_price():
+    rng = random.Random(42)
+    estacionamento = make_estacionamento()
+    planos_possiveis = [
+        tarifacao.compilar_plano(estacionamento, 'hora'),
+        tarifacao.compilar_plano(EstacionamentoDB(valor_primeira_hora=7.35, valor_demais_horas=3.1, valor_diaria=41.9), 'hora'),
+        tarifacao.compilar_plano(estacionamento, 'evento', 1, EventoDB(valor_acesso_unico=30.0)),
+        tarifacao.compilar_plano(estacionamento, 'evento', 1, None),
+        tarifacao.compilar_plano(estacionamento, 'diaria'),
+    ]
+
+    entradas, saidas, planos = [], [], []
+    for _ in range(5000):
+        entrada = ENTRADA + timedelta(seconds=rng.randint(0, 86400 * 30), microseconds=rng.randint(0, 999999))
+        duracao = rng.choice([
+            timedelta(seconds=rng.randint(0, 7200)),
+            timedelta(hours=rng.randint(1, 100)),
+            timedelta(seconds=rng.randint(0, 86400 * 5), microseconds=rng.randint(0, 999999)),
+        ])
+        entradas.append(entrada)
+        saidas.append(entrada + duracao)
+        planos.append(rng.choice(planos_possiveis))
+
+    valores, tipos = tarifacao.price_many(entradas, saidas, planos)
+    esperado = [tarifacao.price(e, s, p) for e, s, p in zip(entradas, saidas, planos)]
+
+    assert list(zip(valores, tipos)) == esperado
+
+    valores_np, tipos_np = tarifacao.price_many(
+        np.array(entradas, dtype='datetime64[us]'), np.array(saidas, dtype='datetime64[us]'), planos
+    )
+    assert list(zip(valores_np, tipos_np)) == esperado
+
+
+def test_price_many_vazio():
+    assert tarifacao.price_many([], [], []) == ([], [])
@@ -1,6 +1,10 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import status
 from src.security import verify_password, get_password_hash
 from src.models.usuario import UsuarioDB, PessoaDB
+from src.services.senhas import PoolSenhas
 
 def test_admin_create_employee(client, db_session, auth_headers):
     """Admin deve conseguir criar um novo usuário funcionário."""
@@ -161,7 +165,7 @@ def test_employee_get_other_user_forbidden(client, auth_headers_employee, test_a
     assert response.json()["detail"] == "Não autorizado a ver este usuário"
 
 
-def test_admin_update_employee(client, db_session, auth_headers, test_employee_user):
+def test_admin_update_employee(client, db_session, auth_headers, test_employee_user, max_consultas):
     """Admin deve conseguir atualizar dados de seu funcionário."""
     employee_obj, _ = test_employee_user
     updated_login = "updated_employee_login"
@@ -193,6 +197,8 @@ def test_admin_update_employee(client, db_session, auth_headers, test_employee_u
     assert data["role"] == "funcionario"
     assert data["pessoa"]["nome"] == updated_name
     assert data["pessoa"]["email"] == updated_email
+    # Usuário com pessoa (joinedload), login em uso, UPDATE de usuário e pessoa, refresh e a pessoa da resposta.
+    assert max_consultas(response, 6) == 6
 
     db_session.refresh(employee_obj)
     assert employee_obj.login == updated_login
@@ -300,3 +306,135 @@ def test_employee_cannot_delete_user(client, auth_headers_employee, test_admin_u
         headers=auth_headers_employee
     )
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_deleted_employee_token_rejected(client, auth_headers, auth_headers_employee, test_employee_user):
+    """Após a remoção, o token do funcionário não deve continuar válido pelo cache de autenticação."""
+    employee_obj, _ = test_employee_user
+
+    assert client.get("/api/usuarios/", headers=auth_headers_employee).status_code == status.HTTP_200_OK
+
+    response = client.delete(f"/api/usuarios/{employee_obj.id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = client.get("/api/usuarios/", headers=auth_headers_employee)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_admin_import_employees_json(client, db_session, auth_headers, test_employee_user):
+    """Admin deve importar funcionários em lote, com um resultado por registro."""
+    employee_obj, _ = test_employee_user
+    registros = [
+        {"pessoa": {"nome": "Func A", "cpf": "30000000001", "email": "func.a@example.com"},
+         "usuario": {"login": "func_a", "password": "senha_a"}},
+        {"pessoa": {"nome": "Func B", "cpf": "30000000002"},
+         "usuario": {"login": "func_b", "password": "senha_b"}},
+        {"pessoa": {"nome": "Repetido", "cpf": "30000000001"},
+         "usuario": {"login": "func_c", "password": "senha_c"}},
+        {"pessoa": {"nome": "Login existente", "cpf": "30000000004"},
+         "usuario": {"login": employee_obj.login, "password": "senha_d"}},
+        {"pessoa": {"nome": "Sem CPF"},
+         "usuario": {"login": "func_e", "password": "senha_e"}},
+        {"pessoa": {"nome": "Admin", "cpf": "30000000006"},
+         "usuario": {"login": "func_f", "password": "senha_f", "role": "admin"}},
+    ]
+
+    response = client.post("/api/usuarios/import", json=registros, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    resultados = response.json()
+    assert [resultado["status_code"] for resultado in resultados] == [201, 201, 409, 409, 422, 400]
+    assert resultados[0]["usuario"]["pessoa"]["cpf"] == "30000000001"
+
+    admin_id = db_session.query(UsuarioDB).filter(UsuarioDB.login == "admin_test").first().id
+    for login, senha in (("func_a", "senha_a"), ("func_b", "senha_b")):
+        db_user = db_session.query(UsuarioDB).filter(UsuarioDB.login == login).first()
+        assert db_user.admin_id == admin_id
+        assert db_user.role == "funcionario"
+        assert verify_password(senha, db_user.senha)
+    assert db_session.query(UsuarioDB).filter(UsuarioDB.login == "func_c").first() is None
+
+
+def test_admin_import_employees_csv(client, db_session, auth_headers):
+    """A importação também aceita CSV."""
+    corpo = "nome,cpf,email,login,password\nFunc CSV,30000000010,,func_csv,senha_csv\n"
+
+    response = client.post(
+        "/api/usuarios/import", content=corpo.encode(), headers={**auth_headers, "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [resultado["status_code"] for resultado in response.json()] == [201]
+    db_user = db_session.query(UsuarioDB).filter(UsuarioDB.login == "func_csv").first()
+    assert db_user.pessoa.email is None
+
+
+def test_employee_cannot_import_users(client, auth_headers_employee):
+    """Funcionário NÃO deve conseguir importar usuários."""
+    response = client.post("/api/usuarios/import", json=[], headers=auth_headers_employee)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_login_durante_importacao(client, auth_headers, test_admin_user, monkeypatch):
+    """Um login deve ser atendido enquanto uma importação ainda gera as senhas do lote."""
+    admin_obj, admin_password = test_admin_user
+    pool = PoolSenhas(tamanho=2, limite_fila=8, timeout=30)
+    monkeypatch.setattr("src.routes.usuario.pool_senhas", pool)
+    monkeypatch.setattr("src.routes.auth.pool_senhas", pool)
+    registros = [
+        {"pessoa": {"nome": f"Func Lote {i}", "cpf": f"4000000000{i}"},
+         "usuario": {"login": f"func_lote_{i}", "password": f"senha_lote_{i}"}}
+        for i in range(8)
+    ]
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            importacao = executor.submit(client.post, "/api/usuarios/import", json=registros, headers=auth_headers)
+            limite = time.monotonic() + 10
+            while pool.stats()["em_andamento"] == 0 and time.monotonic() < limite:
+                time.sleep(0.01)
+
+            response = client.post("/api/token", data={"username": admin_obj.login, "password": admin_password})
+
+            assert response.status_code == status.HTTP_200_OK
+            assert not importacao.done()
+            assert [resultado["status_code"] for resultado in importacao.result().json()] == [201] * 8
+    finally:
+        pool.encerrar()
+
+
+def test_importacao_com_cadastro_concorrente(client, db_session, auth_headers, monkeypatch):
+    """
+    Um login ou e-mail gravado por outra requisição enquanto as senhas são
+    geradas deve virar 409 só na linha afetada, sem derrubar o lote.
+    """
+    registros = [
+        {"pessoa": {"nome": "Func Login", "cpf": "50000000001"},
+         "usuario": {"login": "func_concorrente", "password": "senha_1"}},
+        {"pessoa": {"nome": "Func Email", "cpf": "50000000002", "email": "concorrente@example.com"},
+         "usuario": {"login": "func_email", "password": "senha_2"}},
+        {"pessoa": {"nome": "Func Livre", "cpf": "50000000003"},
+         "usuario": {"login": "func_livre", "password": "senha_3"}},
+    ]
+
+    async def gerar_hashes_com_cadastro_concorrente(passwords):
+        pessoa = PessoaDB(nome="Outra", cpf="50000000099", email="concorrente@example.com")
+        db_session.add(pessoa)
+        db_session.flush()
+        db_session.add(UsuarioDB(
+            id_pessoa=pessoa.id, login="func_concorrente", senha=get_password_hash("x"), role="funcionario"
+        ))
+        db_session.commit()
+        return [get_password_hash(password) for password in passwords]
+
+    monkeypatch.setattr("src.routes.usuario.pool_senhas.gerar_hashes", gerar_hashes_com_cadastro_concorrente)
+
+    response = client.post("/api/usuarios/import", json=registros, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    resultados = response.json()
+    assert [resultado["status_code"] for resultado in resultados] == [409, 409, 201]
+    assert resultados[0]["detail"] == "Login já cadastrado."
+    assert resultados[1]["detail"] == "E-mail já cadastrado."
+    assert db_session.query(UsuarioDB).filter(UsuarioDB.login == "func_livre").first() is not None
+    assert db_session.query(UsuarioDB).filter(UsuarioDB.login == "func_email").first() is None